@@ -0,0 +1,7 @@
+"""Performance benchmarks of yacfg and yacfg-batch.
+
+Benchmarks are not part of the test suite, run them from the repository
+root, e.g. ``python -m benchmarks.bench_batch --help``. The suite of
+the main generation steps with stored baselines is run with
+``python -m benchmarks run`` (see ``python -m benchmarks --help``).
+"""
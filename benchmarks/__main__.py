@@ -0,0 +1,144 @@
+"""Run the benchmark suite, store and compare baselines.
+
+Usage::
+
+    python -m benchmarks run [--save NAME] [--repeat N] [--scale X] [-b BENCHMARK...]
+    python -m benchmarks compare NAME [--threshold 0.2] [--repeat N] [-b BENCHMARK...]
+
+Baselines are stored in ``benchmarks/baselines/NAME.json``, they are
+only comparable on the same machine. ``compare`` exits with 1 when a
+benchmark (minimum wall time) is slower than the baseline by more than
+the threshold.
+
+``benchmarks/baselines/reference.json`` is a committed reference of the
+suite's scale and timings order, not a CI gate. CI checks a change on
+one runner, against a baseline of the base commit::
+
+    git checkout BASE && python -m benchmarks run --save base
+    git checkout HEAD && python -m benchmarks compare base
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+from typing import Dict
+
+from .suite import BENCHMARKS, measure
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), "baselines")
+
+
+def run(names, repeat: int, scale: float) -> Dict[str, Dict[str, float]]:
+    """Run the selected benchmarks.
+
+    :return: benchmark name -> wall times (see suite.measure())
+    """
+    environ = dict(os.environ)
+    results = {}
+    for name in names:
+        with tempfile.TemporaryDirectory(prefix="yacfg_bench_") as tmp_dir:
+            try:
+                func = BENCHMARKS[name](tmp_dir, scale)
+                results[name] = measure(func, repeat)
+            finally:
+                os.environ.clear()
+                os.environ.update(environ)
+        print(
+            f"{name:<20} median {results[name]['median'] * 1000:>9.1f} ms"
+            f"  min {results[name]['min'] * 1000:>9.1f} ms"
+        )
+    return results
+
+
+def baseline_file(name: str) -> str:
+    """Get the path of a named baseline."""
+    return os.path.join(BASELINES_PATH, f"{name}.json")
+
+
+def save_baseline(name: str, results, repeat: int, scale: float) -> None:
+    """Store results as a named baseline."""
+    os.makedirs(BASELINES_PATH, exist_ok=True)
+    with open(baseline_file(name), "w") as stream:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "machine": platform.node(),
+                "repeat": repeat,
+                "scale": scale,
+                "results": results,
+            },
+            stream,
+            indent=1,
+            sort_keys=True,
+        )
+    print(f"Baseline saved to {baseline_file(name)}")
+
+
+def compare(baseline, results, threshold: float) -> bool:
+    """Print the comparison of results with a baseline.
+
+    :return: True when no benchmark regressed over the threshold
+    """
+    passed = True
+    for name, result in results.items():
+        if name not in baseline["results"]:
+            print(f"{name:<20} not in the baseline")
+            continue
+        # the minimum is the least affected by other load of the machine
+        ratio = result["min"] / baseline["results"][name]["min"]
+        regressed = ratio > 1 + threshold
+        passed = passed and not regressed
+        print(
+            f"{name:<20} {ratio:>6.2f}x baseline{'  REGRESSION' if regressed else ''}"
+        )
+    return passed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Run benchmarks")
+    run_parser.add_argument("--save", metavar="NAME", help="Save as a baseline")
+    compare_parser = commands.add_parser("compare", help="Compare with a baseline")
+    compare_parser.add_argument("baseline", metavar="NAME")
+    compare_parser.add_argument("--threshold", type=float, default=0.2)
+    run_parser.add_argument("--scale", type=float, default=1.0)
+    for command_parser in (run_parser, compare_parser):
+        command_parser.add_argument("--repeat", type=int, default=5)
+        command_parser.add_argument(
+            "-b",
+            "--benchmark",
+            dest="benchmarks",
+            action="append",
+            default=[],
+            help=f"run only the benchmark, one of {', '.join(BENCHMARKS)}",
+        )
+    options = parser.parse_args(argv)
+
+    unknown = set(options.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    logging.getLogger().setLevel(logging.WARNING)
+    names = options.benchmarks or list(BENCHMARKS)
+
+    if options.command == "compare":
+        with open(baseline_file(options.baseline), "r") as stream:
+            baseline = json.load(stream)
+        # with the scale of the baseline
+        results = run(names, options.repeat, baseline["scale"])
+        if not compare(baseline, results, options.threshold):
+            sys.exit(1)
+        return
+
+    results = run(names, options.repeat, options.scale)
+    if options.save:
+        save_baseline(options.save, results, options.repeat, options.scale)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark of yacfg-batch generation, sequential vs. parallel jobs.
+
+Usage: ``python -m benchmarks.bench_batch --services 300 --jobs 8``
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from yacfg_batch.yacfg_batch import generate
+
+from .synthetic import write_batch_file, write_profile, write_template_set
+
+
+def run(services: int, queues: int, outputs: int, jobs: int) -> float:
+    """Generate a synthetic batch, and measure its wall time.
+
+    :return: wall time in seconds
+    """
+    with tempfile.TemporaryDirectory(prefix="yacfg_bench_") as tmp_dir:
+        template = write_template_set(
+            os.path.join(tmp_dir, "templates"), outputs=outputs
+        )
+        profile = write_profile(
+            os.path.join(tmp_dir, "profiles"), template, queues=queues
+        )
+        batch_file = write_batch_file(
+            os.path.join(tmp_dir, "batch"), profile, template, services=services
+        )
+        start = time.perf_counter()
+        generate([batch_file], os.path.join(tmp_dir, "output"), jobs=jobs)
+        return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--services", type=int, default=100)
+    parser.add_argument("--queues", type=int, default=100)
+    parser.add_argument("--outputs", type=int, default=4)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    options = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    sequential = run(options.services, options.queues, options.outputs, 1)
+    print(f"jobs=1: {sequential:.2f} s")
+    if options.jobs > 1:
+        parallel = run(options.services, options.queues, options.outputs, options.jobs)
+        print(
+            f"jobs={options.jobs}: {parallel:.2f} s"
+            f" (speedup {sequential / parallel:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Benchmark of output writing, per fsync mode and with staged output.
+
+Usage: ``python -m benchmarks.bench_output_writer --files 200 --size 4096``
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from yacfg.output import FSYNC_MODES, OutputWriter
+
+
+def run(files: int, size: int, fsync: str, staged: bool) -> float:
+    """Write a number of files (twice, the second time replacing them),
+    and measure the wall time of the second write.
+
+    :return: wall time in seconds
+    """
+    content = "x" * size
+    with tempfile.TemporaryDirectory(prefix="yacfg_bench_") as tmp_dir:
+        output_path = os.path.join(tmp_dir, "output")
+        os.mkdir(output_path)
+        for _ in range(2):
+            start = time.perf_counter()
+            with OutputWriter(output_path, fsync=fsync, staged=staged) as writer:
+                for i in range(files):
+                    writer.write(f"output{i}.xml", content)
+        return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--size", type=int, default=4096)
+    options = parser.parse_args(argv)
+
+    for staged in (False, True):
+        for fsync in FSYNC_MODES:
+            wall_time = run(options.files, options.size, fsync, staged)
+            print(f"fsync={fsync} staged={staged}: {wall_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark of the CLI startup, wall time of quick actions.
+
+Usage: ``python -m benchmarks.bench_startup --runs 10``
+
+This is the import time regression check, the test suite only checks
+which modules the startup imports (tests/test_yacfg/yacfg_cli).
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ACTIONS = {
+    "version": ["--version"],
+    "list-profiles": ["--list-profiles"],
+    "list-templates": ["--list-templates"],
+}
+
+
+def run(arguments, runs: int) -> float:
+    """Run the CLI a number of times, and measure its wall time.
+
+    :return: median wall time in seconds
+    """
+    command = [sys.executable, "-m", "yacfg.cli.yacfg_cli", "-q", *arguments]
+    wall_times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        wall_times.append(time.perf_counter() - start)
+    return statistics.median(wall_times)
+
+
+def run_interpreter(runs: int) -> float:
+    """Measure the bare interpreter startup, for reference.
+
+    :return: median wall time in seconds
+    """
+    wall_times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        wall_times.append(time.perf_counter() - start)
+    return statistics.median(wall_times)
+
+
+def run_import(runs: int) -> float:
+    """Measure the import time of the CLI module (python -X importtime).
+
+    :return: median cumulative import time in seconds
+    """
+    command = [sys.executable, "-X", "importtime", "-c", "import yacfg.cli.yacfg_cli"]
+    import_times = []
+    for _ in range(runs):
+        result = subprocess.run(command, check=True, capture_output=True, text=True)
+        match = re.search(
+            r"^import time:\s+\d+ \|\s+(\d+) \| yacfg\.cli\.yacfg_cli$",
+            result.stderr,
+            re.MULTILINE,
+        )
+        import_times.append(int(match.group(1)) / 1000000)
+    return statistics.median(import_times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    options = parser.parse_args(argv)
+
+    interpreter = run_interpreter(options.runs)
+    print(f"interpreter: {interpreter * 1000:.1f} ms")
+    print(f"import: {run_import(options.runs) * 1000:.1f} ms")
+    for name, arguments in ACTIONS.items():
+        wall_time = run(arguments, options.runs)
+        print(f"{name}: {wall_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Benchmark suite of the main generation steps on synthetic data.
+
+Every benchmark prepares its data once, and then measures repeated runs
+with cold in-process caches (as a single CLI call would see them).
+"""
+
+import copy
+import os
+import statistics
+import time
+from typing import Callable, Dict, List
+
+import yacfg.files
+import yacfg.profiles
+import yacfg.query
+import yacfg.templates
+import yacfg.tree_index
+from yacfg.output import new_profile_rendered
+from yacfg.profiles import get_tuned_profile
+from yacfg.query import get_main_template_list, list_profiles
+from yacfg.templates import get_template_environment
+from yacfg.yacfg import generate_core, generate_outputs
+from yacfg_batch.yacfg_batch import generate as generate_batch
+
+from .synthetic import (
+    write_batch_file,
+    write_profile,
+    write_profile_tree,
+    write_python_profile,
+    write_template_set,
+    write_tuning_files,
+)
+
+# benchmark name -> setup(work directory, scale) returning the measured function
+BENCHMARKS: Dict[str, Callable[[str, float], Callable[[], object]]] = {}
+
+
+def benchmark(func: Callable[[str, float], Callable[[], object]]):
+    """Register a benchmark setup function under its name."""
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def clear_caches() -> None:
+    """Drop in-process caches, so every run starts cold."""
+    yacfg.files.PATH_RESOLVER.reset()
+    yacfg.templates.clear_environment_cache()
+    yacfg.profiles.clear_profile_defaults_cache()
+    yacfg.profiles.clear_tuning_files_cache()
+    yacfg.query.clear_main_templates_cache()
+    yacfg.tree_index.TREE_INDEX.reset()
+
+
+def _profile(path: str, scale: float, outputs: int = 10):
+    template = write_template_set(os.path.join(path, "templates"), outputs=outputs)
+    profile = write_profile(
+        os.path.join(path, "profiles"), template, queues=int(2000 * scale)
+    )
+    return template, profile
+
+
+@benchmark
+def tuned_profile(path: str, scale: float) -> Callable[[], object]:
+    """get_tuned_profile() of a large profile with tuning files."""
+    _, profile = _profile(path, scale)
+    tuning_path = os.path.join(path, "tuning")
+    tuning_files = [
+        os.path.join(tuning_path, name) for name in write_tuning_files(tuning_path)
+    ]
+    return lambda: get_tuned_profile(profile, tuning_files_list=tuning_files)
+
+
+@benchmark
+def tuned_static_profile(path: str, scale: float) -> Callable[[], object]:
+    """get_tuned_profile() of a large static profile (exported from
+    the tuned_profile one) with tuning files."""
+    _, profile = _profile(path, scale)
+    static_profile = os.path.join(path, "profiles", "synthetic.static.yaml")
+    new_profile_rendered(profile, static_profile)
+    tuning_path = os.path.join(path, "tuning")
+    tuning_files = [
+        os.path.join(tuning_path, name) for name in write_tuning_files(tuning_path)
+    ]
+    return lambda: get_tuned_profile(static_profile, tuning_files_list=tuning_files)
+
+
+@benchmark
+def tuned_python_profile(path: str, scale: float) -> Callable[[], object]:
+    """get_tuned_profile() of a large python profile with tuning files,
+    the same data as tuned_profile."""
+    template = write_template_set(os.path.join(path, "templates"))
+    profile = write_python_profile(
+        os.path.join(path, "profiles"), template, queues=int(2000 * scale)
+    )
+    tuning_path = os.path.join(path, "tuning")
+    tuning_files = [
+        os.path.join(tuning_path, name) for name in write_tuning_files(tuning_path)
+    ]
+    return lambda: get_tuned_profile(profile, tuning_files_list=tuning_files)
+
+
+@benchmark
+def core(path: str, scale: float) -> Callable[[], object]:
+    """generate_core() of a large tuned profile into an output directory."""
+    template, profile = _profile(path, scale)
+    config_data, tuned_profile = get_tuned_profile(profile)
+    output_path = os.path.join(path, "output")
+    return lambda: generate_core(
+        copy.deepcopy(config_data),
+        tuned_profile,
+        template=template,
+        output_path=output_path,
+        write_profile_data=True,
+    )
+
+
+@benchmark
+def outputs(path: str, scale: float) -> Callable[[], object]:
+    """generate_outputs() of a template set, without the environment setup."""
+    template, profile = _profile(path, scale)
+    config_data, _ = get_tuned_profile(profile)
+    output_path = os.path.join(path, "output")
+    os.makedirs(output_path)
+
+    def run() -> object:
+        env = get_template_environment(template)
+        return generate_outputs(
+            copy.deepcopy(config_data),
+            get_main_template_list(env),
+            env,
+            output_path,
+        )
+
+    return run
+
+
+@benchmark
+def batch(path: str, scale: float) -> Callable[[], object]:
+    """yacfg_batch generate() of many services."""
+    template, profile = _profile(path, scale / 10, outputs=4)
+    batch_file = write_batch_file(
+        os.path.join(path, "batch"),
+        profile,
+        template,
+        services=int(100 * scale),
+        tuning_files=5,
+    )
+    output_path = os.path.join(path, "output")
+    return lambda: generate_batch([batch_file], output_path)
+
+
+@benchmark
+def profiles_listing(path: str, scale: float) -> Callable[[], object]:
+    """list_profiles() of a large profiles tree (with a stored tree index)."""
+    profiles_path = write_profile_tree(
+        os.path.join(path, "profiles"), directories=int(300 * scale)
+    )
+    os.environ["YACFG_PROFILES"] = profiles_path
+    os.environ["YACFG_CACHE_DIR"] = os.path.join(path, "cache")
+    return list_profiles
+
+
+def measure(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Measure repeated runs of a function, with cold caches.
+
+    :return: minimum, median and maximum wall time in seconds
+    """
+    wall_times: List[float] = []
+    for _ in range(repeat):
+        clear_caches()
+        start = time.perf_counter()
+        func()
+        wall_times.append(time.perf_counter() - start)
+    return {
+        "min": min(wall_times),
+        "median": statistics.median(wall_times),
+        "max": max(wall_times),
+    }
@@ -0,0 +1,182 @@
+"""Synthetic profiles, template sets and batch files for benchmarks."""
+
+import os
+from typing import List
+
+PROFILE = """\
+_defaults:
+  broker_name: broker
+  queue_count: {queues}
+  port: 61616
+
+render:
+  template: {template}
+
+broker:
+  name: {{{{ broker_name }}}}
+  port: {{{{ port }}}}
+  queues:
+{{% for i in range(queue_count | default(0) | int) %}}
+    - name: queue{{{{ i }}}}
+      address: address{{{{ i }}}}
+      durable: true
+      max_consumers: {{{{ i % 16 }}}}
+{{% endfor %}}
+"""
+
+# python profile generating the same data as PROFILE
+PYTHON_PROFILE = """\
+DEFAULTS = {{"broker_name": "broker", "queue_count": {queues}, "port": 61616}}
+
+
+def render(tuning):
+    return {{
+        "render": {{"template": {template!r}}},
+        "broker": {{
+            "name": tuning["broker_name"],
+            "port": tuning["port"],
+            "queues": [
+                {{
+                    "name": f"queue{{i}}",
+                    "address": f"address{{i}}",
+                    "durable": True,
+                    "max_consumers": i % 16,
+                }}
+                for i in range(int(tuning.get("queue_count") or 0))
+            ],
+        }},
+    }}
+"""
+
+MAIN_TEMPLATE = """\
+{% import 'macros.jinja2' as macros %}
+<configuration output="{{ metadata.out_filename }}">
+  <name>{{ broker.name | overridevalue('broker_name') }}</name>
+  <port>{{ broker.port }}</port>
+{% for queue in broker.queues %}
+  {{ macros.queue(queue) }}
+{% endfor %}
+</configuration>
+"""
+
+MACROS = """\
+{% macro queue(queue) -%}
+<queue name="{{ queue.name }}" address="{{ queue.address }}"\
+ durable="{{ queue.durable | lower }}" max-consumers="{{ queue.max_consumers }}"/>
+{%- endmacro %}
+"""
+
+
+def write_template_set(path: str, name: str = "synthetic", outputs: int = 10) -> str:
+    """Write a template set with a number of main templates.
+
+    :return: template set directory
+    """
+    template_path = os.path.join(path, name)
+    os.makedirs(template_path, exist_ok=True)
+    with open(os.path.join(template_path, "_template"), "w"):
+        pass
+    with open(os.path.join(template_path, "macros.jinja2"), "w") as stream:
+        stream.write(MACROS)
+    for i in range(outputs):
+        main_template = os.path.join(template_path, f"output{i}.xml.jinja2")
+        with open(main_template, "w") as stream:
+            stream.write(MAIN_TEMPLATE)
+    return template_path
+
+
+def write_profile(
+    path: str, template: str, name: str = "synthetic.yaml.jinja2", queues: int = 100
+) -> str:
+    """Write a dynamic profile generating a number of queues.
+
+    :return: profile file path
+    """
+    os.makedirs(path, exist_ok=True)
+    profile_path = os.path.join(path, name)
+    with open(profile_path, "w") as stream:
+        stream.write(PROFILE.format(queues=queues, template=template))
+    return profile_path
+
+
+def write_python_profile(
+    path: str, template: str, name: str = "synthetic.py", queues: int = 100
+) -> str:
+    """Write a python profile generating a number of queues,
+    the same data as write_profile().
+
+    :return: profile file path
+    """
+    os.makedirs(path, exist_ok=True)
+    profile_path = os.path.join(path, name)
+    with open(profile_path, "w") as stream:
+        stream.write(PYTHON_PROFILE.format(queues=queues, template=template))
+    return profile_path
+
+
+def write_tuning_files(path: str, count: int = 10) -> List[str]:
+    """Write tuning files with a few values each.
+
+    :return: tuning file names
+    """
+    os.makedirs(path, exist_ok=True)
+    names = []
+    for i in range(count):
+        name = f"tuning{i}.yaml"
+        with open(os.path.join(path, name), "w") as stream:
+            stream.write(f"port: {61616 + i}\nvalue{i}: {i}\n")
+        names.append(name)
+    return names
+
+
+def write_batch_file(
+    path: str,
+    profile: str,
+    template: str,
+    services: int = 100,
+    tuning_files: int = 0,
+) -> str:
+    """Write a batch profile file with a number of distinct services.
+
+    :return: batch profile file path
+    """
+    os.makedirs(path, exist_ok=True)
+    common_tuning = write_tuning_files(path, tuning_files)
+    lines = [
+        "_default:",
+        f"  profile: {profile}",
+        f"  template: {template}",
+    ]
+    if common_tuning:
+        lines.append("_common:")
+        lines.append("  tuning_files:")
+        lines.extend(f"    - {name}" for name in common_tuning)
+    for i in range(services):
+        lines.append(f"service{i}/etc:")
+        lines.append("  tuning:")
+        lines.append(f"    broker_name: broker{i}")
+    batch_path = os.path.join(path, "batch.yaml")
+    with open(batch_path, "w") as stream:
+        stream.write("\n".join(lines) + "\n")
+    return batch_path
+
+
+def write_profile_tree(
+    path: str, directories: int = 100, profiles: int = 20, depth: int = 3
+) -> str:
+    """Write a profiles tree with a number of nested product directories,
+    each with a number of profiles and an underscored modules directory.
+
+    :return: profiles tree directory
+    """
+    for i in range(directories):
+        directory = os.path.join(
+            path, *(f"product{i % (level + 2)}" for level in range(depth - 1)), str(i)
+        )
+        os.makedirs(os.path.join(directory, "_modules"), exist_ok=True)
+        for j in range(profiles):
+            with open(os.path.join(directory, f"profile{j}.yaml.jinja2"), "w"):
+                pass
+        with open(os.path.join(directory, "_modules", "module.yaml.jinja2"), "w"):
+            pass
+    return path
@@ -1,19 +1,27 @@
 import sys
 
-if sys.version_info < (3, 10):
-    # compatibility for python <3.10
-    import importlib_metadata as metadata
-else:
-    from importlib import metadata
-
-try:
-    __version__ = metadata.version("yacfg")
-except metadata.PackageNotFoundError:
-    __version__ = "devel"
-
 NAME = "yacfg"
 SHORT_DESCRIPTION = "Template based configuration generator"
 DESCRIPTION = (
     "Template based configuration files generator based on jinja2 and yaml"
     " mainly focused on Apache ActiveMQ Artemis and related projects"
 )
+
+
+def __getattr__(name: str) -> str:
+    # the version is looked up on the first use only, importing
+    # importlib.metadata costs more than the rest of the CLI startup
+    if name == "__version__":
+        if sys.version_info < (3, 10):
+            # compatibility for python <3.10
+            import importlib_metadata as metadata
+        else:
+            from importlib import metadata
+
+        try:
+            version = metadata.version(NAME)
+        except metadata.PackageNotFoundError:
+            version = "devel"
+        globals()["__version__"] = version
+        return version
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,9 +5,10 @@ from __future__ import annotations
 import argparse
 import json
 import re
-from typing import Dict, List, Tuple, Union
+from typing import Tuple, Union
 
-from yacfg import DESCRIPTION, NAME, __version__
+import yacfg
+from yacfg import DESCRIPTION, NAME
 
 REX_BOOL_TRUE = re.compile(r"^(true|yes|1|on)$", re.IGNORECASE)
 REX_BOOL_FALSE = re.compile(r"^(false|no|0|off)$", re.IGNORECASE)
@@ -63,8 +64,28 @@ def parse_key_value_list(items: list[str]) -> dict[str, str]:
     return result
 
 
-parser = argparse.ArgumentParser(
-    prog="{} {}".format(NAME, __version__),
+class _ArgumentParser(argparse.ArgumentParser):
+    """Argument parser named with the package version, which is looked up
+    only when the name is printed (usage, help, errors)."""
+
+    def _add_version(self) -> None:
+        self.prog = "{} {}".format(NAME, yacfg.__version__)
+
+    def format_usage(self) -> str:
+        self._add_version()
+        return super().format_usage()
+
+    def format_help(self) -> str:
+        self._add_version()
+        return super().format_help()
+
+    def error(self, message: str):
+        self._add_version()
+        super().error(message)
+
+
+parser = _ArgumentParser(
+    prog=NAME,
     description=DESCRIPTION,
     epilog="The Cake is a lie.",
 )
@@ -129,6 +150,88 @@ group_extra.add_argument(
     action="store_true",
 )
 
+group_extra.add_argument(
+    "-j",
+    "--jobs",
+    help="Number of output files rendered concurrently (default: 1)",
+    type=int,
+    default=1,
+)
+
+group_extra.add_argument(
+    "--jobs-mode",
+    help="Render concurrently in threads or in processes (default: thread)",
+    choices=["thread", "process"],
+    default="thread",
+)
+
+group_extra.add_argument(
+    "--incremental",
+    help="Skip output files whose inputs (profile data, templates, extra"
+    " properties) did not change since the last generation into the output"
+    " directory, output has to be specified",
+    action="store_true",
+)
+
+group_extra.add_argument(
+    "--reproducible",
+    help="Pin the generation time in metadata to $SOURCE_DATE_EPOCH,"
+    " or to 1970-01-01 UTC, so generated files are deterministic"
+    " ($SOURCE_DATE_EPOCH is honored without this option too)",
+    action="store_true",
+)
+
+group_extra.add_argument(
+    "--fsync",
+    help="Flush output files to the disk: every file and the output directory"
+    " (file), the output directory only (dir), or nothing (none, default)",
+    choices=["none", "file", "dir"],
+    default="none",
+)
+
+group_extra.add_argument(
+    "--staged-output",
+    help="Generate into a staging directory which replaces the output"
+    " directory as a whole, only when all files are generated",
+    action="store_true",
+)
+
+group_extra.add_argument(
+    "--stream",
+    help="Write output files while they are rendered, without keeping"
+    " whole outputs in memory (for very large outputs)",
+    action="store_true",
+)
+
+group_extra.add_argument(
+    "--bytecode-cache",
+    metavar="DIR",
+    help="Persistent cache directory for compiled templates, shared between"
+    " runs (default: $YACFG_BYTECODE_CACHE, or disabled)",
+)
+
+group_extra.add_argument(
+    "--render-cache",
+    metavar="DIR",
+    help="Cache directory for rendered outputs, reused by generations with"
+    " the same inputs and a pinned time, see --reproducible"
+    " (default: $YACFG_RENDER_CACHE, or disabled)",
+)
+
+group_extra.add_argument(
+    "--timings",
+    help="Print wall and CPU times of generation stages and of every"
+    " rendered template (generates in-process)",
+    action="store_true",
+)
+
+group_extra.add_argument(
+    "--cprofile",
+    metavar="FILE",
+    help="Profile the generation with cProfile and dump the statistics"
+    " to FILE, to be read by pstats (generates in-process)",
+)
+
 # Group Render
 group_render = parser.add_argument_group(title="Render options")
 
@@ -147,11 +250,17 @@ group_render.add_argument(
 group_query = parser.add_argument_group(title="Query options")
 
 group_query.add_argument(
-    "--list-templates", help="Print a list of packaged templates", action="store_true"
+    "--list-templates",
+    help="Print a list of packaged templates (indexed in $YACFG_CACHE_DIR,"
+    " ~/.cache/yacfg by default)",
+    action="store_true",
 )
 
 group_query.add_argument(
-    "--list-profiles", help="Print a list of packaged profiles", action="store_true"
+    "--list-profiles",
+    help="Print a list of packaged profiles (indexed in $YACFG_CACHE_DIR,"
+    " ~/.cache/yacfg by default)",
+    action="store_true",
 )
 
 # Group Creator
@@ -184,6 +293,32 @@ group_creator.add_argument(
     " for easy creation of tuning file (local path)",
 )
 
+group_creator.add_argument(
+    "--precompile",
+    nargs=2,
+    metavar=("TEMPLATE", "DEST"),
+    help="Compile all templates of a template set (with libraries) to python"
+    " modules in DEST directory, or zip file (ending with .zip), used instead"
+    " of template sources when listed in $YACFG_PRECOMPILED",
+)
+
+# Group Server
+group_server = parser.add_argument_group(title="Server options")
+
+group_server.add_argument(
+    "--serve",
+    metavar="SOCKET",
+    help="Run a render server on a Unix domain socket, keeping templates"
+    " and profiles loaded between generations",
+)
+
+group_server.add_argument(
+    "--server",
+    metavar="SOCKET",
+    help="Generate via the render server on a Unix domain socket (default:"
+    " $YACFG_SERVER), or in-process when it is not available",
+)
+
 # Group Logging
 group_logging = parser.add_argument_group(title="Logging options")
 
@@ -1,21 +1,23 @@
 #! /usr/bin/env -S python3 -sP
 
+import contextlib
+import functools
 import logging
 import os
 import sys
 
-from yacfg import NAME, __version__, logger_settings
+import yacfg
+from yacfg import NAME, logger_settings
 from yacfg.cli.cli_arguments import boolize, parse_key_value_list, parser
-from yacfg.config_data import RenderOptions
-from yacfg.exceptions import GenerationError, ProfileError, TemplateError
-from yacfg.output import (
-    export_tuning_variables,
-    new_profile,
-    new_profile_rendered,
-    new_template,
+from yacfg.exceptions import (
+    GenerationError,
+    ProfileError,
+    ServerError,
+    TemplateError,
 )
-from yacfg.query import list_profiles, list_templates
-from yacfg.yacfg import generate
+
+# Modules of the actions (jinja2, yaml, ...) are imported only when
+# the action is requested, to keep the startup fast (e.g. --version).
 
 logger_settings.config_console_logger()
 
@@ -40,6 +42,10 @@ class CommandLineApp:
             options.print_help()
             sys.exit(0)
 
+        if options.version:
+            print(yacfg.__version__)
+            return
+
         # Logging adjustments
         root_logger: logging.Logger = logging.getLogger()
 
@@ -52,28 +58,36 @@ class CommandLineApp:
 
         # Post-process direct options
         if options.opt:
-            LOG.debug(f"Direct Tuning options {options.opt}")
+            LOG.debug("Direct Tuning options %s", options.opt)
             try:
                 parsed_opt = parse_key_value_list(options.opt)
                 options.opt = [parsed_opt]
             except ValueError as exc:
                 self.error(f"Failed to parse 'opt' argument: {exc}", 2)
 
-        if options.version:
-            print(__version__)
+        self.set_caches(options)
+
+        if options.serve:
+            self.serve(options.serve)
             return
 
         if options.list_templates:
+            from yacfg.query import list_templates
+
             LOG.info("Available Templates:")
             print(os.linesep.join(list_templates()))
             return
 
         if options.list_profiles:
+            from yacfg.query import list_profiles
+
             LOG.info("Available Profiles:")
             print(os.linesep.join(list_profiles()))
             return
 
         if options.new_profile or options.new_profile_static:
+            from yacfg.output import new_profile, new_profile_rendered
+
             if not options.profile:
                 self.error("Missing parameters profile", 0)
             else:
@@ -91,6 +105,8 @@ class CommandLineApp:
                     self.error(str(exc), 0)
 
         if options.export_tuning:
+            from yacfg.output import export_tuning_variables
+
             if not options.profile:
                 self.error("Missing parameters profile", 0)
             else:
@@ -100,6 +116,8 @@ class CommandLineApp:
                     self.error(str(exc), 0)
 
         if options.new_template:
+            from yacfg.output import new_template
+
             if not options.template:
                 self.error("Missing parameter template, cannot export", 0)
             else:
@@ -108,25 +126,101 @@ class CommandLineApp:
                 except (TemplateError, IOError, OSError) as exc:
                     self.error(str(exc), 0)
 
+        if options.precompile:
+            self.precompile(*options.precompile)
+
         if (
             options.new_profile
             or options.new_profile_static
             or options.export_tuning
             or options.new_template
+            or options.precompile
         ):
             sys.exit(0)
 
         if not options.profile:
             self.error("Missing parameters profile", 0)
 
+        if options.profile:
+            self.generate(options)
+
+    @staticmethod
+    def set_caches(options) -> None:
+        """Select directories of persistent caches."""
+        if options.bytecode_cache:
+            from yacfg.templates import set_bytecode_cache_dir
+
+            set_bytecode_cache_dir(options.bytecode_cache)
+
+        if options.render_cache:
+            from yacfg.render_cache import set_render_cache_dir
+
+            set_render_cache_dir(options.render_cache)
+
+    def serve(self, socket_path: str) -> None:
+        """Run a render server until interrupted."""
+        from yacfg.server import serve
+
+        try:
+            serve(socket_path)
+        except ServerError as exc:
+            self.error(str(exc))
+
+    def precompile(self, template: str, destination: str) -> None:
+        """Precompile a template set."""
+        from yacfg.output import precompile_template
+
+        try:
+            count = precompile_template(template, destination)
+        except (TemplateError, IOError, OSError) as exc:
+            self.error(str(exc))
+        else:
+            LOG.info(f"Precompiled {count} templates")
+
+    def generate(self, options) -> None:
+        """Generate outputs, via a render server when one is selected."""
+        from yacfg.config_data import GenerateOptions, RenderOptions
+        from yacfg.server import SERVER_SOCKET_ENV, generate_with_server
+        from yacfg.timings import collect, profile
+        from yacfg.yaml_backend import get_backend
+
+        LOG.debug("YAML backend: %s", get_backend())
+
         render_options = RenderOptions(
             boolize(options.render_generator_notice),
             boolize(options.render_licenses),
         )
 
-        if options.profile:
+        # timings are collected in-process only
+        server_socket = None
+        if not (options.timings or options.cprofile):
+            server_socket = options.server or os.getenv(SERVER_SOCKET_ENV)
+
+        if server_socket:
+            generate_func = functools.partial(
+                generate_with_server, socket_path=server_socket
+            )
+        else:
+            from yacfg.yacfg import generate as generate_func
+
+        generate_options = GenerateOptions(
+            jobs=options.jobs,
+            jobs_mode=options.jobs_mode,
+            incremental=options.incremental,
+            reproducible=options.reproducible,
+            fsync=options.fsync,
+            staged_output=options.staged_output,
+            stream=options.stream,
+            # outputs are not used, do not pass them from a server
+            retain_output=not (options.stream or server_socket),
+        )
+
+        with contextlib.ExitStack() as stack:
+            if options.cprofile:
+                stack.enter_context(profile(options.cprofile))
+            timings = stack.enter_context(collect()) if options.timings else None
             try:
-                generate(
+                generate_func(
                     profile=options.profile,
                     template=options.template,
                     output_path=options.output,
@@ -136,9 +230,13 @@ class CommandLineApp:
                     tuning_data_list=options.opt,
                     write_profile_data=options.save_effective_profile,
                     extra_properties_data=options.extra_properties,
+                    generate_options=generate_options,
                 )
             except (TemplateError, ProfileError, GenerationError) as exc:
                 self.error(str(exc))
+            finally:
+                if timings:
+                    print(timings.format(), file=sys.stderr)
 
     @staticmethod
     def error(msg: str, ecode: int = 2) -> None:
@@ -1,32 +1,103 @@
 import datetime
+import os
 import time
 from collections import namedtuple
-from typing import Dict
+from typing import Dict, Optional
 
-from . import NAME, __version__
+import yacfg
+from . import NAME
+from .exceptions import GenerationError
 
 RenderOptions = namedtuple("RenderOptions", ["generator_notice", "licenses"])
 
+# How outputs are generated (see yacfg.generate_core()):
+#   jobs - number of main templates rendered concurrently
+#   jobs_mode - concurrent rendering via 'thread' or 'process' pool
+#   incremental - skip outputs whose inputs did not change since
+#       they were generated to the output path
+#   reproducible - pin the generation time in metadata to
+#       $SOURCE_DATE_EPOCH or 0, so outputs are deterministic
+#   fsync - flush output files to the disk, 'none', 'file'
+#       (every file and the directory) or 'dir' (the directory only)
+#   staged_output - write outputs to a staging directory, which replaces
+#       the output path as a whole when all outputs are generated
+#   stream - write outputs while they are rendered, instead of rendering
+#       every output to memory first (output path required)
+#   retain_output - return generated outputs, when False the returned
+#       mapping is empty, so outputs are not kept in memory
+GenerateOptions = namedtuple(
+    "GenerateOptions",
+    [
+        "jobs",
+        "jobs_mode",
+        "incremental",
+        "reproducible",
+        "fsync",
+        "staged_output",
+        "stream",
+        "retain_output",
+    ],
+    defaults=[1, "thread", False, False, "none", False, False, True],
+)
 
-def add_template_metadata(config_data: Dict) -> None:
+
+# environment variable with a pinned build time (reproducible-builds.org)
+SOURCE_DATE_EPOCH_ENV = "SOURCE_DATE_EPOCH"
+
+
+def get_metadata_timestamp(reproducible: bool = False) -> Optional[int]:
+    """Get a pinned timestamp for templating metadata.
+
+    SOURCE_DATE_EPOCH environment variable is always honored, in
+    reproducible mode without it, the timestamp is pinned to 0 (epoch).
+
+    :param reproducible: Pin the timestamp even without SOURCE_DATE_EPOCH.
+    :type reproducible: bool
+    :return: Unix timestamp, or None to use the current time.
+    :rtype: int | None
+    :raises GenerationError: When SOURCE_DATE_EPOCH is not a valid timestamp.
+    """
+    source_date_epoch = os.getenv(SOURCE_DATE_EPOCH_ENV)
+    if source_date_epoch:
+        try:
+            return int(source_date_epoch)
+        except ValueError:
+            raise GenerationError(
+                f"Invalid {SOURCE_DATE_EPOCH_ENV} value '{source_date_epoch}',"
+                " expected a unix timestamp"
+            )
+    if reproducible:
+        return 0
+    return None
+
+
+def add_template_metadata(config_data: Dict, timestamp: Optional[int] = None) -> None:
     """Add templating metadata to the original template data.
 
     :param config_data: Original template data.
     :type config_data: dict
+    :param timestamp: Pinned unix timestamp of the generation (formatted
+        in UTC), or None to use the current (local) time.
+    :type timestamp: int | None
     """
-    now = datetime.datetime.now()
+    if timestamp is None:
+        now = datetime.datetime.now()
+        unix_time = time.time()
+    else:
+        now = datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc)
+        unix_time = timestamp
     date_format = "%Y-%m-%d"
     time_format = "%H:%M"
 
     config_data["metadata"] = {
         "tool_name": NAME,
-        "tool_version": __version__,
+        "tool_version": yacfg.__version__,
         "datetime": {
             "datetime": now.strftime(f"{date_format} {time_format}"),
             "year": now.strftime("%Y"),
             "time": now.strftime(time_format),
             "date": now.strftime(date_format),
-            "unix": time.time(),
+            "unix": unix_time,
         },
     }
 
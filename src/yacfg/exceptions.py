@@ -14,6 +14,10 @@ class GenerationError(YacfgException):
     """Exception raised for generation-related errors in YACFG."""
 
 
+class ServerError(YacfgException):
+    """Exception raised when a render server is not usable in YACFG."""
+
+
 class ConfigurationError(YacfgException):
     """Exception raised for configuration-related errors in YACFG."""
 
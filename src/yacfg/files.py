@@ -1,14 +1,152 @@
 import importlib.util
 import logging
 import os
-import re
-from typing import NoReturn, Tuple
+from typing import Dict, Iterable, List, NoReturn, Optional, Tuple
 
 from . import NAME
 from .exceptions import ProfileError, TemplateError
 
 LOG = logging.getLogger(NAME)
 
+# profiles written in python, see profiles.load_python_profile()
+PYTHON_PROFILE_SUFFIX = ".py"
+
+
+class PathResolver:
+    """
+    Resolve search paths, profiles and template sets, remembering results.
+
+    The module path and search paths (per environment variable value) are
+    computed once. Selected profiles and template sets are remembered per
+    working directory and search paths; they are validated with a stat of
+    the directories where the candidates live, so adding or removing
+    a profile or a template set is noticed on the next lookup.
+    """
+
+    def __init__(self) -> None:
+        self._module_path: Optional[str] = None
+        self._paths: Dict[Tuple[str, str, Optional[str]], List[str]] = {}
+        self._profiles: Dict[Tuple, Tuple[Tuple, Tuple[str, str]]] = {}
+        self._templates: Dict[Tuple, Tuple[Tuple, str]] = {}
+
+    def reset(self) -> None:
+        """Forget all resolved paths."""
+        self._module_path = None
+        self._paths.clear()
+        self._profiles.clear()
+        self._templates.clear()
+
+    def get_module_path(self) -> str:
+        """
+        Get module installation path, see get_module_path().
+
+        :return: module installation path
+        :rtype: str
+        """
+        if self._module_path is None:
+            self._module_path = find_module_path()
+        return self._module_path
+
+    def get_paths(self, environment_variable: str, subdirectory: str) -> List[str]:
+        """
+        Get search paths, see get_paths().
+
+        :param environment_variable: Name of the environment variable
+        :type environment_variable: str
+        :param subdirectory: Subdirectory name to append to the module installation location
+        :type subdirectory: str
+        :return: List of paths
+        :rtype: list[str]
+        """
+        env_value = os.getenv(environment_variable)
+        key = (environment_variable, subdirectory, env_value)
+        paths = self._paths.get(key)
+        if paths is None:
+            paths = find_paths(environment_variable, subdirectory, env_value)
+            self._paths[key] = paths
+        return list(paths)
+
+    def select_profile_file(self, profile_name: str) -> Tuple[str, str]:
+        """
+        Select profile path and filename, see select_profile_file().
+
+        :param profile_name: profile name, from package or filename from user
+        :raises ProfileError: when requested profile file does not exist
+        :return: selected profile file name and path to directory containing profile file
+        """
+        profiles_paths = get_profiles_paths()
+        key = (profile_name, os.getcwd(), tuple(profiles_paths))
+        name_dir = os.path.dirname(profile_name)
+        signature = stat_signature(
+            [
+                os.path.join("profiles", name_dir),
+                name_dir or os.curdir,
+                *(os.path.join(path, name_dir) for path in profiles_paths),
+            ]
+        )
+
+        cached = self._profiles.get(key)
+        if cached is not None and cached[0] == signature:
+            LOG.debug("Selected profile (cached): %s", cached[1])
+            return cached[1]
+
+        selected = find_profile_file(profile_name)
+        self._profiles[key] = (signature, selected)
+        return selected
+
+    def select_template_dir(self, template_name: str) -> str:
+        """
+        Select template dir path, see select_template_dir().
+
+        :param template_name: template name, from package, or dirname from user
+        :raises TemplateError: when the requested template does not exist
+        :return: selected path to template dir
+        """
+        templates_paths = get_templates_paths()
+        key = (template_name, os.getcwd(), tuple(templates_paths))
+        candidates = [
+            *(os.path.join(path, template_name) for path in templates_paths),
+            os.path.join("templates", template_name),
+            template_name,
+        ]
+        signature = stat_signature(
+            os.path.dirname(candidate) or os.curdir for candidate in candidates
+        )
+
+        cached = self._templates.get(key)
+        # the selected directory itself must still contain the _template file
+        if cached is not None and cached[0] == signature + stat_signature([cached[1]]):
+            LOG.debug("Selected template (cached): %s", cached[1])
+            return cached[1]
+
+        selected = find_template_dir(template_name)
+        self._templates[key] = (signature + stat_signature([selected]), selected)
+        return selected
+
+
+def stat_signature(paths: Iterable[str]) -> Tuple:
+    """
+    Get a signature of paths changing when directory entries are added or removed
+
+    :param paths: paths to directories (missing ones are allowed)
+    :type paths: iterable[str]
+    :return: inode and modification time of every unique path, None if missing
+    :rtype: tuple
+    """
+    signature = []
+    for path in dict.fromkeys(paths):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            signature.append(None)
+        else:
+            signature.append((stat.st_ino, stat.st_mtime_ns))
+    return tuple(signature)
+
+
+# resolver used by the module level functions
+PATH_RESOLVER = PathResolver()
+
 
 def get_module_path() -> str:
     """
@@ -18,6 +156,18 @@ def get_module_path() -> str:
     :return: module installation path
     :rtype: str
 
+    :raises ModuleNotFoundError: when module path is not found
+    """
+    return PATH_RESOLVER.get_module_path()
+
+
+def find_module_path() -> str:
+    """
+    Find module installation path (not cached, see get_module_path)
+
+    :return: module installation path
+    :rtype: str
+
     :raises ModuleNotFoundError: when module path is not found
     """
     module_spec = importlib.util.find_spec(__name__)
@@ -26,7 +176,7 @@ def get_module_path() -> str:
 
     module_path = module_spec.origin
     module_folder = os.path.dirname(module_path)
-    LOG.debug(f"Module path: {module_folder}")
+    LOG.debug("Module path: %s", module_folder)
     return module_folder
 
 
@@ -41,26 +191,66 @@ def get_paths(environment_variable, subdirectory):
     :return: List of paths
     :rtype: list[str]
     """
+    return PATH_RESOLVER.get_paths(environment_variable, subdirectory)
+
+
+def find_paths(environment_variable, subdirectory, env_value):
+    """
+    Get paths from module installation location and the environment
+    variable value (not cached, see get_paths)
+
+    :param environment_variable: Name of the environment variable
+    :type environment_variable: str
+    :param subdirectory: Subdirectory name to append to the module installation location
+    :type subdirectory: str
+    :param env_value: Value of the environment variable
+    :type env_value: str | None
+    :return: List of paths
+    :rtype: list[str]
+    """
     paths = []
 
     # Use module path
     module_path = get_module_path()
     module_subdirectory = os.path.join(module_path, subdirectory)
     paths.append(module_subdirectory)
-    LOG.debug(f"Using module {subdirectory} path {module_subdirectory}")
+    LOG.debug("Using module %s path %s", subdirectory, module_subdirectory)
 
-    env_value = os.getenv(environment_variable)
     if env_value:
         # Use user-defined path
         user_subdirectory = os.path.join(env_value)
         paths.append(user_subdirectory)
         LOG.debug(
-            f'Using user defined ${environment_variable} {subdirectory} path "{user_subdirectory}"'
+            'Using user defined $%s %s path "%s"',
+            environment_variable,
+            subdirectory,
+            user_subdirectory,
         )
 
     return paths
 
 
+# environment variable with the directory of yacfg caches
+CACHE_DIR_ENV = "YACFG_CACHE_DIR"
+
+
+def get_cache_dir() -> str:
+    """
+    Get the directory for persistent caches,
+    $YACFG_CACHE_DIR or $XDG_CACHE_HOME/yacfg (~/.cache/yacfg by default)
+
+    :return: absolute path of the cache directory (it may not exist yet)
+    :rtype: str
+    """
+    cache_dir = os.getenv(CACHE_DIR_ENV)
+    if not cache_dir:
+        cache_home = os.getenv("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        cache_dir = os.path.join(cache_home, NAME)
+    return os.path.abspath(cache_dir)
+
+
 def get_profiles_paths() -> list:
     """
     Helper for getting profiles path from module installation location or environment variable
@@ -91,10 +281,25 @@ def select_profile_file(profile_name: str) -> Tuple[str, str]:
 
     :return: selected profile file name and path to directory containing profile file
     """
-    LOG.debug(f"Selecting profile file: {profile_name}")
+    return PATH_RESOLVER.select_profile_file(profile_name)
+
+
+def find_profile_file(profile_name: str) -> Tuple[str, str]:
+    """
+    Find profile path and filename (not cached, see select_profile_file)
+
+    :param profile_name: profile name, from package or filename from user
+
+    :raises ProfileError: when requested profile file does not exist
+
+    :return: selected profile file name and path to directory containing profile file
+    """
+    LOG.debug("Selecting profile file: %s", profile_name)
+    profiles_paths = get_profiles_paths()
+    LOG.debug("Profiles paths: %s", profiles_paths)
 
     # Default /module/path/profiles path
-    for path in get_profiles_paths():
+    for path in profiles_paths:
         selected_profile_name = profile_name
         selected_profile_path = path
 
@@ -106,7 +311,7 @@ def select_profile_file(profile_name: str) -> Tuple[str, str]:
     user_extra_path = os.path.join("profiles", profile_name)
     if os.path.isfile(user_extra_path):
         # User-defined profile in the ./profiles/ directory
-        LOG.debug(f"User-defined profile in the ./profiles/ directory: {profile_name}")
+        LOG.debug("User-defined profile in the ./profiles/ directory: %s", profile_name)
         profile_tmp_name = os.path.abspath(user_extra_path)
         selected_profile_name, selected_profile_path = os.path.basename(
             profile_tmp_name
@@ -114,20 +319,17 @@ def select_profile_file(profile_name: str) -> Tuple[str, str]:
 
     if os.path.isfile(profile_name):
         # User directly specified the profile file
-        LOG.debug(f"User directly specified the profile file: {profile_name}")
+        LOG.debug("User directly specified the profile file: %s", profile_name)
         profile_tmp_name = os.path.abspath(profile_name)
         selected_profile_name, selected_profile_path = os.path.basename(
             profile_tmp_name
         ), os.path.dirname(profile_tmp_name)
 
-    profiles_paths = get_profiles_paths()
-    LOG.debug(f"Profiles paths: {profiles_paths}")
-
     complete_path = os.path.join(selected_profile_path, selected_profile_name)
     if not os.path.isfile(complete_path):
         raise ProfileError(f"Unable to find the requested profile: {profile_name}")
 
-    LOG.debug(f"Selected profile: {complete_path}")
+    LOG.debug("Selected profile: %s", complete_path)
     return selected_profile_name, selected_profile_path
 
 
@@ -139,6 +341,19 @@ def select_template_dir(template_name: str) -> str:
 
     :raises TemplateError: when the requested template does not exist
 
+    :return: selected path to template dir
+    """
+    return PATH_RESOLVER.select_template_dir(template_name)
+
+
+def find_template_dir(template_name: str) -> str:
+    """
+    Find template dir path (not cached, see select_template_dir)
+
+    :param template_name: template name, from package, or dirname from user
+
+    :raises TemplateError: when the requested template does not exist
+
     :return: selected path to template dir
     """
 
@@ -154,12 +369,12 @@ def select_template_dir(template_name: str) -> str:
 
     if os.path.isdir(user_extra_path):
         selected_template_path = user_extra_path
-        LOG.debug(f"Using user defined template path {template_name}")
+        LOG.debug("Using user defined template path %s", template_name)
 
     # user direct path
     if os.path.isdir(template_name):
         selected_template_path = template_name
-        LOG.debug(f"Using user defined template path {template_name}")
+        LOG.debug("Using user defined template path %s", template_name)
 
     if not os.path.isdir(selected_template_path):
         raise TemplateError(f'Unable to load requested template set "{template_name}"')
@@ -170,7 +385,7 @@ def select_template_dir(template_name: str) -> str:
             ' "_template" file, so it is not considered a template'
         )
 
-    LOG.debug(f"Selected template: {selected_template_path}")
+    LOG.debug("Selected template: %s", selected_template_path)
     return selected_template_path
 
 
@@ -185,14 +400,14 @@ def ensure_output_path(output_path: str) -> None:
     """
     try:
         os.makedirs(output_path, exist_ok=True)
-        LOG.debug(f"Created directory {output_path}")
+        LOG.debug("Created directory %s", output_path)
     except FileExistsError:
         if not os.path.isdir(output_path):
             raise NotADirectoryError(
                 f'Output path "{output_path}" already exists and it is not a directory!'
             )
         else:
-            LOG.debug(f"Requested directory {output_path} exists")
+            LOG.debug("Requested directory %s exists", output_path)
 
 
 def get_output_filename(template_name: str) -> str:
@@ -207,10 +422,12 @@ def get_output_filename(template_name: str) -> str:
     :return: output filename based on the template name
     :rtype: str
     """
-    LOG.debug(f"Getting output filename: {template_name}")
+    if not isinstance(template_name, str):
+        raise TypeError(f"Template name must be a string, not {template_name!r}")
 
-    match = re.match(r"^(.*)(\.jinja2)$", template_name)
-    output_filename = match.group(1) if match else template_name
+    output_filename = template_name
+    if template_name.endswith(".jinja2"):
+        output_filename = template_name[: -len(".jinja2")]
 
-    LOG.debug(f"Output filename: {output_filename}")
+    LOG.debug("Output filename of %s: %s", template_name, output_filename)
     return output_filename
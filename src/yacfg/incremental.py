@@ -0,0 +1,380 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from jinja2 import Environment, TemplateNotFound, TemplateSyntaxError, meta
+
+import yacfg
+from . import NAME
+
+LOG: logging.Logger = logging.getLogger(NAME)
+
+# manifest of generated outputs, stored in the output directory
+MANIFEST_FILENAME = ".yacfg-manifest.json"
+MANIFEST_VERSION = 1
+
+# (template name, source digest) -> directly referenced templates,
+# None when a reference is not a literal name
+_references_cache: Dict[Tuple[str, str], Optional[Tuple[str, ...]]] = {}
+
+# template source digest and references
+SourceInfo = Tuple[Optional[str], Optional[Tuple[str, ...]]]
+
+
+def digest(data: str) -> str:
+    """
+    Get the digest of text data.
+
+    :param data: Text data.
+    :type data: str
+    :return: Hex digest (sha256).
+    :rtype: str
+    """
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def data_fingerprint(
+    config_data: Dict[str, Any],
+    extra_properties_data: Optional[Dict[str, str]],
+    pinned_time: bool = False,
+) -> Optional[str]:
+    """
+    Get the fingerprint of render data shared by all outputs.
+
+    The generation date and time in metadata is left out when it is the
+    current time, so an output is not considered changed just because
+    of a new generation. A pinned time (reproducible mode or
+    SOURCE_DATE_EPOCH) is a part of the fingerprint, so outputs are
+    generated again for another pinned time.
+
+    :param config_data: Configuration data for templating.
+    :type config_data: dict
+    :param extra_properties_data: Extra properties of the render.
+    :type extra_properties_data: dict[str, str] | None
+    :param pinned_time: Generation time in metadata is pinned.
+    :type pinned_time: bool
+    :return: Fingerprint, or None if the data cannot be serialized.
+    :rtype: str | None
+    """
+    data = dict(config_data)
+    metadata = dict(data.get("metadata") or {})
+    if not pinned_time:
+        metadata.pop("datetime", None)
+    data["metadata"] = metadata
+    try:
+        serialized = json.dumps(
+            [yacfg.__version__, data, extra_properties_data],
+            sort_keys=True,
+            default=str,
+        )
+    except (TypeError, ValueError) as exc:
+        LOG.debug("Render data not fingerprinted: %s", exc)
+        return None
+    return digest(serialized)
+
+
+def is_unchanged_file(path: str, content: str) -> bool:
+    """
+    Check whether a file already has the content.
+
+    :param path: File path.
+    :type path: str
+    :param content: Expected content.
+    :type content: str
+    :return: True if the file exists with the same content.
+    :rtype: bool
+    """
+    try:
+        with open(path, "r") as file:
+            return file.read() == content
+    except (OSError, ValueError):
+        return False
+
+
+def template_references(
+    env: Environment, template_name: str, source: str
+) -> Optional[Tuple[str, ...]]:
+    """
+    Get templates directly referenced (extends, include, import) by a template.
+
+    :param env: Jinja2 template environment.
+    :type env: Environment
+    :param template_name: Template name.
+    :type template_name: str
+    :param source: Template source.
+    :type source: str
+    :return: Referenced template names,
+        None if some reference is not a literal name (or a syntax error).
+    :rtype: tuple[str] | None
+    """
+    key = (template_name, digest(source))
+    if key not in _references_cache:
+        try:
+            references = tuple(meta.find_referenced_templates(env.parse(source)))
+        except TemplateSyntaxError:
+            # reported by the render
+            references = (None,)
+        _references_cache[key] = None if None in references else references
+    return _references_cache[key]
+
+
+def template_source_info(env: Environment, template_name: str) -> SourceInfo:
+    """
+    Get the source digest and references of a template.
+
+    :param env: Jinja2 template environment.
+    :type env: Environment
+    :param template_name: Template name.
+    :type template_name: str
+    :return: Source digest (None when the template does not exist)
+        and referenced templates (see template_references()).
+    :rtype: tuple
+    """
+    try:
+        source, _, _ = env.loader.get_source(env, template_name)
+    except TemplateNotFound:
+        # e.g. an optional include
+        return None, ()
+    return digest(source), template_references(env, template_name, source)
+
+
+def template_fingerprint(
+    env: Environment,
+    template_name: str,
+    sources_info: Optional[Dict[str, SourceInfo]] = None,
+) -> Optional[str]:
+    """
+    Get the fingerprint of a template source with all transitively
+    referenced template sources.
+
+    :param env: Jinja2 template environment.
+    :type env: Environment
+    :param template_name: Main template name.
+    :type template_name: str
+    :param sources_info: Already known template sources info, shared by
+        fingerprints of templates including the same templates.
+    :type sources_info: dict | None
+    :return: Fingerprint, or None if the references cannot be determined.
+    :rtype: str | None
+    """
+    if env.loader is None:
+        return None
+    if sources_info is None:
+        sources_info = {}
+
+    sources: List[Tuple[str, Optional[str]]] = []
+    seen: Set[str] = set()
+    pending = [template_name]
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        if name not in sources_info:
+            sources_info[name] = template_source_info(env, name)
+        source_digest, references = sources_info[name]
+        sources.append((name, source_digest))
+        if references is None:
+            LOG.debug("Template %s has dynamic references", name)
+            return None
+        pending.extend(references)
+
+    return digest(json.dumps(sorted(sources, key=lambda item: item[0])))
+
+
+class OutputFingerprints(object):
+    """
+    Fingerprints of the inputs of outputs: render data, extra properties,
+    template sources including references and the yacfg version.
+
+    :param env: Jinja2 template environment.
+    :type env: Environment
+    :param config_data: Configuration data for templating.
+    :type config_data: dict
+    :param extra_properties_data: Extra properties of the render.
+    :type extra_properties_data: dict[str, str] | None
+    :param pinned_time: Generation time in metadata is pinned
+        (see data_fingerprint()).
+    :type pinned_time: bool
+    """
+
+    def __init__(
+        self,
+        env: Environment,
+        config_data: Dict[str, Any],
+        extra_properties_data: Optional[Dict[str, str]] = None,
+        pinned_time: bool = False,
+    ) -> None:
+        self.env = env
+        self.data_fingerprint = data_fingerprint(
+            config_data, extra_properties_data, pinned_time
+        )
+        self.sources_info: Dict[str, SourceInfo] = {}
+
+    def fingerprint(self, template_name: str) -> Optional[str]:
+        """
+        Get the fingerprint of inputs of an output.
+
+        :param template_name: Main template name.
+        :type template_name: str
+        :return: Fingerprint, or None when it cannot be determined.
+        :rtype: str | None
+        """
+        if self.data_fingerprint is None:
+            return None
+        sources_fingerprint = template_fingerprint(
+            self.env, template_name, self.sources_info
+        )
+        if sources_fingerprint is None:
+            return None
+        return digest(
+            f"{template_name}\n{self.data_fingerprint}\n{sources_fingerprint}"
+        )
+
+
+class OutputManifest(OutputFingerprints):
+    """
+    Fingerprints of the outputs generated into an output directory.
+
+    An output is up to date, when the fingerprint of its inputs
+    (see OutputFingerprints) matches the manifest and the output file
+    was not modified since it was generated.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        env: Environment,
+        config_data: Dict[str, Any],
+        extra_properties_data: Optional[Dict[str, str]] = None,
+        pinned_time: bool = False,
+    ) -> None:
+        super().__init__(env, config_data, extra_properties_data, pinned_time)
+        self.path = os.path.join(output_path, MANIFEST_FILENAME)
+        self.output_path = output_path
+        self.outputs: Dict[str, Dict[str, str]] = self.load()
+
+    def load(self) -> Dict[str, Dict[str, str]]:
+        """
+        Load outputs of the stored manifest.
+
+        :return: Output filename -> {"fingerprint": ..., "digest": ...}
+        :rtype: dict
+        """
+        try:
+            with open(self.path, "r") as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(manifest, dict) or manifest.get("version") != (
+            MANIFEST_VERSION
+        ):
+            return {}
+        return manifest.get("outputs") or {}
+
+    def dumps(self) -> str:
+        """
+        Serialize the manifest, to be stored as MANIFEST_FILENAME
+        in the output directory.
+
+        :return: Manifest in JSON.
+        :rtype: str
+        """
+        return json.dumps(
+            {"version": MANIFEST_VERSION, "outputs": self.outputs},
+            indent=1,
+            sort_keys=True,
+        )
+
+    def read_output(self, out_filename: str) -> Optional[str]:
+        """
+        Read the current content of an output file.
+
+        :param out_filename: Output file name.
+        :type out_filename: str
+        :return: Content, None if the file cannot be read.
+        :rtype: str | None
+        """
+        try:
+            with open(os.path.join(self.output_path, out_filename), "r") as file:
+                return file.read()
+        except (OSError, ValueError):
+            return None
+
+    def up_to_date_output(
+        self, out_filename: str, fingerprint: Optional[str]
+    ) -> Optional[str]:
+        """
+        Get the content of an output when it is up to date.
+
+        :param out_filename: Output file name.
+        :type out_filename: str
+        :param fingerprint: Current fingerprint of the output inputs.
+        :type fingerprint: str | None
+        :return: Current output content, None if it has to be generated.
+        :rtype: str | None
+        """
+        entry = self.outputs.get(out_filename)
+        if fingerprint is None or not entry or entry["fingerprint"] != fingerprint:
+            return None
+        content = self.read_output(out_filename)
+        if content is None or digest(content) != entry["digest"]:
+            return None
+        return content
+
+    def is_unchanged(self, out_filename: str, content: str) -> bool:
+        """
+        Check whether the output file already has the content.
+
+        :param out_filename: Output file name.
+        :type out_filename: str
+        :param content: Generated content.
+        :type content: str
+        :return: True if writing the file can be skipped.
+        :rtype: bool
+        """
+        return is_unchanged_file(os.path.join(self.output_path, out_filename), content)
+
+    def update(
+        self, out_filename: str, fingerprint: Optional[str], content: Optional[str]
+    ) -> None:
+        """
+        Record a generated output, or forget it (without fingerprint or content).
+
+        :param out_filename: Output file name.
+        :type out_filename: str
+        :param fingerprint: Fingerprint of the output inputs.
+        :type fingerprint: str | None
+        :param content: Generated content.
+        :type content: str | None
+        """
+        self.record(
+            out_filename, fingerprint, None if content is None else digest(content)
+        )
+
+    def record(
+        self,
+        out_filename: str,
+        fingerprint: Optional[str],
+        content_digest: Optional[str],
+    ) -> None:
+        """
+        Record a generated output by the digest of its content (see digest()),
+        e.g. of a streamed output, or forget it.
+
+        :param out_filename: Output file name.
+        :type out_filename: str
+        :param fingerprint: Fingerprint of the output inputs.
+        :type fingerprint: str | None
+        :param content_digest: Digest of the generated content.
+        :type content_digest: str | None
+        """
+        if fingerprint is None or content_digest is None:
+            self.outputs.pop(out_filename, None)
+        else:
+            self.outputs[out_filename] = {
+                "fingerprint": fingerprint,
+                "digest": content_digest,
+            }
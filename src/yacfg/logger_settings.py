@@ -1,12 +1,51 @@
 import logging
-from logging.handlers import RotatingFileHandler
-from typing import Optional
+from typing import Any, Callable, Optional
 
 from . import NAME
 
 LOG: logging.Logger = logging.getLogger(NAME)
 
 
+class LazyLogArgument:
+    """
+    Log message argument computed only when the message is formatted.
+
+    Pass it as an argument of a %-style log call, e.g.
+    LOG.debug("Data:\n%s", lazy(yaml.dump, data)), the function is not
+    called at all when the record is not emitted, and only once when it is
+    formatted by several handlers.
+    """
+
+    __slots__ = ("func", "args", "kwargs", "_value")
+
+    def __init__(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self._value: Optional[str] = None
+
+    def __str__(self) -> str:
+        if self._value is None:
+            self._value = str(self.func(*self.args, **self.kwargs))
+        return self._value
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+def lazy(func: Callable[..., Any], *args: Any, **kwargs: Any) -> LazyLogArgument:
+    """
+    Defer an expensive computation of a log message argument.
+
+    :param func: Function returning the value to be logged.
+    :param args: Positional arguments of the function.
+    :param kwargs: Keyword arguments of the function.
+    :return: Lazy log argument.
+    :rtype: LazyLogArgument
+    """
+    return LazyLogArgument(func, *args, **kwargs)
+
+
 def config_console_logger(
     filename: Optional[str] = None,
     fmt: Optional[str] = None,
@@ -77,10 +116,12 @@ def config_console_logger(
 
     # File logging
     if filename:
+        from logging.handlers import RotatingFileHandler
+
         file_handler = RotatingFileHandler(
             filename, maxBytes=max_bytes, backupCount=backup_count
         )
         file_formatter = logging.Formatter(fmt, datefmt=datefmt)
         file_handler.setFormatter(file_formatter)
         logging.getLogger().addHandler(file_handler)
-        LOG.debug(f"Added file handler to the logger with filename: {filename}.")
+        LOG.debug("Added file handler to the logger with filename: %s.", filename)
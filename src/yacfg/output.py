@@ -1,18 +1,25 @@
 import logging
 import os
 import shutil
-from typing import Any, Dict, List, Optional
-
-import yaml
+import threading
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
 
 from . import NAME, exceptions, files, profiles
+from .precompiled import compile_environment
+from .templates import get_template_environment
+from .yaml_backend import IndentedSafeDumper, dump_yaml
 
 LOG: logging.Logger = logging.getLogger(NAME)
 
+# OutputWriter fsync modes
+FSYNC_NONE = "none"
+FSYNC_FILE = "file"
+FSYNC_DIR = "dir"
+FSYNC_MODES = (FSYNC_NONE, FSYNC_FILE, FSYNC_DIR)
 
-class MyDumper(yaml.SafeDumper):
-    def increase_indent(self, flow: bool = False, indentless: bool = False) -> None:
-        return super().increase_indent(flow, False)
+# kept for compatibility, see IndentedSafeDumper
+MyDumper = IndentedSafeDumper
 
 
 def yaml_dump_wrapper(data: Dict[str, Any]) -> str:
@@ -24,9 +31,9 @@ def yaml_dump_wrapper(data: Dict[str, Any]) -> str:
     :return: Dumped YAML data as a string.
     :rtype: str
     """
-    return yaml.dump(
-        data=data,
-        Dumper=MyDumper,
+    return dump_yaml(
+        data,
+        indent_sequences=True,
         default_flow_style=False,
         explicit_start=True,
         explicit_end=False,
@@ -59,6 +66,7 @@ def new_profile_rendered(
     dest_profile: str,
     tuning_files: Optional[List[str]] = None,
     tuning_data_list: Optional[List[Dict[str, Any]]] = None,
+    fsync: str = FSYNC_NONE,
 ) -> None:
     """
     Export an existing profile in static form, stripped defaults section.
@@ -71,6 +79,9 @@ def new_profile_rendered(
     :type tuning_files: list[str], optional
     :param tuning_data_list: User-specified tuning data list provided directly, defaults to None.
     :type tuning_data_list: list[dict], optional
+    :param fsync: Flush the exported profile to the disk,
+        see OutputWriter for the modes.
+    :type fsync: str
     :raises OSError: If there is a problem with the destination path.
     """
     config_data, _ = profiles.get_tuned_profile(profile, tuning_files, tuning_data_list)
@@ -85,9 +96,11 @@ def new_profile_rendered(
     export_data: str = yaml_dump_wrapper(config_data)
 
     export_data = (
-        f"# {NAME} tuning file generated from profile {profile}\n{export_data}"
+        f"{profiles.STATIC_PROFILE_MARKER} generated from profile {profile}\n"
+        f"{export_data}"
     )
-    write_output(dest_name, dest_path, export_data)
+    with OutputWriter(dest_path, fsync=fsync) as writer:
+        writer.write(dest_name, export_data)
 
 
 def new_template(template: str, dest_template: str) -> None:
@@ -104,6 +117,30 @@ def new_template(template: str, dest_template: str) -> None:
     shutil.copytree(template_path, dest_template, symlinks=False)
 
 
+def precompile_template(template: str, dest: str) -> int:
+    """
+    Precompile all templates reachable from a template set (its templates,
+    and libraries of the templates paths) to Python modules, used instead
+    of compiling the templates when $YACFG_PRECOMPILED selects them.
+
+    :param template: Existing template name (from user or packaged).
+    :type template: str
+    :param dest: Destination directory, or zip file (ending with .zip).
+    :type dest: str
+    :return: Number of precompiled templates.
+    :rtype: int
+    :raises TemplateError: If there is a problem with the selected template.
+    :raises OSError: If there is a problem with the destination path.
+    """
+    env = get_template_environment(template)
+
+    dest_path: str = os.path.dirname(dest)
+    if dest_path:
+        files.ensure_output_path(dest_path)
+
+    return compile_environment(env, dest)
+
+
 def export_tuning_variables(profile_name: str, dest_file: str) -> None:
     """
     Export a subsection of profile's tunable variables to a new YAML file.
@@ -128,7 +165,7 @@ def export_tuning_variables(profile_name: str, dest_file: str) -> None:
 
     export_data: str = yaml_dump_wrapper(defaults_data)
 
-    LOG.debug(f"Exported tuning data:\n{export_data}")
+    LOG.debug("Exported tuning data:\n%s", export_data)
     export_data = (
         f"# {NAME} tuning file generated from profile {profile_name}\n{export_data}"
     )
@@ -136,22 +173,226 @@ def export_tuning_variables(profile_name: str, dest_file: str) -> None:
     LOG.info("Tuning data exported")
 
 
-def write_output(filename: str, output_path: str, content: str) -> None:
+def write_output(
+    filename: str, output_path: str, content: str, fsync: bool = False
+) -> None:
     """
     Write content to the specified file.
 
+    The content is written to a temporary file in the same directory,
+    which then atomically replaces the file (keeping its permissions),
+    so readers never see a partially written file.
+
     :param filename: Name of the file.
     :type filename: str
     :param output_path: Path to the output directory.
     :type output_path: str
     :param content: Content to write to the file.
     :type content: str
+    :param fsync: Flush the file to the disk before it replaces the old one.
+    :type fsync: bool
+    :raises OSError: If there is a problem with the output path or writing the file.
+    """
+    write_output_chunks(filename, output_path, (content,), fsync=fsync)
+
+
+def write_output_chunks(
+    filename: str, output_path: str, chunks: Iterable[str], fsync: bool = False
+) -> None:
+    """
+    Write content produced in chunks (e.g. a streamed render)
+    to the specified file, see write_output().
+
+    When the chunks iterator raises, the file is left untouched.
+
+    :param filename: Name of the file.
+    :type filename: str
+    :param output_path: Path to the output directory.
+    :type output_path: str
+    :param chunks: Content to write to the file.
+    :type chunks: Iterable[str]
+    :param fsync: Flush the file to the disk before it replaces the old one.
+    :type fsync: bool
     :raises OSError: If there is a problem with the output path or writing the file.
     """
     output_file = os.path.join(output_path, filename)
+    file_dir, file_name = os.path.split(output_file)
+    tmp_file = os.path.join(
+        file_dir, f".{file_name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
     try:
-        with open(output_file, "w") as file:
-            file.write(content)
-        LOG.debug(f"Successfully wrote content to {output_file}")
+        try:
+            with open(tmp_file, "w") as file:
+                for chunk in chunks:
+                    file.write(chunk)
+                if fsync:
+                    file.flush()
+                    os.fsync(file.fileno())
+            try:
+                shutil.copymode(output_file, tmp_file)
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_file, output_file)
+        except BaseException:
+            if os.path.lexists(tmp_file):
+                os.unlink(tmp_file)
+            raise
+        LOG.debug("Successfully wrote content to %s", output_file)
     except OSError as e:
         raise OSError(f"Error writing content to {output_file}: {e}") from e
+
+
+def fsync_dir(path: str) -> None:
+    """
+    Flush directory entries (created, renamed files) to the disk.
+
+    :param path: Directory path.
+    :type path: str
+    """
+    fd = os.open(path or os.curdir, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class OutputWriter(object):
+    """
+    Writes output files of a single generation into an output directory.
+
+    Every file is written atomically (see write_output()). Depending on
+    fsync mode, nothing is flushed to the disk (FSYNC_NONE), every file is
+    flushed before it replaces the old one and the directory once at the
+    end (FSYNC_FILE), or only the directory is flushed once at the end
+    (FSYNC_DIR).
+
+    Staged writer writes into a temporary sibling directory, which replaces
+    the output directory as a whole on commit(). Files of the output
+    directory that were not written are carried over (hard linked when
+    possible), so readers see either the old or the new set of files.
+    On abort() (e.g. a failed generation) the output directory is left
+    untouched.
+
+    Use as a context manager, which commits on success and aborts on error.
+    """
+
+    def __init__(
+        self, output_path: str, fsync: str = FSYNC_NONE, staged: bool = False
+    ) -> None:
+        if fsync not in FSYNC_MODES:
+            raise ValueError(
+                f"Unknown fsync mode '{fsync}', use one of {', '.join(FSYNC_MODES)}"
+            )
+        self.output_path = output_path
+        self.fsync = fsync
+        self.staged = staged
+        self.written: List[str] = []
+        self.path = output_path
+        if staged:
+            self.path = _make_sibling_dir(output_path, "staged")
+
+    def __enter__(self) -> "OutputWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def write(self, filename: str, content: str) -> None:
+        """
+        Write an output file.
+
+        :param filename: Name of the file (relative to the output directory).
+        :type filename: str
+        :param content: Content of the file.
+        :type content: str
+        :raises OSError: If there is a problem writing the file.
+        """
+        write_output(filename, self.path, content, fsync=self.fsync == FSYNC_FILE)
+        self.written.append(filename)
+
+    def write_chunks(self, filename: str, chunks: Iterable[str]) -> None:
+        """
+        Write an output file produced in chunks (see write_output_chunks()).
+
+        :param filename: Name of the file (relative to the output directory).
+        :type filename: str
+        :param chunks: Content of the file.
+        :type chunks: Iterable[str]
+        :raises OSError: If there is a problem writing the file.
+        """
+        write_output_chunks(filename, self.path, chunks, fsync=self.fsync == FSYNC_FILE)
+        self.written.append(filename)
+
+    def commit(self) -> None:
+        """
+        Make written files durable (according to fsync mode)
+        and, when staged, swap the staged directory in.
+
+        :raises OSError: If there is a problem replacing the output directory.
+        """
+        if self.fsync != FSYNC_NONE:
+            fsync_dir(self.path)
+        if not self.staged:
+            return
+
+        output_dir = os.path.abspath(self.output_path)
+        old_dir = None
+        if os.path.isdir(output_dir):
+            self._carry_over(output_dir)
+            shutil.copymode(output_dir, self.path)
+            old_dir = _make_sibling_dir(output_dir, "old")
+            os.replace(output_dir, os.path.join(old_dir, "output"))
+        os.replace(self.path, output_dir)
+        self.path = self.output_path
+        LOG.debug("Staged output swapped into %s", output_dir)
+
+        if self.fsync != FSYNC_NONE:
+            fsync_dir(os.path.dirname(output_dir))
+        if old_dir:
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+    def abort(self) -> None:
+        """Drop the staged directory, the output directory is left untouched."""
+        if self.staged and self.path != self.output_path:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self.path = self.output_path
+
+    def _carry_over(self, output_dir: str) -> None:
+        """Link (or copy) entries of the output directory not written."""
+        for entry in os.scandir(output_dir):
+            target = os.path.join(self.path, entry.name)
+            if os.path.lexists(target):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                shutil.copytree(entry.path, target, symlinks=True, copy_function=_link)
+            else:
+                _link(entry.path, target)
+
+
+def _link(src: str, dst: str) -> None:
+    """Hard link a file (copy it when linking is not possible)."""
+    if os.path.islink(src):
+        os.symlink(os.readlink(src), dst)
+        return
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _make_sibling_dir(path: str, kind: str) -> str:
+    """Create a new hidden directory next to the path."""
+    path = os.path.abspath(path)
+    while True:
+        sibling = os.path.join(
+            os.path.dirname(path),
+            f".{os.path.basename(path)}.{kind}-{uuid.uuid4().hex[:12]}",
+        )
+        try:
+            os.mkdir(sibling)
+        except FileExistsError:
+            continue
+        return sibling
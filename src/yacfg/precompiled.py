@@ -0,0 +1,277 @@
+import json
+import logging
+import os
+import zipfile
+from typing import Any, Dict, List, Optional, Tuple
+
+import jinja2
+from jinja2 import Environment, FileSystemLoader, ModuleLoader, Template
+from jinja2.loaders import split_template_path
+
+from . import NAME
+from .exceptions import TemplateError
+
+LOG: logging.Logger = logging.getLogger(NAME)
+
+# environment variable with precompiled template artifacts (os.pathsep separated)
+PRECOMPILED_ENV = "YACFG_PRECOMPILED"
+
+# manifest of a precompiled artifact, stored in the directory or the zip file
+MANIFEST_NAME = "yacfg-precompiled.json"
+MANIFEST_VERSION = 1
+
+# templates are the files with these extensions
+TEMPLATE_EXTENSIONS = ("jinja2", "j2")
+
+
+def get_precompiled_paths() -> Tuple[str, ...]:
+    """
+    Get precompiled template artifacts selected by the user.
+
+    :return: Absolute artifact paths (directories or zip files).
+    :rtype: tuple[str]
+    """
+    value = os.getenv(PRECOMPILED_ENV)
+    if not value:
+        return ()
+    return tuple(os.path.abspath(path) for path in value.split(os.pathsep) if path)
+
+
+def compile_options(env: Environment) -> Dict[str, Any]:
+    """
+    Get the environment settings compiled templates depend on.
+
+    :param env: Jinja2 environment.
+    :type env: Environment
+    :return: Settings, stored in the artifact manifest.
+    :rtype: dict
+    """
+    return {
+        "jinja2": jinja2.__version__,
+        "extensions": sorted(env.extensions),
+        "trim_blocks": env.trim_blocks,
+        "lstrip_blocks": env.lstrip_blocks,
+        "keep_trailing_newline": env.keep_trailing_newline,
+        "autoescape": repr(env.autoescape),
+        "delimiters": [
+            env.block_start_string,
+            env.block_end_string,
+            env.variable_start_string,
+            env.variable_end_string,
+            env.comment_start_string,
+            env.comment_end_string,
+        ],
+    }
+
+
+def find_source(search_path: List[str], template_name: str) -> Optional[str]:
+    """
+    Find the source file of a template, like FileSystemLoader does.
+
+    :param search_path: Template directories.
+    :type search_path: list[str]
+    :param template_name: Template name.
+    :type template_name: str
+    :return: Source file path, None when not found.
+    :rtype: str | None
+    """
+    try:
+        pieces = split_template_path(template_name)
+    except jinja2.TemplateNotFound:
+        return None
+    for path in search_path:
+        filename = os.path.join(path, *pieces)
+        if os.path.isfile(filename):
+            return filename
+    return None
+
+
+def source_signature(filename: Optional[str]) -> Optional[List[Any]]:
+    """
+    Get the signature of a template source file, it changes with the content.
+
+    :param filename: Source file path.
+    :type filename: str | None
+    :return: [path, modification time (ns), size], None when missing.
+    :rtype: list | None
+    """
+    if filename is None:
+        return None
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return [filename, stat.st_mtime_ns, stat.st_size]
+
+
+def compile_environment(env: Environment, dest: str) -> int:
+    """
+    Compile all templates of the environment search path to Python modules,
+    in a directory or a zip file (when dest ends with .zip), with
+    a manifest to check the modules are up to date with their sources.
+
+    :param env: Jinja2 environment with a file system loader.
+    :type env: Environment
+    :param dest: Artifact path, directory or zip file.
+    :type dest: str
+    :return: Number of compiled templates.
+    :rtype: int
+    :raises TemplateError: If the environment has no file system loader.
+    """
+    loader = env.loader
+    if not isinstance(loader, FileSystemLoader):
+        raise TemplateError(
+            "Unable to precompile templates, a file system loader is required."
+        )
+    search_path = [os.path.abspath(path) for path in loader.searchpath]
+
+    # sources are recorded before compiling, so a source modified meanwhile
+    # is not considered up to date
+    templates = {}
+    for template_name in env.list_templates(extensions=TEMPLATE_EXTENSIONS):
+        signature = source_signature(find_source(search_path, template_name))
+        if signature is not None:
+            templates[template_name] = signature
+
+    use_zip = dest.endswith(".zip")
+    if not use_zip and os.path.exists(os.path.join(dest, MANIFEST_NAME)):
+        # the artifact is not used while it is being replaced
+        os.unlink(os.path.join(dest, MANIFEST_NAME))
+
+    env.compile_templates(
+        dest,
+        filter_func=templates.__contains__,
+        zip="deflated" if use_zip else None,
+        log_function=LOG.debug,
+    )
+
+    if use_zip:
+        with zipfile.ZipFile(dest, "r") as artifact:
+            compiled = set(artifact.namelist())
+    else:
+        compiled = set(os.listdir(dest))
+    # templates with syntax errors are not compiled
+    templates = {
+        template_name: signature
+        for template_name, signature in templates.items()
+        if ModuleLoader.get_module_filename(template_name) in compiled
+    }
+
+    manifest = json.dumps(
+        {
+            "version": MANIFEST_VERSION,
+            "search_path": search_path,
+            "options": compile_options(env),
+            "templates": templates,
+        },
+        indent=1,
+        sort_keys=True,
+    )
+    if use_zip:
+        with zipfile.ZipFile(dest, "a") as artifact:
+            artifact.writestr(MANIFEST_NAME, manifest)
+    else:
+        from .output import write_output
+
+        write_output(MANIFEST_NAME, dest, manifest)
+
+    LOG.info("Precompiled %d templates into %s", len(templates), dest)
+    return len(templates)
+
+
+def load_manifest(artifact: str) -> Optional[Dict[str, Any]]:
+    """
+    Load the manifest of a precompiled artifact.
+
+    :param artifact: Artifact path, directory or zip file.
+    :type artifact: str
+    :return: Manifest, None when the artifact is not usable.
+    :rtype: dict | None
+    """
+    try:
+        if zipfile.is_zipfile(artifact):
+            with zipfile.ZipFile(artifact, "r") as artifact_zip:
+                manifest = json.loads(artifact_zip.read(MANIFEST_NAME))
+        else:
+            with open(os.path.join(artifact, MANIFEST_NAME), "r") as manifest_file:
+                manifest = json.load(manifest_file)
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile) as exc:
+        LOG.debug("Precompiled templates %s not usable: %s", artifact, exc)
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def select_artifact(
+    env: Environment, search_path: Tuple[str, ...], artifacts: Tuple[str, ...]
+) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Select the first artifact precompiled for the environment.
+
+    :param env: Jinja2 environment.
+    :type env: Environment
+    :param search_path: Absolute template directories of the environment.
+    :type search_path: tuple[str]
+    :param artifacts: Artifact paths.
+    :type artifacts: tuple[str]
+    :return: Artifact path and its manifest, None when there is none.
+    :rtype: tuple[str, dict] | None
+    """
+    options = compile_options(env)
+    for artifact in artifacts:
+        manifest = load_manifest(artifact)
+        if (
+            manifest is not None
+            and manifest.get("search_path") == list(search_path)
+            and manifest.get("options") == options
+        ):
+            return artifact, manifest
+    return None
+
+
+class PrecompiledLoader(FileSystemLoader):
+    """
+    File system loader loading templates from precompiled modules
+    (see compile_environment()), as long as their sources did not change
+    since they were compiled. Other templates are compiled from sources.
+    """
+
+    def __init__(
+        self, search_path: Tuple[str, ...], artifact: str, manifest: Dict[str, Any]
+    ) -> None:
+        super().__init__(list(search_path))
+        self.artifact = artifact
+        self.module_loader = ModuleLoader(artifact)
+        self.templates: Dict[str, List[Any]] = manifest.get("templates", {})
+
+    def is_compiled(self, template_name: str) -> bool:
+        """
+        Check whether the precompiled template is up to date with its source.
+
+        :param template_name: Template name.
+        :type template_name: str
+        :return: True when the precompiled module can be used.
+        :rtype: bool
+        """
+        signature = self.templates.get(template_name)
+        return signature is not None and signature == source_signature(
+            find_source(self.searchpath, template_name)
+        )
+
+    def load(
+        self,
+        environment: Environment,
+        name: str,
+        globals: Optional[Dict[str, Any]] = None,
+    ) -> Template:
+        if self.is_compiled(name):
+            try:
+                template = self.module_loader.load(environment, name, globals)
+            except jinja2.TemplateNotFound:
+                LOG.debug("Precompiled template %s missing", name)
+            else:
+                # like templates loaded from sources, reloaded when changed
+                template._uptodate = lambda: self.is_compiled(name)
+                return template
+        return super().load(environment, name, globals)
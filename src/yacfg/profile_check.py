@@ -0,0 +1,365 @@
+import argparse
+import concurrent.futures
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import yacfg
+from . import NAME, logger_settings
+from .exceptions import ProfileError, YacfgException
+
+LOG: logging.Logger = logging.getLogger(NAME)
+
+# checks of a profile, in the order they run
+CHECK_GENERATE = "generate"
+CHECK_NEW_PROFILE = "new_profile"
+CHECK_NEW_PROFILE_STATIC = "new_profile_static"
+CHECK_LINT_STATIC = "lint_static"
+CHECK_EXPORT_TUNING = "export_tuning"
+CHECK_LINT_TUNING = "lint_tuning"
+CHECK_TUNE = "tune"
+CHECKS = (
+    CHECK_GENERATE,
+    CHECK_NEW_PROFILE,
+    CHECK_NEW_PROFILE_STATIC,
+    CHECK_LINT_STATIC,
+    CHECK_EXPORT_TUNING,
+    CHECK_LINT_TUNING,
+    CHECK_TUNE,
+)
+
+# check -> check whose output it uses, skipped when that one did not pass
+CHECK_DEPENDENCIES = {
+    CHECK_LINT_STATIC: CHECK_NEW_PROFILE_STATIC,
+    CHECK_LINT_TUNING: CHECK_EXPORT_TUNING,
+    CHECK_TUNE: CHECK_EXPORT_TUNING,
+}
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+
+REPORT_VERSION = 1
+
+# yamllint configuration files looked up in the working directory,
+# like the yamllint command does
+YAMLLINT_CONFIG_FILES = (".yamllint", ".yamllint.yaml", ".yamllint.yml")
+
+
+def get_yamllint_config() -> Optional[Any]:
+    """
+    Get the yamllint configuration of the working directory,
+    or the default one.
+
+    :return: yamllint configuration, None when yamllint is not installed.
+    :rtype: yamllint.config.YamlLintConfig | None
+    """
+    try:
+        from yamllint.config import YamlLintConfig
+    except ImportError:
+        return None
+
+    for config_file in YAMLLINT_CONFIG_FILES:
+        if os.path.isfile(config_file):
+            return YamlLintConfig(file=config_file)
+    return YamlLintConfig("extends: default")
+
+
+def lint_yaml(path: str, config: Any) -> List[str]:
+    """
+    Lint a YAML file with yamllint.
+
+    :param path: File path.
+    :type path: str
+    :param config: yamllint configuration, see get_yamllint_config().
+    :type config: yamllint.config.YamlLintConfig
+    :return: Errors found (warnings are not reported, like by yamllint).
+    :rtype: list[str]
+    """
+    from yamllint import linter
+
+    with open(path, "r") as yaml_file:
+        content = yaml_file.read()
+    return [
+        f"{path}:{problem.line}:{problem.column}: {problem.desc} ({problem.rule})"
+        for problem in linter.run(content, config, path)
+        if problem.level == "error"
+    ]
+
+
+def _generate(profile: str, tuning_files_list: Optional[List[str]] = None) -> None:
+    """
+    Generate a profile like generate() without writing the outputs,
+    with generation errors raised instead of exiting.
+
+    :param profile: Profile name (packaged) or path to profile.
+    :type profile: str
+    :param tuning_files_list: Tuning files.
+    :type tuning_files_list: list[str] | None
+    """
+    from .config_data import GenerateOptions
+    from .profiles import get_tuned_profile
+    from .yacfg import generate_core
+
+    config_data, tuned_profile = get_tuned_profile(
+        profile=profile, tuning_files_list=tuning_files_list
+    )
+    generate_core(
+        config_data=config_data,
+        tuned_profile=tuned_profile,
+        generate_options=GenerateOptions(retain_output=False),
+    )
+
+
+def _run_check(func: Callable[[], Any]) -> Dict[str, Any]:
+    """
+    Run a single check, and report its failure instead of raising it.
+
+    :param func: Check, raises an exception when it fails.
+    :type func: callable
+    :return: Check result {"status": ..., "message": ..., "seconds": ...}.
+    :rtype: dict
+    """
+    start = time.perf_counter()
+    message: Optional[str] = None
+    try:
+        func()
+    except (YacfgException, OSError) as exc:
+        message = str(exc) or exc.__class__.__name__
+    except Exception as exc:
+        LOG.debug("Check failed", exc_info=True)
+        message = f"{exc.__class__.__name__}: {exc}"
+    return {
+        "status": STATUS_FAILED if message else STATUS_OK,
+        "message": message,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def check_profile(profile: str, work_dir: str, lint: bool = True) -> Dict[str, Any]:
+    """
+    Check a profile the way users use it: generate it, export it as
+    a new profile, as a static profile and its tuning, lint the exported
+    YAML files, and generate it with the exported tuning.
+
+    :param profile: Profile name (packaged) or path to profile.
+    :type profile: str
+    :param work_dir: Directory for the exported files of the profile.
+    :type work_dir: str
+    :param lint: Lint the exported YAML files, when yamllint is installed.
+    :type lint: bool
+    :return: Profile report {"profile": ..., "ok": ...,
+        "checks": {check: {"status": ..., "message": ..., "seconds": ...}}}.
+    :rtype: dict
+    """
+    from .output import export_tuning_variables, new_profile, new_profile_rendered
+
+    static_path = os.path.join(work_dir, "static.yaml")
+    tuning_path = os.path.join(work_dir, "tuning.yaml")
+    lint_config = get_yamllint_config() if lint else None
+
+    def lint_check(path: str) -> Callable[[], None]:
+        def check() -> None:
+            errors = lint_yaml(path, lint_config)
+            if errors:
+                raise ProfileError("\n".join(errors))
+
+        return check
+
+    checks: Dict[str, Callable[[], Any]] = {
+        CHECK_GENERATE: lambda: _generate(profile),
+        CHECK_NEW_PROFILE: lambda: new_profile(
+            profile, os.path.join(work_dir, "dynamic", os.path.basename(profile))
+        ),
+        CHECK_NEW_PROFILE_STATIC: lambda: new_profile_rendered(profile, static_path),
+        CHECK_LINT_STATIC: lint_check(static_path),
+        CHECK_EXPORT_TUNING: lambda: export_tuning_variables(profile, tuning_path),
+        CHECK_LINT_TUNING: lint_check(tuning_path),
+        CHECK_TUNE: lambda: _generate(profile, [tuning_path]),
+    }
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in CHECKS:
+        dependency = CHECK_DEPENDENCIES.get(name)
+        if dependency and results[dependency]["status"] != STATUS_OK:
+            message: Optional[str] = f"{dependency} did not pass"
+        elif name in (CHECK_LINT_STATIC, CHECK_LINT_TUNING) and lint_config is None:
+            message = "yamllint not available" if lint else "disabled"
+        else:
+            results[name] = _run_check(checks[name])
+            continue
+        results[name] = {"status": STATUS_SKIPPED, "message": message, "seconds": 0.0}
+
+    return {
+        "profile": profile,
+        "ok": all(result["status"] != STATUS_FAILED for result in results.values()),
+        "checks": results,
+    }
+
+
+def _init_worker(log_level: int) -> None:
+    """Process pool initializer, applies the log level of the main process."""
+    logging.getLogger().setLevel(log_level)
+
+
+def check_profiles(
+    profiles: Sequence[str],
+    work_dir: Optional[str] = None,
+    jobs: Optional[int] = None,
+    lint: bool = True,
+) -> Dict[str, Any]:
+    """
+    Check profiles (see check_profile()) in a process pool.
+
+    Every worker checks many profiles, so parsed profiles, tuning files
+    and template environments cached by a check are reused by the next
+    ones, instead of starting a new yacfg process for every check.
+
+    :param profiles: Profile names (packaged) or paths to profiles,
+        all packaged and user profiles when empty.
+    :type profiles: list[str]
+    :param work_dir: Directory for the exported files, a temporary
+        directory (removed afterwards) when None.
+    :type work_dir: str | None
+    :param jobs: Number of profiles checked in parallel,
+        0 or None to use all available CPUs.
+    :type jobs: int | None
+    :param lint: Lint the exported YAML files, when yamllint is installed.
+    :type lint: bool
+    :return: Report {"version": ..., "yacfg": version, "ok": ...,
+        "seconds": ..., "profiles": [profile reports]}.
+    :rtype: dict
+    """
+    if not profiles:
+        from .query import list_profiles
+
+        profiles = list_profiles()
+    if not jobs:
+        jobs = os.cpu_count() or 1
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix=f"{NAME}_profile_check-") as tmp_dir:
+        base_dir = work_dir or tmp_dir
+        args = [
+            (profile, os.path.join(base_dir, f"{index:04d}"), lint)
+            for index, profile in enumerate(profiles)
+        ]
+        if jobs <= 1 or len(args) <= 1:
+            reports = [check_profile(*profile_args) for profile_args in args]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=min(jobs, len(args)),
+                initializer=_init_worker,
+                initargs=(logging.getLogger().getEffectiveLevel(),),
+            ) as executor:
+                reports = list(executor.map(check_profile, *zip(*args)))
+
+    return {
+        "version": REPORT_VERSION,
+        "yacfg": yacfg.__version__,
+        "ok": all(report["ok"] for report in reports),
+        "seconds": time.perf_counter() - start,
+        "profiles": reports,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """
+    Format a report as a table of check statuses, with the messages
+    of failed checks.
+
+    :param report: Report, see check_profiles().
+    :type report: dict
+    :return: Formatted report.
+    :rtype: str
+    """
+    marks = {STATUS_OK: ".", STATUS_FAILED: "F", STATUS_SKIPPED: "s"}
+    lines = [" ".join(CHECKS)]
+    failures = []
+    for profile_report in report["profiles"]:
+        statuses = []
+        for name in CHECKS:
+            result = profile_report["checks"][name]
+            statuses.append(marks[result["status"]].center(len(name)))
+            if result["status"] == STATUS_FAILED:
+                failures.append(
+                    f"{profile_report['profile']}: {name}: {result['message']}"
+                )
+        lines.append(f"{' '.join(statuses)} {profile_report['profile']}")
+    lines.extend(failures)
+    lines.append(
+        f"{len(report['profiles'])} profile(s) checked in"
+        f" {report['seconds']:.2f}s: {'ok' if report['ok'] else 'FAILED'}"
+    )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Check profiles from the command line, replaces profile_test.sh.
+
+    :param argv: Command line arguments.
+    :type argv: list[str] | None
+    :return: Exit code, 1 when some check failed.
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(
+        prog=f"python -m {__name__}",
+        description="Check that profiles generate, export and lint cleanly.",
+    )
+    parser.add_argument(
+        "profiles",
+        nargs="*",
+        metavar="PROFILE",
+        help="Profiles to check, all available profiles by default",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=0,
+        help="Profiles checked in parallel, default: number of CPUs",
+    )
+    parser.add_argument(
+        "--report", metavar="FILE", help="Write the JSON report to FILE ('-' stdout)"
+    )
+    parser.add_argument(
+        "--work-dir",
+        metavar="DIR",
+        help="Keep the exported files in DIR, instead of a temporary directory",
+    )
+    parser.add_argument(
+        "--no-lint", action="store_true", help="Do not lint the exported YAML files"
+    )
+    parser.add_argument(
+        "-d", "--debug", action="store_true", help="Log details of the checks"
+    )
+    options = parser.parse_args(argv)
+
+    # failures are in the report, the log only adds noise by default
+    logging.getLogger().setLevel(logging.DEBUG if options.debug else logging.WARNING)
+
+    report = check_profiles(
+        options.profiles,
+        work_dir=options.work_dir,
+        jobs=options.jobs,
+        lint=not options.no_lint,
+    )
+
+    if options.report == "-":
+        print(json.dumps(report, indent=1))
+    else:
+        if options.report:
+            with open(options.report, "w") as report_file:
+                json.dump(report, report_file, indent=1)
+        print(format_report(report))
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    logger_settings.config_console_logger(level=logging.WARNING)
+    sys.exit(main())
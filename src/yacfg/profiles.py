@@ -1,17 +1,62 @@
+import copy
+import hashlib
+import importlib.util
 import itertools
 import logging
 import os
+import re
+import types
 from typing import Dict, List, Optional, Tuple, Union
 
 import yaml
-from jinja2 import ChoiceLoader, Environment, FileSystemLoader, Template
+from jinja2 import Environment, Template
 
 from . import NAME
 from .exceptions import ProfileError, TemplateError
-from .files import get_profiles_paths, select_profile_file
+from .files import PYTHON_PROFILE_SUFFIX, get_profiles_paths, select_profile_file
+from .incremental import template_fingerprint
+from .templates import get_environment, get_environment_options
+from .timings import (
+    STAGE_PROFILE_DEFAULTS,
+    STAGE_PROFILE_PARSE,
+    STAGE_PROFILE_RENDER,
+    STAGE_PROFILE_TEMPLATE,
+    STAGE_TUNING_FILES,
+    stage,
+)
+from .yaml_backend import load_yaml
 
 LOG: logging.Logger = logging.getLogger(NAME)
 
+# top level `_defaults` section of a rendered profile, up to the next
+# top level key or document marker
+REX_DEFAULTS_SECTION = re.compile(
+    r"^_defaults[ \t]*:.*?(?=^(?:[^\s#-]|---)|\Z)", re.MULTILINE | re.DOTALL
+)
+
+# profile defaults keyed by (profile template name, fingerprint of the
+# profile source with sources of included and imported templates)
+_profile_defaults_cache: Dict[Tuple[str, str], Dict] = {}
+
+# first line of profiles exported by output.new_profile_rendered(),
+# such profiles are plain YAML, see load_static_profile()
+STATIC_PROFILE_MARKER = f"# {NAME} static profile"
+
+# Jinja2 delimiters, profiles without any of them are plain YAML too
+TEMPLATE_DELIMITERS = ("{{", "{%", "{#")
+
+# static profiles keyed by (profile file path, mtime, size),
+# None for templated profiles
+_static_profiles_cache: Dict[
+    Tuple[str, int, int], Optional[Tuple[str, object, str]]
+] = {}
+
+# parsed tuning files, absolute path -> ((mtime, size), data)
+_tuning_files_cache: Dict[str, Tuple[Tuple[int, int], Dict]] = {}
+
+# python profile modules and names keyed by (profile file path, mtime, size)
+_python_profiles_cache: Dict[Tuple[str, int, int], Tuple[types.ModuleType, str]] = {}
+
 
 def load_tuning_files(tuning_files: Optional[List[str]] = None) -> List[Dict[str, str]]:
     """Load tuning data from requested tuning files in order and
@@ -27,25 +72,65 @@ def load_tuning_files(tuning_files: Optional[List[str]] = None) -> List[Dict[str
 
     if tuning_files:
         for tuning_file in tuning_files:
-            try:
-                with open(tuning_file, "r") as stream:
-                    tuning_values_list.append(yaml.safe_load(stream))
-            except IOError as exc:
-                raise ProfileError(
-                    'Unable to open tuning file "{}" {}'.format(tuning_file, exc)
-                )
-            except yaml.YAMLError as exc:
-                raise ProfileError(
-                    'Unable to parse YAML tuning file "{}" {}'.format(tuning_file, exc)
-                )
-
-            LOG.debug("Tuning file {} loaded".format(tuning_file))
+            tuning_values_list.append(load_tuning_file(tuning_file))
     else:
         LOG.debug("No tuning files requested.")
 
     return tuning_values_list
 
 
+def load_tuning_file(tuning_file: str) -> Dict[str, str]:
+    """Load tuning data from a tuning file.
+
+    Parsed tuning files are cached by their absolute path, and reused
+    while the file modification time and size stay the same (e.g. common
+    tuning files of all services in a batch). Every caller gets its own
+    copy of the data.
+
+    :param tuning_file: Tuning file name.
+    :type tuning_file: str
+
+    :raises ProfileError: When the tuning file cannot be read or parsed.
+
+    :return: Tuning data loaded from the YAML tuning file.
+    :rtype: dict
+    """
+    try:
+        stat = os.stat(tuning_file)
+    except OSError as exc:
+        raise ProfileError(
+            'Unable to open tuning file "{}" {}'.format(tuning_file, exc)
+        )
+
+    cache_path = os.path.abspath(tuning_file)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _tuning_files_cache.get(cache_path)
+    if cached is not None and cached[0] == signature:
+        LOG.debug("Tuning file %s loaded from cache", tuning_file)
+        return copy.deepcopy(cached[1])
+
+    try:
+        with open(tuning_file, "r") as stream:
+            tuning_data = load_yaml(stream)
+    except IOError as exc:
+        raise ProfileError(
+            'Unable to open tuning file "{}" {}'.format(tuning_file, exc)
+        )
+    except yaml.YAMLError as exc:
+        raise ProfileError(
+            'Unable to parse YAML tuning file "{}" {}'.format(tuning_file, exc)
+        )
+
+    _tuning_files_cache[cache_path] = (signature, copy.deepcopy(tuning_data))
+    LOG.debug("Tuning file %s loaded", tuning_file)
+    return tuning_data
+
+
+def clear_tuning_files_cache() -> None:
+    """Forget all cached tuning files."""
+    _tuning_files_cache.clear()
+
+
 def load_tuning(
     profile_defaults: Dict[str, str] = {},
     tuning_files_list: Optional[List[str]] = None,
@@ -66,7 +151,8 @@ def load_tuning(
     :rtype: dict
     """
     result: Dict = {}
-    files_tuning_values: List[Dict] = load_tuning_files(tuning_files_list)
+    with stage(STAGE_TUNING_FILES):
+        files_tuning_values: List[Dict] = load_tuning_files(tuning_files_list)
     if profile_defaults:
         result.update(profile_defaults)
     if tuning_data_list is None:
@@ -82,7 +168,7 @@ def get_tuned_profile(
     profile: str,
     tuning_files_list: Optional[List[str]] = None,
     tuning_data_list: Optional[List[Dict[str, str]]] = None,
-) -> Tuple[Dict[str, str], str]:
+) -> Tuple[Dict[str, str], Optional[str]]:
     """Get selected profile and use tuning data to fine-tune
     its variable values.
 
@@ -96,49 +182,404 @@ def get_tuned_profile(
 
     :raises ProfileError: When the tuned profile is not valid.
 
-    :return: Compound tuned config data and tuned profile YAML.
-    :rtype: tuple[dict, str]
+    :return: Compound tuned config data and tuned profile YAML
+        (None for python profiles, see get_tuned_python_profile()).
+    :rtype: tuple[dict, str | None]
     """
+    if is_python_profile(profile):
+        return get_tuned_python_profile(profile, tuning_files_list, tuning_data_list)
+
+    static_profile = load_static_profile(profile)
+    if static_profile is not None:
+        return get_tuned_static_profile(
+            static_profile, tuning_files_list, tuning_data_list
+        )
+
+    with stage(STAGE_PROFILE_TEMPLATE):
+        tuning_profile = get_profile_template(profile)
+
+    with stage(STAGE_PROFILE_DEFAULTS):
+        profile_defaults = load_profile_defaults(profile, tuning_profile)
+
     tuning_data: Dict = load_tuning(
-        profile_defaults=load_profile_defaults(profile),
+        profile_defaults=profile_defaults,
         tuning_files_list=tuning_files_list,
         tuning_data_list=tuning_data_list,
     )
 
-    tuning_profile = get_profile_template(profile)
     tuning_data["profile_path"] = tuning_profile.name
-    tuned_profile = tuning_profile.render(tuning_data)
+    with stage(STAGE_PROFILE_RENDER):
+        tuned_profile = tuning_profile.render(tuning_data)
 
     try:
-        config_data = yaml.safe_load(tuned_profile)
+        with stage(STAGE_PROFILE_PARSE):
+            config_data = load_yaml(tuned_profile)
     except yaml.YAMLError as exc:
         raise ProfileError('Unable to parse tuned profile "{}" {}'.format(profile, exc))
 
     return config_data, tuned_profile
 
 
-def load_profile_defaults(profile: str) -> Dict:
+def get_tuned_static_profile(
+    static_profile: Tuple[str, object, str],
+    tuning_files_list: Optional[List[str]] = None,
+    tuning_data_list: Optional[List[Dict[str, str]]] = None,
+) -> Tuple[Dict, Optional[str]]:
+    """Get config data of a static profile (see load_static_profile())
+    without any templating.
+
+    Tuning files and tuning data are overlaid on the `_defaults` section
+    of the profile data. A static profile has no variables, so the rest
+    of its data is not changed by tuning (a warning is logged when tuning
+    changes any default).
+
+    :param static_profile: Loaded static profile, see load_static_profile().
+    :type static_profile: tuple[str, dict, str]
+    :param tuning_files_list: List of files with tuning data to be used.
+    :type tuning_files_list: list[str], optional
+    :param tuning_data_list: Data used to tune the variable values.
+    :type tuning_data_list: list[dict], optional
+
+    :return: Compound config data and profile YAML (None when tuning
+        changed the defaults, the YAML would not match the config data).
+    :rtype: tuple[dict, str | None]
+    """
+    tuned_profile, profile_data, profile_name = static_profile
+
+    with stage(STAGE_PROFILE_DEFAULTS):
+        profile_defaults = _get_defaults(profile_data)
+
+    tuning_data: Dict = load_tuning(
+        profile_defaults=profile_defaults,
+        tuning_files_list=tuning_files_list,
+        tuning_data_list=tuning_data_list,
+    )
+
+    with stage(STAGE_PROFILE_PARSE):
+        # the cached data stays intact, config data is modified by generation
+        config_data = copy.deepcopy(profile_data)
+
+    tuned_keys = sorted(
+        key
+        for key, value in tuning_data.items()
+        if key not in profile_defaults or profile_defaults[key] != value
+    )
+    if tuned_keys and isinstance(config_data, dict):
+        LOG.warning(
+            "Static profile %s is not templated, tuning of %s only"
+            " changes its _defaults",
+            profile_name,
+            ", ".join(tuned_keys),
+        )
+        config_data["_defaults"] = tuning_data
+        tuned_profile = None
+
+    return config_data, tuned_profile
+
+
+def load_static_profile(profile_name: str) -> Optional[Tuple[str, object, str]]:
+    """Load a profile as plain YAML, when it is static: exported by
+    output.new_profile_rendered() (starts with STATIC_PROFILE_MARKER),
+    or without any Jinja2 delimiters.
+
+    A static profile is parsed once, the result is cached as long as
+    the profile file does not change.
+
+    :param profile_name: Profile name (packaged) or path to profile.
+    :type profile_name: str
+
+    :raises ProfileError: When the static profile is not valid YAML.
+
+    :return: Profile YAML (as a render of it would be), parsed profile
+        data and the profile name within its profiles path,
+        None when the profile is templated.
+    :rtype: tuple[str, dict, str] | None
+    """
+    selected_name, selected_path = select_profile_file(profile_name)
+    filename = os.path.abspath(os.path.join(selected_path, selected_name))
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        # reported by the templated profile path
+        return None
+
+    cache_key = (filename, stat.st_mtime_ns, stat.st_size)
+    if cache_key in _static_profiles_cache:
+        return _static_profiles_cache[cache_key]
+
+    try:
+        with stage(STAGE_PROFILE_TEMPLATE):
+            with open(filename, "r", encoding="utf-8") as profile_file:
+                profile_text = profile_file.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+    static_profile: Optional[Tuple[str, object, str]] = None
+    if profile_text.startswith(STATIC_PROFILE_MARKER) or not any(
+        delimiter in profile_text for delimiter in TEMPLATE_DELIMITERS
+    ):
+        # newlines as Jinja2 renders them
+        profile_text = profile_text.replace("\r\n", "\n").replace("\r", "\n")
+        if profile_text.endswith("\n"):
+            profile_text = profile_text[:-1]
+        try:
+            with stage(STAGE_PROFILE_PARSE):
+                profile_data = load_yaml(profile_text)
+        except yaml.YAMLError as exc:
+            raise ProfileError(
+                'Unable to parse tuned profile "{}" {}'.format(profile_name, exc)
+            )
+        LOG.debug("Static profile %s loaded", profile_name)
+        static_profile = (profile_text, profile_data, selected_name)
+
+    _static_profiles_cache[cache_key] = static_profile
+    return static_profile
+
+
+def _get_defaults(profile_data: object) -> Dict:
+    """Get a copy of the `_defaults` section of parsed profile data."""
+    if not isinstance(profile_data, dict):
+        return {}
+    return copy.deepcopy(profile_data.get("_defaults") or {})
+
+
+def get_tuned_python_profile(
+    profile: str,
+    tuning_files_list: Optional[List[str]] = None,
+    tuning_data_list: Optional[List[Dict[str, str]]] = None,
+) -> Tuple[Dict, None]:
+    """Get config data of a python profile (see load_python_profile()),
+    tuned like a YAML profile: DEFAULTS are overlaid by tuning files
+    and tuning data, and passed to the profile render function.
+
+    :param profile: Profile name (packaged) or path to profile
+        (user-specified).
+    :type profile: str
+    :param tuning_files_list: List of files with tuning data to be used.
+    :type tuning_files_list: list[str], optional
+    :param tuning_data_list: Data used to tune the variable values.
+    :type tuning_data_list: list[dict], optional
+
+    :raises ProfileError: When the profile cannot be rendered.
+
+    :return: Compound tuned config data, and None as there is no
+        tuned profile YAML.
+    :rtype: tuple[dict, None]
+    """
+    with stage(STAGE_PROFILE_TEMPLATE):
+        module, profile_path = load_python_profile(profile)
+
+    with stage(STAGE_PROFILE_DEFAULTS):
+        defaults = getattr(module, "DEFAULTS", None) or {}
+        profile_defaults = copy.deepcopy(defaults)
+
+    tuning_data: Dict = load_tuning(
+        profile_defaults=profile_defaults,
+        tuning_files_list=tuning_files_list,
+        tuning_data_list=tuning_data_list,
+    )
+
+    tuning_data["profile_path"] = profile_path
+    with stage(STAGE_PROFILE_RENDER):
+        try:
+            config_data = module.render(tuning_data)
+        except Exception as exc:
+            raise ProfileError(
+                'Unable to render python profile "{}" {}'.format(profile, exc)
+            )
+
+    if not isinstance(config_data, dict):
+        raise ProfileError(
+            'Python profile "{}" render() did not return a mapping'.format(profile)
+        )
+    if defaults and "_defaults" not in config_data:
+        # like the _defaults section of a YAML profile
+        config_data["_defaults"] = copy.deepcopy(defaults)
+
+    return config_data, None
+
+
+def is_python_profile(profile: str) -> bool:
+    """Check whether a profile is written in python.
+
+    :param profile: Profile name (packaged) or path to profile.
+    :type profile: str
+
+    :return: True for python profiles.
+    :rtype: bool
+    """
+    return profile.endswith(PYTHON_PROFILE_SUFFIX)
+
+
+def load_python_profile(profile_name: str) -> Tuple[types.ModuleType, str]:
+    """Load a python profile, an alternative to YAML profiles providing
+    the profile data directly, without rendering and parsing YAML.
+
+    A python profile is a module defining:
+
+    - ``DEFAULTS``: mapping of tunable variables with default values
+      (the `_defaults` section of a YAML profile), optional
+    - ``render(tuning)``: function returning the profile data
+      for the tuning values (mapping)
+
+    Loaded modules are cached per profile file, as long as the file
+    does not change.
+
+    :param profile_name: Profile name (packaged) or path to profile.
+    :type profile_name: str
+
+    :raises ProfileError: When the profile cannot be loaded.
+
+    :return: Profile module and the profile name within its profiles path.
+    :rtype: tuple[module, str]
+    """
+    selected_name, selected_path = select_profile_file(profile_name)
+    filename = os.path.abspath(os.path.join(selected_path, selected_name))
+    try:
+        stat = os.stat(filename)
+    except OSError as exc:
+        raise ProfileError(
+            'Unable to load python profile "{}" {}'.format(profile_name, exc)
+        )
+
+    cache_key = (filename, stat.st_mtime_ns, stat.st_size)
+    cached = _python_profiles_cache.get(cache_key)
+    if cached is not None:
+        LOG.debug("Using cached python profile %s", profile_name)
+        return cached
+
+    module_name = "_yacfg_profile_" + hashlib.sha1(filename.encode("utf-8")).hexdigest()
+    spec = importlib.util.spec_from_file_location(module_name, filename)
+    if spec is None or spec.loader is None:
+        raise ProfileError('Unable to load python profile "{}"'.format(profile_name))
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except Exception as exc:
+        raise ProfileError(
+            'Unable to load python profile "{}" {}'.format(profile_name, exc)
+        )
+    if not callable(getattr(module, "render", None)):
+        raise ProfileError(
+            'Python profile "{}" does not define render(tuning)'.format(profile_name)
+        )
+
+    _python_profiles_cache[cache_key] = (module, selected_name)
+    LOG.debug("Python profile %s loaded", profile_name)
+    return module, selected_name
+
+
+def load_profile_defaults(
+    profile: str, profile_template: Optional[Template] = None
+) -> Dict:
     """Load default variables from a profile if available.
 
     Note:
         The profile will be rendered as scratch without any values
-        to be able to be loaded as valid YAML.
+        to be able to be loaded as valid YAML. Only the `_defaults`
+        section of the scratch render is parsed, and the result is
+        cached per profile, so it is rendered just once as long
+        as the profile file and templates it includes or imports
+        do not change.
 
     :param profile: Profile name (from package or from the user).
     :type profile: str
+    :param profile_template: Already loaded profile template to reuse,
+        if None, it will be loaded via get_profile_template().
+    :type profile_template: Template, optional
 
     :return: Default values mapping, if not available then an empty dict.
     :rtype: dict
     """
+    if profile_template is None:
+        if is_python_profile(profile):
+            module, _ = load_python_profile(profile)
+            return copy.deepcopy(getattr(module, "DEFAULTS", None) or {})
+        static_profile = load_static_profile(profile)
+        if static_profile is not None:
+            return _get_defaults(static_profile[1])
+        profile_template = get_profile_template(profile)
+
+    cache_key = _profile_cache_key(profile_template)
+    if cache_key is not None and cache_key in _profile_defaults_cache:
+        LOG.debug("Using cached defaults of profile %s", profile)
+        return copy.deepcopy(_profile_defaults_cache[cache_key])
+
     # Scratch render of the profile template for _defaults extraction
-    scratch_profile: Template = get_profile_template(profile)
-    scratch_profile_rendered: str = scratch_profile.render()
-    tmp_data = yaml.safe_load(scratch_profile_rendered)
-    tuning_data = tmp_data.get("_defaults", {})
-    LOG.debug("Tuning data: {}".format(tuning_data))
+    scratch_profile_rendered: str = profile_template.render()
+    tuning_data = extract_profile_defaults(scratch_profile_rendered)
+    LOG.debug("Tuning data: %s", tuning_data)
+
+    if cache_key is not None:
+        _profile_defaults_cache[cache_key] = copy.deepcopy(tuning_data)
     return tuning_data
 
 
+def extract_profile_defaults(rendered_profile: str) -> Dict:
+    """Extract the `_defaults` section from a rendered profile.
+
+    Only the `_defaults` section is parsed when it can be located
+    as a top level block, otherwise the whole profile is parsed.
+
+    :param rendered_profile: Rendered profile YAML.
+    :type rendered_profile: str
+
+    :raises ProfileError: When the rendered profile is not valid YAML.
+
+    :return: Default values mapping, if not available then an empty dict.
+    :rtype: dict
+    """
+    sections = REX_DEFAULTS_SECTION.findall(rendered_profile)
+    if len(sections) == 1:
+        try:
+            section_data = load_yaml(sections[0])
+        except yaml.YAMLError:
+            # e.g. aliases of anchors defined outside the section
+            section_data = None
+        if isinstance(section_data, dict):
+            return section_data.get("_defaults") or {}
+
+    try:
+        tmp_data = load_yaml(rendered_profile)
+    except yaml.YAMLError as exc:
+        raise ProfileError("Unable to parse profile defaults {}".format(exc))
+
+    if not isinstance(tmp_data, dict):
+        return {}
+    return tmp_data.get("_defaults") or {}
+
+
+def clear_profile_defaults_cache() -> None:
+    """Forget all cached profile defaults (and python and static profiles)."""
+    _profile_defaults_cache.clear()
+    _python_profiles_cache.clear()
+    _static_profiles_cache.clear()
+
+
+def _profile_cache_key(
+    profile_template: Template,
+) -> Optional[Tuple[str, str]]:
+    """Get a cache key for a profile template based on its source and
+    sources of templates it includes or imports (e.g. from `_libs`),
+    see incremental.template_fingerprint().
+
+    :param profile_template: Loaded profile template.
+    :type profile_template: Template
+
+    :return: Cache key, or None if the sources cannot be determined
+        (no template loader or a reference which is not a literal name).
+    :rtype: tuple[str, str] | None
+    """
+    name = getattr(profile_template, "name", None)
+    env = getattr(profile_template, "environment", None)
+    if not isinstance(name, str) or not isinstance(env, Environment):
+        return None
+    fingerprint = template_fingerprint(env, name)
+    if fingerprint is None:
+        return None
+    return name, fingerprint
+
+
 def get_profile_template(profile_name: str) -> Template:
     """Get a Jinja2 template via the environment generated for the selected profile
     (for fine-tuning of the profile).
@@ -150,7 +591,7 @@ def get_profile_template(profile_name: str) -> Template:
     :return: Jinja2 profile template for fine-tuning template.
     :rtype: Environment
     """
-    LOG.debug(f"Profile name: {profile_name}")
+    LOG.debug("Profile name: %s", profile_name)
 
     selected_template_name, selected_template_path = select_profile_file(profile_name)
 
@@ -159,20 +600,15 @@ def get_profile_template(profile_name: str) -> Template:
             'Unable to load requested profile location "%s"' % profile_name
         )
 
-    loader = FileSystemLoader([selected_template_path, *get_profiles_paths()])
-
-    extensions = ["jinja2_ansible_filters.AnsibleCoreFiltersExtension"]
-
-    LOG.debug(f"Selected profile path: {selected_template_path}")
-    LOG.debug(f"Selected template name: {selected_template_name}")
+    LOG.debug("Selected profile path: %s", selected_template_path)
+    LOG.debug("Selected template name: %s", selected_template_name)
 
     try:
-        env = Environment(
-            loader=loader,
-            trim_blocks=True,
-            lstrip_blocks=True,
-            extensions=extensions,
+        search_path = tuple(
+            os.path.abspath(path)
+            for path in (selected_template_path, *get_profiles_paths())
         )
+        env = get_environment(search_path, **get_environment_options())
         template = env.get_template(selected_template_name)
     except Exception as e:
         LOG.exception("Error creating the Jinja2 environment.")
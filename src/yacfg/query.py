@@ -1,15 +1,65 @@
+import functools
 import logging
 import os
 import posixpath
 import re
-from typing import List
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple
 
-from jinja2.environment import Environment
+from .files import (
+    NAME,
+    PYTHON_PROFILE_SUFFIX,
+    get_profiles_paths,
+    get_templates_paths,
+    stat_signature,
+)
+from .tree_index import walk_tree
 
-from .files import NAME, get_profiles_paths, get_templates_paths
+if TYPE_CHECKING:
+    # only for annotations, jinja2 is not needed by listings
+    from jinja2 import Environment
 
 LOG: logging.Logger = logging.getLogger(NAME)
 
+# main templates are the .jinja2 files in the top level of a template set
+MAIN_TEMPLATE_REGEX = re.compile(r"^[^/]+\.jinja2$")
+MAIN_TEMPLATE_SUFFIX = ".jinja2"
+
+# patterns which would change or be invalid in a combined pattern: group
+# references, named groups (a name may be used by several expressions),
+# and inline flags (a global flag of a later expression is applied to the
+# whole pattern, with just a DeprecationWarning before python 3.11)
+_UNCOMBINABLE_REGEX = re.compile(r"\\[1-9]|\(\?P[<=]|\(\?\(|\(\?[aiLmsux-]")
+
+# template search path -> (stat signature, main template names)
+_main_templates_cache: Dict[Tuple[str, ...], Tuple[Tuple, Tuple[str, ...]]] = {}
+
+
+@functools.lru_cache(maxsize=64)
+def compile_output_filter(output_filter: Tuple[str, ...]) -> Callable[[str], bool]:
+    """Compile output filter regular expressions to a single matcher.
+
+    Expressions are combined to one alternation, matched like re.match()
+    of any of them, unless an expression names or refers to groups, or uses
+    inline flags.
+
+    :param output_filter: Regular expressions to select templates.
+    :type output_filter: tuple[str]
+    :return: Function telling whether a template name is selected.
+    :rtype: callable
+    """
+    if not output_filter:
+        return lambda template: False
+    patterns = [re.compile(flt) for flt in output_filter]
+    if not any(_UNCOMBINABLE_REGEX.search(flt) for flt in output_filter):
+        try:
+            combined = re.compile("|".join(f"(?:{flt})" for flt in output_filter))
+        except re.error:
+            pass
+        else:
+            return lambda template: combined.match(template) is not None
+    LOG.debug("Output filter not combined: %s", output_filter)
+    return lambda template: any(pattern.match(template) for pattern in patterns)
+
 
 def filter_template_list(
     template_list: List[str], output_filter: List[str]
@@ -23,12 +73,11 @@ def filter_template_list(
     :return: List of selected template file names to process.
     :rtype: list[str]
     """
+    is_selected = compile_output_filter(tuple(output_filter))
     filtered_templates = [
-        template
-        for template in template_list
-        if any(re.match(flt, template) for flt in output_filter)
+        template for template in template_list if is_selected(template)
     ]
-    LOG.debug(f"Filtered template files list: {filtered_templates}")
+    LOG.debug("Filtered template files list: %s", filtered_templates)
     return filtered_templates
 
 
@@ -39,77 +88,136 @@ def list_templates() -> List[str]:
     a file named '_template'. It would be good if the template directory
     contains some Jinja2 templates.
 
+    Directory trees are read from an index refreshed on every call,
+    see tree_index.
+
     :return: List of template paths from the package.
     :rtype: list[str]
     """
     templates_paths: list = get_templates_paths()
-    LOG.debug(f"Templates path for query: {templates_paths}")
+    LOG.debug("Templates path for query: %s", templates_paths)
 
     template_paths = []
     for template in templates_paths:
-        for root, dirs, files in os.walk(template):
+        for root, dirs, files in walk_tree(template):
             if any(file.endswith((".yaml", ".jinja2", ".j2")) for file in files):
                 if "_template" in files:
                     relative_path = os.path.relpath(root, template)
                     template_path = posixpath.join(*relative_path.split(os.path.sep))
                     template_paths.append(template_path)
                     LOG.debug(
-                        f"Included template path: {template_path} (using _template)"
+                        "Included template path: %s (using _template)", template_path
                     )
                 else:
-                    LOG.debug(f"Template files found, but no _template file in {root}")
+                    LOG.debug("Template files found, but no _template file in %s", root)
 
-    LOG.debug(f"Template paths: {template_paths}")
+    LOG.debug("Template paths: %s", template_paths)
     return template_paths
 
 
 def list_profiles() -> List[str]:
     """List all packaged complete profiles with their package relative path.
 
-    Profile is any YAML file under the 'profiles' directory in the package
-    that is not placed under a directory with a leading underscore like '_modules'.
+    Profile is any YAML file (or python profile, see profiles.load_python_profile)
+    under the 'profiles' directory in the package that is not placed under
+    a directory with a leading underscore like '_modules'.
+
+    Directory trees are read from an index refreshed on every call,
+    see tree_index.
 
     :return: List of profiles from the package.
     :rtype: list[str]
     """
     profiles_paths = get_profiles_paths()
-    LOG.debug(f"Profiles path for query: {profiles_paths}")
+    LOG.debug("Profiles path for query: %s", profiles_paths)
 
     profile_paths = []
 
     for profiles in profiles_paths:
-        for root, dirs, files in os.walk(profiles):
+        for root, dirs, files in walk_tree(profiles):
             prefix_path = os.path.relpath(root, profiles)
             # skip over underscored paths
             path_levels = prefix_path.split(os.path.sep)
             if any([x.startswith("_") for x in path_levels]):
-                LOG.debug(f"Skipping underscored: {path_levels}")
+                LOG.debug("Skipping underscored: %s", path_levels)
                 continue
+            # without this, it would add './' which is undesirable
+            if prefix_path == os.curdir:
+                prefix = ""
+            else:
+                prefix = posixpath.join(*path_levels) + posixpath.sep
             for file in files:
-                # filter only yaml profiles
-                if file.endswith((".yaml", ".jinja2", ".j2")):
-                    relative_path = os.path.relpath(os.path.join(root, file), profiles)
-                    profile_paths.append(
-                        # without this split/join, it would add './' which is undesirable
-                        posixpath.join(*relative_path.split(os.path.sep))
-                    )
+                # filter only yaml profiles and python profiles
+                if file.endswith((".yaml", ".jinja2", ".j2")) or (
+                    file.endswith(PYTHON_PROFILE_SUFFIX) and not file.startswith("_")
+                ):
+                    profile_paths.append(prefix + file)
 
-    LOG.debug(f"Profile paths: {profile_paths}")
+    LOG.debug("Profile paths: %s", profile_paths)
     return profile_paths
 
 
-def get_main_template_list(env: Environment) -> List[str]:
+def get_main_template_list(env: "Environment") -> List[str]:
     """Get a list of main templates from the selected template set.
 
     Note:
         Main template -> template that resembles an output config file.
 
+    With a file system loader, only the top level of template directories
+    is listed (instead of whole trees, like libraries), and the list is
+    kept until one of the directories changes.
+
     :param env: Jinja2 environment.
     :type env: Environment
     :return: List of main template names.
     :rtype: list[str]
     """
-    main_template_regex = re.compile(r"^[^/]+\.jinja2$")
-    main_template_list = env.list_templates(filter_func=main_template_regex.match)
-    LOG.debug(f"Main template files list: {main_template_list}")
+    from jinja2 import FileSystemLoader
+
+    if isinstance(env.loader, FileSystemLoader):
+        search_path = tuple(os.path.abspath(path) for path in env.loader.searchpath)
+        main_template_list = list(get_main_templates(search_path))
+    else:
+        main_template_list = env.list_templates(filter_func=MAIN_TEMPLATE_REGEX.match)
+    LOG.debug("Main template files list: %s", main_template_list)
     return main_template_list
+
+
+def get_main_templates(search_path: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Get main templates of a template search path, see get_main_template_list().
+
+    :param search_path: Absolute template directories.
+    :type search_path: tuple[str]
+    :return: Sorted main template names.
+    :rtype: tuple[str]
+    """
+    signature = stat_signature(search_path)
+    cached = _main_templates_cache.get(search_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    found = set()
+    for path in search_path:
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(MAIN_TEMPLATE_SUFFIX):
+                        continue
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    # like os.walk(), everything but directories is a file
+                    if not is_dir:
+                        found.add(entry.name)
+        except OSError as exc:
+            LOG.debug("Unable to list %s: %s", path, exc)
+
+    main_templates = tuple(sorted(found))
+    _main_templates_cache[search_path] = (signature, main_templates)
+    return main_templates
+
+
+def clear_main_templates_cache() -> None:
+    """Forget all cached main template lists."""
+    _main_templates_cache.clear()
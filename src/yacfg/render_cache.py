@@ -0,0 +1,440 @@
+import argparse
+import hashlib
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import NAME, logger_settings
+
+LOG: logging.Logger = logging.getLogger(NAME)
+
+# environment variables of the render cache directory and its limits
+RENDER_CACHE_ENV = "YACFG_RENDER_CACHE"
+RENDER_CACHE_MAX_SIZE_ENV = "YACFG_RENDER_CACHE_MAX_SIZE"
+RENDER_CACHE_MAX_AGE_ENV = "YACFG_RENDER_CACHE_MAX_AGE"
+
+# limits applied after outputs are stored
+DEFAULT_MAX_SIZE = 256 * 1024**2
+DEFAULT_MAX_AGE = 30 * 24 * 3600
+
+# changes whenever the key or the entry format changes
+CACHE_VERSION = 1
+
+# temporary files of stores, removed by prune when left behind
+TMP_SUFFIX = ".tmp"
+STALE_TMP_SECONDS = 3600
+
+SIZE_UNITS = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+AGE_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 24 * 3600, "w": 7 * 24 * 3600}
+
+_render_cache_dir: Optional[str] = None
+
+
+def parse_size(value: str) -> int:
+    """
+    Parse a size limit, bytes with an optional unit (k, M, G, T).
+
+    :param value: Size, e.g. '512M'.
+    :type value: str
+    :return: Size in bytes.
+    :rtype: int
+    :raises ValueError: If the size is not valid.
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*([kmgt]?)i?b?\s*", value, re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid size '{value}'")
+    return int(match.group(1)) * SIZE_UNITS[match.group(2).lower()]
+
+
+def parse_age(value: str) -> int:
+    """
+    Parse an age limit, seconds with an optional unit (s, m, h, d, w).
+
+    :param value: Age, e.g. '7d'.
+    :type value: str
+    :return: Age in seconds.
+    :rtype: int
+    :raises ValueError: If the age is not valid.
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*([smhdw]?)\s*", value, re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid age '{value}'")
+    return int(match.group(1)) * AGE_UNITS[match.group(2).lower()]
+
+
+def set_render_cache_dir(path: Optional[str]) -> None:
+    """
+    Select a directory for the render cache,
+    it takes precedence over the YACFG_RENDER_CACHE environment variable.
+
+    :param path: Cache directory, or None to use the environment variable only.
+    :type path: str | None
+    """
+    global _render_cache_dir
+    _render_cache_dir = path
+
+
+def get_render_cache_dir() -> Optional[str]:
+    """
+    Get the render cache directory, if enabled.
+
+    :return: Absolute cache directory path, or None when the cache is disabled.
+    :rtype: str | None
+    """
+    path = _render_cache_dir or os.getenv(RENDER_CACHE_ENV)
+    if not path:
+        return None
+    return os.path.abspath(path)
+
+
+def get_render_cache() -> Optional["RenderCache"]:
+    """
+    Get the render cache selected by the user, with limits from
+    the environment.
+
+    :return: Render cache, None when it is disabled.
+    :rtype: RenderCache | None
+    """
+    path = get_render_cache_dir()
+    if not path:
+        return None
+    max_size = DEFAULT_MAX_SIZE
+    max_age = DEFAULT_MAX_AGE
+    try:
+        if os.getenv(RENDER_CACHE_MAX_SIZE_ENV):
+            max_size = parse_size(os.environ[RENDER_CACHE_MAX_SIZE_ENV])
+        if os.getenv(RENDER_CACHE_MAX_AGE_ENV):
+            max_age = parse_age(os.environ[RENDER_CACHE_MAX_AGE_ENV])
+    except ValueError as exc:
+        LOG.warning(f"Render cache limits ignored: {exc}")
+    return RenderCache(path, max_size=max_size, max_age=max_age)
+
+
+class RenderCache(object):
+    """
+    Content-addressed cache of rendered outputs in a directory, shared
+    between runs, processes and hosts (e.g. a CI cache directory).
+
+    An output is stored under the fingerprint of everything its render
+    depends on (see incremental.OutputFingerprints), so a generation with
+    the same inputs reuses the output instead of rendering it again.
+
+    Entries are written to temporary files renamed into place, and read
+    without locks, so concurrent processes can share the directory.
+    A read refreshes the modification time of the entry, and prune()
+    evicts the least recently used entries beyond the size and age limits.
+
+    :param directory: Cache directory, created on the first store.
+    :type directory: str
+    :param max_size: Total size of entries kept by prune() (bytes).
+    :type max_size: int
+    :param max_age: Entries not used for longer are removed by prune() (s).
+    :type max_age: int
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_size: int = DEFAULT_MAX_SIZE,
+        max_age: int = DEFAULT_MAX_AGE,
+    ) -> None:
+        self.directory = directory
+        self.max_size = max_size
+        self.max_age = max_age
+
+    @staticmethod
+    def key(fingerprint: str) -> str:
+        """
+        Get the cache key of an output.
+
+        :param fingerprint: Fingerprint of the output inputs.
+        :type fingerprint: str
+        :return: Cache key.
+        :rtype: str
+        """
+        import jinja2
+
+        return hashlib.sha256(
+            f"{CACHE_VERSION}\n{jinja2.__version__}\n{fingerprint}".encode("utf-8")
+        ).hexdigest()
+
+    def entry_path(self, key: str) -> str:
+        """
+        Get the file path of an entry.
+
+        :param key: Cache key.
+        :type key: str
+        :return: Entry file path.
+        :rtype: str
+        """
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, fingerprint: str) -> Optional[str]:
+        """
+        Get a stored output.
+
+        :param fingerprint: Fingerprint of the output inputs.
+        :type fingerprint: str
+        :return: Output content, None when it is not stored.
+        :rtype: str | None
+        """
+        path = self.entry_path(self.key(fingerprint))
+        try:
+            with open(path, "r", encoding="utf-8", newline="") as entry_file:
+                content = entry_file.read()
+        except (OSError, ValueError):
+            return None
+        try:
+            # used recently, evicted last
+            os.utime(path)
+        except OSError:
+            pass
+        return content
+
+    def put(self, fingerprint: str, content: str) -> bool:
+        """
+        Store an output.
+
+        :param fingerprint: Fingerprint of the output inputs.
+        :type fingerprint: str
+        :param content: Output content.
+        :type content: str
+        :return: True when the output was stored.
+        :rtype: bool
+        """
+        path = self.entry_path(self.key(fingerprint))
+        entry_dir = os.path.dirname(path)
+        try:
+            os.makedirs(entry_dir, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=entry_dir, suffix=TMP_SUFFIX)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8", newline="") as tmp_file:
+                    tmp_file.write(content)
+                os.replace(tmp_name, path)
+            except BaseException:
+                os.unlink(tmp_name)
+                raise
+        except OSError as exc:
+            LOG.debug("Unable to store render cache entry: %s", exc)
+            return False
+        return True
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        """
+        List stored entries.
+
+        :return: (path, size, modification time) of entries.
+        :rtype: list[tuple[str, int, float]]
+        """
+        try:
+            with os.scandir(self.directory) as dir_entries:
+                subdirs = [entry.path for entry in dir_entries]
+        except OSError:
+            return []
+        entries = []
+        for subdir in subdirs:
+            try:
+                entries.extend(self._subdir_entries(subdir))
+            except NotADirectoryError:
+                continue
+            except OSError as exc:
+                LOG.debug("Unable to scan %s: %s", subdir, exc)
+        return entries
+
+    @staticmethod
+    def _subdir_entries(subdir: str) -> List[Tuple[str, int, float]]:
+        """List stored entries of a cache subdirectory, see entries()."""
+        entries = []
+        with os.scandir(subdir) as dir_entries:
+            for entry in dir_entries:
+                if entry.name.endswith(TMP_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def info(self) -> Dict[str, Any]:
+        """
+        Get the cache statistics.
+
+        :return: {"directory": ..., "entries": ..., "size": bytes,
+            "oldest": seconds since the least recent use, or None}
+        :rtype: dict
+        """
+        entries = self.entries()
+        return {
+            "directory": self.directory,
+            "entries": len(entries),
+            "size": sum(size for _, size, _ in entries),
+            "oldest": (
+                time.time() - min(mtime for _, _, mtime in entries) if entries else None
+            ),
+        }
+
+    def prune(
+        self, max_size: Optional[int] = None, max_age: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """
+        Remove entries not used for longer than the age limit, and then
+        the least recently used ones until the size limit is met.
+
+        :param max_size: Size limit (bytes), defaults to the cache one.
+        :type max_size: int | None
+        :param max_age: Age limit (seconds), defaults to the cache one.
+        :type max_age: int | None
+        :return: Number and total size of removed entries.
+        :rtype: tuple[int, int]
+        """
+        if max_size is None:
+            max_size = self.max_size
+        if max_age is None:
+            max_age = self.max_age
+
+        now = time.time()
+        self._remove_stale_tmp(now)
+        entries = sorted(self.entries(), key=lambda entry: entry[2], reverse=True)
+        kept_size = 0
+        removed = 0
+        removed_size = 0
+        for path, size, mtime in entries:
+            if now - mtime <= max_age and kept_size + size <= max_size:
+                kept_size += size
+                continue
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                # removed by a concurrent prune
+                continue
+            except OSError as exc:
+                LOG.debug("Unable to remove %s: %s", path, exc)
+                continue
+            removed += 1
+            removed_size += size
+
+        if removed:
+            LOG.debug("Render cache pruned, %d entries removed", removed)
+        return removed, removed_size
+
+    def clear(self) -> int:
+        """
+        Remove all entries.
+
+        :return: Number of removed entries.
+        :rtype: int
+        """
+        removed = 0
+        for path, _, _ in self.entries():
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            removed += 1
+        return removed
+
+    def _remove_stale_tmp(self, now: float) -> None:
+        """Remove temporary files of stores interrupted long ago."""
+        try:
+            with os.scandir(self.directory) as dir_entries:
+                subdirs = [entry.path for entry in dir_entries]
+        except OSError:
+            return
+        for subdir in subdirs:
+            try:
+                with os.scandir(subdir) as dir_entries:
+                    for entry in dir_entries:
+                        if (
+                            entry.name.endswith(TMP_SUFFIX)
+                            and now - entry.stat().st_mtime > STALE_TMP_SECONDS
+                        ):
+                            os.unlink(entry.path)
+            except OSError:
+                continue
+
+
+def format_size(size: int) -> str:
+    """
+    Format a size in bytes for humans.
+
+    :param size: Size in bytes.
+    :type size: int
+    :return: Formatted size, e.g. '1.5 MiB'.
+    :rtype: str
+    """
+    value = float(size)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if value < 1024 or unit == "GiB":
+            break
+        value /= 1024
+    return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Inspect and prune the render cache from the command line.
+
+    :param argv: Command line arguments.
+    :type argv: list[str] | None
+    :return: Exit code.
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(
+        prog=f"python -m {__name__}",
+        description="Inspect and prune the render cache.",
+    )
+    parser.add_argument(
+        "action",
+        choices=("info", "prune", "clear"),
+        help="Show statistics, remove least recently used entries beyond"
+        " the limits, or remove all entries",
+    )
+    parser.add_argument(
+        "--dir",
+        metavar="DIR",
+        help=f"Render cache directory, default: ${RENDER_CACHE_ENV}",
+    )
+    parser.add_argument(
+        "--max-size",
+        type=parse_size,
+        help=f"Size limit for prune, e.g. 512M"
+        f" (default: ${RENDER_CACHE_MAX_SIZE_ENV} or {format_size(DEFAULT_MAX_SIZE)})",
+    )
+    parser.add_argument(
+        "--max-age",
+        type=parse_age,
+        help=f"Age limit for prune, e.g. 7d"
+        f" (default: ${RENDER_CACHE_MAX_AGE_ENV} or {DEFAULT_MAX_AGE // 86400}d)",
+    )
+    options = parser.parse_args(argv)
+
+    if options.dir:
+        set_render_cache_dir(options.dir)
+    render_cache = get_render_cache()
+    if render_cache is None:
+        parser.error(f"No render cache, use --dir or ${RENDER_CACHE_ENV}")
+
+    if options.action == "prune":
+        removed, removed_size = render_cache.prune(options.max_size, options.max_age)
+        print(f"Removed {removed} entries ({format_size(removed_size)})")
+    elif options.action == "clear":
+        print(f"Removed {render_cache.clear()} entries")
+
+    info = render_cache.info()
+    oldest = info["oldest"]
+    print(f"Directory: {info['directory']}")
+    print(f"Entries: {info['entries']}")
+    print(f"Size: {format_size(info['size'])}")
+    if oldest is not None:
+        print(f"Least recently used: {oldest / 3600:.1f} hours ago")
+    return 0
+
+
+if __name__ == "__main__":
+    logger_settings.config_console_logger(level=logging.WARNING)
+    sys.exit(main())
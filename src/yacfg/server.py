@@ -0,0 +1,399 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+from typing import Any, Dict, Optional
+
+import yacfg
+from . import NAME, exceptions
+from .config_data import SOURCE_DATE_EPOCH_ENV, GenerateOptions, RenderOptions
+from .exceptions import GenerationError, ServerError
+from .files import select_profile_file, select_template_dir
+
+LOG: logging.Logger = logging.getLogger(NAME)
+
+# environment variable with the socket of a render server used by the CLI
+SERVER_SOCKET_ENV = "YACFG_SERVER"
+
+# seconds to wait for a connection to the server
+CONNECT_TIMEOUT = 1.0
+
+
+# environment variables with search paths, which may be relative
+# to the client directory
+PATH_ENVIRONMENT = ("YACFG_PROFILES", "YACFG_TEMPLATES")
+
+# generate() parameters sent as lists of their (named tuple) values
+OPTIONS_PARAMETERS = {
+    "render_options": RenderOptions,
+    "generate_options": GenerateOptions,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def generate_parameters() -> frozenset:
+    """
+    Get parameter names of generate().
+
+    :return: Parameter names.
+    :rtype: frozenset[str]
+    """
+    from .yacfg import generate
+
+    return frozenset(inspect.signature(generate).parameters)
+
+
+def generation_environment() -> Dict[str, str]:
+    """
+    Get the environment variables the generation depends on, a server
+    only serves clients with the same environment. Search paths are
+    compared as absolute paths, and cache directories as selected
+    (by the environment or the CLI options).
+
+    :return: Environment variable name -> value.
+    :rtype: dict[str, str]
+    """
+    from .render_cache import RENDER_CACHE_ENV, get_render_cache_dir
+    from .templates import BYTECODE_CACHE_ENV, get_bytecode_cache_dir
+
+    environment = {
+        key: os.path.abspath(value) if key in PATH_ENVIRONMENT and value else value
+        for key, value in os.environ.items()
+        if (key.startswith("YACFG_") or key == SOURCE_DATE_EPOCH_ENV)
+        and key != SERVER_SOCKET_ENV
+    }
+    for key, cache_dir in (
+        (BYTECODE_CACHE_ENV, get_bytecode_cache_dir()),
+        (RENDER_CACHE_ENV, get_render_cache_dir()),
+    ):
+        environment.pop(key, None)
+        if cache_dir:
+            environment[key] = cache_dir
+    return environment
+
+
+def encode_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Prepare generate() parameters to be sent to a server, the profile
+    and the template set are resolved by the client (they may be
+    relative to its directory, or in its ./profiles/ and ./templates/),
+    and paths are made absolute.
+
+    :param params: Parameters of generate().
+    :type params: dict
+    :return: JSON serializable parameters.
+    :rtype: dict
+    :raises ProfileError: If the profile does not exist.
+    :raises TemplateError: If the template set does not exist.
+    """
+    params = dict(params)
+    if params.get("profile"):
+        profile_name, profile_path = select_profile_file(params["profile"])
+        params["profile"] = os.path.abspath(os.path.join(profile_path, profile_name))
+    if params.get("template"):
+        params["template"] = os.path.abspath(select_template_dir(params["template"]))
+    if params.get("output_path"):
+        params["output_path"] = os.path.abspath(params["output_path"])
+    if params.get("tuning_files_list"):
+        params["tuning_files_list"] = [
+            os.path.abspath(path) for path in params["tuning_files_list"]
+        ]
+    for key in OPTIONS_PARAMETERS:
+        if params.get(key) is not None:
+            params[key] = list(params[key])
+    return params
+
+
+def decode_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Get generate() parameters of a request.
+
+    :param params: Request parameters (see encode_params()).
+    :type params: dict
+    :return: Parameters of generate().
+    :rtype: dict
+    :raises ServerError: If there are unknown or missing parameters.
+    """
+    unknown = set(params) - generate_parameters()
+    if unknown:
+        raise ServerError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+    if "profile" not in params:
+        raise ServerError("Missing parameter profile")
+    params = dict(params)
+    for key, options_type in OPTIONS_PARAMETERS.items():
+        if params.get(key) is not None:
+            params[key] = options_type(*params[key])
+    return params
+
+
+def serve_generate(
+    profile: str,
+    tuning_files_list: Optional[list] = None,
+    tuning_data_list: Optional[list] = None,
+    **params: Any,
+) -> Dict[str, str]:
+    """
+    Generate like generate(), with errors raised instead of exiting.
+
+    :param profile: Name of packaged profile, or path to user provided profile.
+    :type profile: str
+    :param tuning_files_list: Additional yaml tuning files.
+    :type tuning_files_list: list[str] | None
+    :param tuning_data_list: Additional tuning data.
+    :type tuning_data_list: list[dict] | None
+    :param params: Other generate() parameters.
+    :return: Mapping of filename to generated data.
+    :rtype: dict[str, str]
+    """
+    from .yacfg import generate_profile
+
+    return generate_profile(
+        profile=profile,
+        tuning_files_list=tuning_files_list,
+        tuning_data_list=tuning_data_list,
+        **params,
+    )
+
+
+def handle_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Handle a single request of a client.
+
+    Requests are {"method": "generate", "params": {...}, "env": {...}}
+    or {"method": "ping"}, responses are {"result": ...}
+    or {"error": {"type": exception class name, "message": ...}}.
+
+    :param request: Decoded request.
+    :type request: dict
+    :return: Response.
+    :rtype: dict
+    """
+    try:
+        method = request.get("method")
+        if method == "ping":
+            return {"result": {"version": yacfg.__version__, "pid": os.getpid()}}
+        if method != "generate":
+            raise ServerError(f"Unknown method '{method}'")
+        if request.get("env", {}) != generation_environment():
+            raise ServerError("Client environment differs from the server one")
+        params = decode_params(request.get("params") or {})
+        LOG.info("Generating %s", params["profile"])
+        return {"result": serve_generate(**params)}
+    except exceptions.YacfgException as exc:
+        return {"error": {"type": type(exc).__name__, "message": str(exc)}}
+    except Exception as exc:
+        LOG.exception("Request failed")
+        return {"error": {"type": GenerationError.__name__, "message": str(exc)}}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handles JSON line requests of a connection."""
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("request is not an object")
+            except ValueError as exc:
+                response = {
+                    "error": {
+                        "type": ServerError.__name__,
+                        "message": f"Invalid request: {exc}",
+                    }
+                }
+            else:
+                response = handle_request(request)
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+
+    class RenderServer(socketserver.ThreadingUnixStreamServer):
+        """
+        Render server on a Unix domain socket, every connection is handled
+        in its own thread. Template environments, parsed profiles and tuning
+        files stay cached in memory between requests.
+        """
+
+        daemon_threads = True
+
+        def __init__(self, socket_path: str) -> None:
+            remove_stale_socket(socket_path)
+            # only the user may connect, the socket is never accessible
+            # by others (unlike with chmod after it is bound)
+            umask = os.umask(0o177)
+            try:
+                super().__init__(socket_path, _RequestHandler)
+            finally:
+                os.umask(umask)
+
+        def server_close(self) -> None:
+            super().server_close()
+            try:
+                os.unlink(self.server_address)
+            except OSError:
+                pass
+
+
+def remove_stale_socket(socket_path: str) -> None:
+    """
+    Remove a socket left behind by a server which is not running.
+
+    :param socket_path: Socket path.
+    :type socket_path: str
+    :raises ServerError: If a server is running on the socket,
+        or the path is not a socket.
+    """
+    try:
+        mode = os.stat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise ServerError(f"'{socket_path}' exists and is not a socket")
+    try:
+        with _connect(socket_path):
+            pass
+    except OSError:
+        os.unlink(socket_path)
+    else:
+        raise ServerError(f"A server is already running on '{socket_path}'")
+
+
+def serve(socket_path: str) -> None:
+    """
+    Run a render server until interrupted (SIGINT, SIGTERM).
+
+    :param socket_path: Unix domain socket path.
+    :type socket_path: str
+    :raises ServerError: If the server cannot be started.
+    """
+    if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+        raise ServerError("Unix domain sockets are not supported on this platform")
+
+    try:
+        server = RenderServer(socket_path)
+    except OSError as exc:
+        raise ServerError(f"Unable to listen on '{socket_path}': {exc}")
+
+    def terminate(*_: Any) -> None:
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, terminate)
+    LOG.info("Serving on %s", socket_path)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        LOG.info("Server stopped")
+    finally:
+        server.server_close()
+
+
+def _connect(socket_path: str) -> socket.socket:
+    """Connect to a server socket."""
+    client_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client_socket.settimeout(CONNECT_TIMEOUT)
+        client_socket.connect(socket_path)
+        client_socket.settimeout(None)
+    except BaseException:
+        client_socket.close()
+        raise
+    return client_socket
+
+
+class RenderClient(object):
+    """
+    Client of a render server.
+
+    :param socket_path: Unix domain socket path of the server.
+    :type socket_path: str
+    """
+
+    def __init__(self, socket_path: str) -> None:
+        self.socket_path = socket_path
+
+    def request(self, request: Dict[str, Any]) -> Any:
+        """
+        Send a request to the server.
+
+        :param request: Request, see handle_request().
+        :type request: dict
+        :return: Result of the request.
+        :raises ServerError: If the server is not available or cannot
+            handle the request.
+        :raises YacfgException: Errors of the request (e.g. GenerationError).
+        """
+        if not hasattr(socket, "AF_UNIX"):
+            raise ServerError("Unix domain sockets are not supported on this platform")
+        try:
+            with _connect(self.socket_path) as client_socket:
+                client_socket.sendall(json.dumps(request).encode("utf-8") + b"\n")
+                with client_socket.makefile("rb") as stream:
+                    response = json.loads(stream.readline())
+        except (OSError, ValueError) as exc:
+            raise ServerError(f"Server '{self.socket_path}' not available: {exc}")
+
+        if "error" in response:
+            error = response["error"]
+            exception_class = getattr(exceptions, error.get("type", ""), None)
+            if not (
+                isinstance(exception_class, type)
+                and issubclass(exception_class, exceptions.YacfgException)
+            ):
+                exception_class = GenerationError
+            raise exception_class(error.get("message", ""))
+        return response.get("result")
+
+    def generate(self, **params: Any) -> Dict[str, str]:
+        """
+        Generate via the server, takes the same parameters as generate().
+
+        :return: Mapping of filename to generated data.
+        :rtype: dict[str, str]
+        :raises ServerError: If the server is not available or cannot
+            handle the request.
+        :raises YacfgException: Errors of the generation.
+        """
+        return self.request(
+            {
+                "method": "generate",
+                "params": encode_params(params),
+                "env": generation_environment(),
+            }
+        )
+
+
+def generate_with_server(
+    socket_path: Optional[str] = None, **params: Any
+) -> Dict[str, str]:
+    """
+    Generate via a render server when one is available, otherwise
+    in-process via generate(), which takes the same parameters.
+
+    :param socket_path: Unix domain socket path of the server,
+        defaults to $YACFG_SERVER.
+    :type socket_path: str | None
+    :return: Mapping of filename to generated data.
+    :rtype: dict[str, str]
+    """
+    socket_path = socket_path or os.getenv(SERVER_SOCKET_ENV)
+    if socket_path:
+        try:
+            return RenderClient(socket_path).generate(**params)
+        except ServerError as exc:
+            LOG.warning("%s, generating in-process", exc)
+        except GenerationError as exc:
+            LOG.error("Generation failed: %s", exc)
+            sys.exit(1)
+
+    from .yacfg import generate
+
+    return generate(**params)
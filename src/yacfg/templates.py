@@ -1,17 +1,202 @@
+import contextvars
+import functools
 import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
 
-from jinja2 import ChoiceLoader, Environment, FileSystemLoader
+from jinja2 import ChoiceLoader, Environment, FileSystemBytecodeCache, FileSystemLoader
 
 from . import NAME
 from .exceptions import TemplateError
 from .files import get_templates_paths, select_template_dir
+from .precompiled import PrecompiledLoader, get_precompiled_paths, select_artifact
 
 LOG: logging.Logger = logging.getLogger(NAME)
 
+# maximum number of cached environments (distinct template sets and search paths)
+ENVIRONMENT_CACHE_SIZE = 32
+
+ENVIRONMENT_EXTENSIONS = ("jinja2_ansible_filters.AnsibleCoreFiltersExtension",)
+
+# environment variable with the directory of persistent template bytecode cache
+BYTECODE_CACHE_ENV = "YACFG_BYTECODE_CACHE"
+
+# bytecode cache directory selected by the user (overrides BYTECODE_CACHE_ENV)
+_bytecode_cache_dir: Optional[str] = None
+
+# extra properties of the ongoing render, see override_value()
+EXTRA_PROPERTIES: "contextvars.ContextVar[Optional[Dict[str, str]]]" = (
+    contextvars.ContextVar("extra_properties", default=None)
+)
+
+
+def override_value(value: str, value_key: str) -> str:
+    """
+    To work around some unexpected conversions by yaml loader
+    for example empty string -> None and OFF -> False
+    callers of yacfg need to pass in any specific key/values
+    and call filter, the filter will override the values
+
+    Extra properties are taken from the ongoing render (EXTRA_PROPERTIES),
+    so cached environments do not carry data from one render to another.
+
+    :param value: Value to override
+    :type value: str
+    :param value_key: Key of the value to override
+    :type value_key: str
+    :return: str
+    """
+    extra_properties_data = EXTRA_PROPERTIES.get()
+    if extra_properties_data and value_key in extra_properties_data:
+        return extra_properties_data[value_key]
+    return value
+
+
+def override_value_map_keys(value: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Replace keys with overrides if possible
+    :param value: Value to override
+    :type value: dict
+    :return: dict
+    """
+    if not EXTRA_PROPERTIES.get():
+        return value
+    return {override_value(key, key): val for key, val in value.items()}
+
+
+def override_value_list_map_keys(value: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Replace keys with overrides if possible
+    in list of maps
+    :param value: Value to override
+    :type value: list of dict
+    :return: list of dict
+    """
+    if not EXTRA_PROPERTIES.get():
+        return value
+    return [override_value_map_keys(item) for item in value]
+
+
+@functools.lru_cache(maxsize=ENVIRONMENT_CACHE_SIZE)
+def get_environment(search_path: Tuple[str, ...], **options: Any) -> Environment:
+    """
+    Get a Jinja2 environment for the template search path.
+
+    Environments are cached process-wide (least recently used are dropped),
+    so compiled templates are reused by all renders with the same search path
+    and options. Use clear_environment_cache() to drop them.
+
+    Templates precompiled for the search path (see precompiled) are loaded
+    from the first usable artifact of the precompiled option.
+
+    :param search_path: Absolute template directories in lookup order.
+    :type search_path: tuple[str]
+    :param options: Extra Jinja2 environment options, and precompiled
+        artifact paths (precompiled).
+    :return: Jinja2 environment.
+    :rtype: Environment
+    """
+    LOG.debug("Creating environment for search path: %s", search_path)
+
+    env_options: Dict[str, Any] = {"trim_blocks": True, "lstrip_blocks": True}
+    env_options.update(options)
+    precompiled: Tuple[str, ...] = env_options.pop("precompiled", ())
+
+    loader = FileSystemLoader(list(search_path))
+    env = Environment(
+        loader=loader, extensions=list(ENVIRONMENT_EXTENSIONS), **env_options
+    )
+    env.filters.update(
+        {
+            "overridevalue": override_value,
+            "overridevalue_listmapkeys": override_value_list_map_keys,
+        }
+    )
+
+    if precompiled:
+        selected = select_artifact(env, search_path, precompiled)
+        if selected is not None:
+            LOG.debug("Using precompiled templates %s", selected[0])
+            env.loader = PrecompiledLoader(search_path, *selected)
+    return env
+
+
+def clear_environment_cache() -> None:
+    """Drop all cached Jinja2 environments (and their compiled templates)."""
+    get_environment.cache_clear()
+
+
+def set_bytecode_cache_dir(path: Optional[str]) -> None:
+    """
+    Select a directory for the persistent template bytecode cache,
+    it takes precedence over the YACFG_BYTECODE_CACHE environment variable.
+
+    :param path: Cache directory, or None to use the environment variable only.
+    :type path: str | None
+    """
+    global _bytecode_cache_dir
+    _bytecode_cache_dir = path
+
+
+def get_bytecode_cache_dir() -> Optional[str]:
+    """
+    Get the directory of the persistent template bytecode cache, if enabled.
+
+    :return: Absolute cache directory path, or None when the cache is disabled.
+    :rtype: str | None
+    """
+    path = _bytecode_cache_dir or os.getenv(BYTECODE_CACHE_ENV)
+    if not path:
+        return None
+    return os.path.abspath(path)
+
+
+@functools.lru_cache(maxsize=None)
+def get_bytecode_cache(directory: str) -> FileSystemBytecodeCache:
+    """
+    Get a Jinja2 bytecode cache stored in the directory.
+
+    Cached bytecode is checked against the template source checksum when
+    loaded, and it is written via a temporary file and an atomic rename,
+    so the directory can be shared by concurrent processes.
+
+    :param directory: Absolute path to the cache directory,
+        it will be created if it does not exist.
+    :type directory: str
+    :return: Bytecode cache.
+    :rtype: FileSystemBytecodeCache
+    """
+    os.makedirs(directory, exist_ok=True)
+    LOG.debug("Using template bytecode cache %s", directory)
+    return FileSystemBytecodeCache(directory)
+
+
+def get_environment_options() -> Dict[str, Any]:
+    """
+    Get user selected Jinja2 environment options for get_environment().
+
+    :return: Environment options.
+    :rtype: dict
+    """
+    options: Dict[str, Any] = {}
+
+    bytecode_cache_dir = get_bytecode_cache_dir()
+    if bytecode_cache_dir:
+        try:
+            options["bytecode_cache"] = get_bytecode_cache(bytecode_cache_dir)
+        except OSError as exc:
+            LOG.warning(f"Template bytecode cache disabled: {exc}")
+
+    precompiled = get_precompiled_paths()
+    if precompiled:
+        options["precompiled"] = precompiled
+
+    return options
+
 
 def get_template_environment(template_name: str) -> Environment:
     """
-    Create Jinja2 environment for the selected template.
+    Get Jinja2 environment for the selected template.
 
     :param template_name: Name of the template set or path to a user-specified template set.
     :type template_name: str
@@ -19,18 +204,17 @@ def get_template_environment(template_name: str) -> Environment:
     :rtype: Environment
     :raises TemplateError: If there is a problem with the templating environment.
     """
-    LOG.debug(f"Template name: {template_name}")
+    LOG.debug("Template name: %s", template_name)
 
     selected_template_path = select_template_dir(template_name)
-    LOG.debug(f"Selected template path: {selected_template_path}")
+    LOG.debug("Selected template path: %s", selected_template_path)
 
     try:
-        loader = FileSystemLoader([selected_template_path, *get_templates_paths()])
-        extensions = ["jinja2_ansible_filters.AnsibleCoreFiltersExtension"]
-
-        env = Environment(
-            loader=loader, trim_blocks=True, lstrip_blocks=True, extensions=extensions
+        search_path = tuple(
+            os.path.abspath(path)
+            for path in (selected_template_path, *get_templates_paths())
         )
+        env = get_environment(search_path, **get_environment_options())
     except Exception as e:
         LOG.exception("Error creating the Jinja2 environment.")
         raise TemplateError(
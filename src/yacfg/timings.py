@@ -0,0 +1,226 @@
+import contextlib
+import contextvars
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+# generation stages, in the order of a generation
+STAGE_PROFILE_TEMPLATE = "profile_template"
+STAGE_PROFILE_DEFAULTS = "profile_defaults"
+STAGE_TUNING_FILES = "tuning_files"
+STAGE_PROFILE_RENDER = "profile_render"
+STAGE_PROFILE_PARSE = "profile_parse"
+STAGE_ENVIRONMENT = "environment"
+STAGE_TEMPLATE_LIST = "template_list"
+STAGE_RENDER = "render"
+STAGE_WRITE = "write"
+STAGES = (
+    STAGE_PROFILE_TEMPLATE,
+    STAGE_PROFILE_DEFAULTS,
+    STAGE_TUNING_FILES,
+    STAGE_PROFILE_RENDER,
+    STAGE_PROFILE_PARSE,
+    STAGE_ENVIRONMENT,
+    STAGE_TEMPLATE_LIST,
+    STAGE_RENDER,
+    STAGE_WRITE,
+)
+
+# timings collected for the ongoing generation, see collect()
+TIMINGS: "contextvars.ContextVar[Optional[Timings]]" = contextvars.ContextVar(
+    "timings", default=None
+)
+
+
+class Timings(object):
+    """
+    Wall and CPU times (seconds) of generation stages and of renders
+    of individual main templates.
+
+    Stages and templates are measured in the thread doing the work, so
+    with concurrent jobs stage times add up to more than the wall time
+    of the whole generation, and CPU time is the CPU time of that thread.
+    """
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.templates: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _add(
+        entries: Dict[str, Dict[str, float]], name: str, wall: float, cpu: float
+    ) -> None:
+        entry = entries.setdefault(name, {"wall": 0.0, "cpu": 0.0, "count": 0})
+        entry["wall"] += wall
+        entry["cpu"] += cpu
+        entry["count"] += 1
+
+    def add_stage(self, stage: str, wall: float, cpu: float) -> None:
+        """
+        Record a run of a stage.
+
+        :param stage: Stage name (see STAGES).
+        :type stage: str
+        :param wall: Wall time.
+        :type wall: float
+        :param cpu: CPU time.
+        :type cpu: float
+        """
+        with self._lock:
+            self._add(self.stages, stage, wall, cpu)
+
+    def add_template(self, template_name: str, wall: float, cpu: float) -> None:
+        """
+        Record a render of a main template (counted in the render stage too).
+
+        :param template_name: Main template name.
+        :type template_name: str
+        :param wall: Wall time.
+        :type wall: float
+        :param cpu: CPU time.
+        :type cpu: float
+        """
+        with self._lock:
+            self._add(self.templates, template_name, wall, cpu)
+            self._add(self.stages, STAGE_RENDER, wall, cpu)
+
+    def merge(self, data: Dict[str, Any]) -> None:
+        """
+        Add timings collected elsewhere (e.g. in a worker process).
+
+        :param data: Timings, see as_dict().
+        :type data: dict
+        """
+        with self._lock:
+            for key, entries in (
+                ("stages", self.stages),
+                ("templates", self.templates),
+            ):
+                for name, entry in data.get(key, {}).items():
+                    current = entries.setdefault(
+                        name, {"wall": 0.0, "cpu": 0.0, "count": 0}
+                    )
+                    for field in ("wall", "cpu", "count"):
+                        current[field] += entry[field]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Get the timings as plain data.
+
+        :return: {"stages": {stage: {"wall": s, "cpu": s, "count": n}},
+            "templates": {template name: {...}}}
+        :rtype: dict
+        """
+        with self._lock:
+            order = {stage: index for index, stage in enumerate(STAGES)}
+            return {
+                "stages": {
+                    name: dict(self.stages[name])
+                    for name in sorted(
+                        self.stages, key=lambda name: order.get(name, len(order))
+                    )
+                },
+                "templates": {
+                    name: dict(entry) for name, entry in self.templates.items()
+                },
+            }
+
+    def format(self) -> str:
+        """
+        Format the timings as a table.
+
+        :return: Table of stages and templates.
+        :rtype: str
+        """
+        data = self.as_dict()
+        lines = [f"{'stage':<40} {'wall ms':>10} {'cpu ms':>10} {'count':>6}"]
+        for title, entries in (("", data["stages"]), ("  ", data["templates"])):
+            for name, entry in entries.items():
+                lines.append(
+                    f"{title + name:<40} {entry['wall'] * 1000:>10.2f}"
+                    f" {entry['cpu'] * 1000:>10.2f} {entry['count']:>6}"
+                )
+        return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def collect() -> Iterator[Timings]:
+    """
+    Collect timings of generations run in the context, e.g.
+    ``with collect() as timings: generate(...)``.
+
+    :return: Context manager providing the collected timings.
+    """
+    timings = Timings()
+    token = TIMINGS.set(timings)
+    try:
+        yield timings
+    finally:
+        TIMINGS.reset(token)
+
+
+@contextlib.contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Measure a generation stage, when timings are collected.
+
+    :param name: Stage name (see STAGES).
+    :type name: str
+    """
+    timings = TIMINGS.get()
+    if timings is None:
+        yield
+        return
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield
+    finally:
+        timings.add_stage(
+            name, time.perf_counter() - wall_start, time.thread_time() - cpu_start
+        )
+
+
+@contextlib.contextmanager
+def template_render(template_name: str) -> Iterator[None]:
+    """
+    Measure a render of a main template, when timings are collected.
+
+    :param template_name: Main template name.
+    :type template_name: str
+    """
+    timings = TIMINGS.get()
+    if timings is None:
+        yield
+        return
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield
+    finally:
+        timings.add_template(
+            template_name,
+            time.perf_counter() - wall_start,
+            time.thread_time() - cpu_start,
+        )
+
+
+@contextlib.contextmanager
+def profile(filename: str) -> Iterator[None]:
+    """
+    Profile the context with cProfile, and dump the statistics to a file
+    (to be read by pstats). Only the current process is profiled.
+
+    :param filename: Statistics file path.
+    :type filename: str
+    """
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(filename)
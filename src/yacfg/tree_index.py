@@ -0,0 +1,248 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from . import NAME
+from .files import get_cache_dir
+
+LOG: logging.Logger = logging.getLogger(NAME)
+
+INDEX_VERSION = 1
+
+# subdirectory of the cache directory with the index files
+INDEX_SUBDIR = "tree-index"
+
+# directories modified more recently than this are rescanned on the next
+# refresh, changes within the mtime granularity would be missed otherwise
+RACY_MTIME_NS = 2 * 10**9
+
+# index of a tree: directory path relative to the root ("" for the root)
+# -> {"mtime": ns, "dirs": [names], "files": [names], "links": [names]}
+TreeDirs = Dict[str, Dict[str, Any]]
+
+
+def scan_dir(path: str, mtime: int) -> Dict[str, Any]:
+    """
+    Scan a single directory for the index.
+
+    :param path: Directory path.
+    :type path: str
+    :param mtime: Modification time of the directory (ns).
+    :type mtime: int
+    :return: Index entry of the directory.
+    :rtype: dict
+    """
+    dirs: List[str] = []
+    files: List[str] = []
+    links: List[str] = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    dirs.append(entry.name)
+                    # like os.walk(), symlinked directories are not descended
+                    if entry.is_symlink():
+                        links.append(entry.name)
+                else:
+                    files.append(entry.name)
+    except OSError as exc:
+        LOG.debug("Unable to scan %s: %s", path, exc)
+
+    if time.time_ns() - mtime < RACY_MTIME_NS:
+        mtime = -1
+
+    return {
+        "mtime": mtime,
+        "dirs": sorted(dirs),
+        "files": sorted(files),
+        "links": sorted(links),
+    }
+
+
+def refresh_tree(root: str, old_dirs: TreeDirs) -> Tuple[TreeDirs, bool]:
+    """
+    Bring a tree index up to date.
+
+    Every indexed directory is checked with a stat (the cost of a refresh
+    of an unchanged tree), only directories with a changed modification
+    time (and new ones) are scanned again.
+
+    :param root: Root directory of the tree.
+    :type root: str
+    :param old_dirs: Previous index of the tree.
+    :type old_dirs: dict
+    :return: Current index and whether it differs from the previous one.
+    :rtype: tuple[dict, bool]
+    """
+    dirs: TreeDirs = {}
+    pending = [""]
+    while pending:
+        relative_path = pending.pop()
+        path = os.path.join(root, relative_path) if relative_path else root
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+
+        entry = old_dirs.get(relative_path)
+        if entry is None or entry["mtime"] != mtime:
+            LOG.debug("Scanning %s", path)
+            entry = scan_dir(path, mtime)
+        dirs[relative_path] = entry
+
+        pending.extend(
+            os.path.join(relative_path, name) if relative_path else name
+            for name in reversed(entry["dirs"])
+            if name not in entry["links"]
+        )
+
+    # rescanned directories (e.g. recently modified) may not have changed
+    return dirs, dirs != old_dirs
+
+
+class TreeIndex:
+    """
+    Directory trees listing, stored in index files of the cache directory.
+
+    Indexes are loaded on the first use, refreshed (see refresh_tree())
+    on every walk, and written back only when the listing of a directory
+    changed. Index files are stored in the tree-index subdirectory of
+    files.get_cache_dir() ($YACFG_CACHE_DIR, ~/.cache/yacfg by default).
+    When the cache directory is not writable, indexes are kept in memory
+    only.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None) -> None:
+        self.cache_dir = cache_dir
+        self._trees: Dict[str, TreeDirs] = {}
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        """Forget the indexes loaded in memory."""
+        with self._lock:
+            self._trees.clear()
+
+    def index_file(self, root: str) -> str:
+        """
+        Get the index file path of a tree.
+
+        :param root: Absolute path of the tree root.
+        :type root: str
+        :return: Index file path.
+        :rtype: str
+        """
+        cache_dir = self.cache_dir or get_cache_dir()
+        digest = hashlib.sha1(root.encode("utf-8")).hexdigest()
+        return os.path.join(cache_dir, INDEX_SUBDIR, f"{digest}.json")
+
+    def load(self, root: str) -> TreeDirs:
+        """
+        Load the stored index of a tree.
+
+        :param root: Absolute path of the tree root.
+        :type root: str
+        :return: Stored index, empty when missing or not usable.
+        :rtype: dict
+        """
+        try:
+            with open(self.index_file(root), "r") as index_file:
+                data = json.load(index_file)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != INDEX_VERSION or data.get("root") != root:
+            return {}
+        return data.get("dirs", {})
+
+    def store(self, root: str, dirs: TreeDirs) -> None:
+        """
+        Store the index of a tree (atomically replacing the previous one).
+
+        :param root: Absolute path of the tree root.
+        :type root: str
+        :param dirs: Index of the tree.
+        :type dirs: dict
+        """
+        index_file = self.index_file(root)
+        index_dir = os.path.dirname(index_file)
+        try:
+            os.makedirs(index_dir, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=index_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as tmp_file:
+                    json.dump(
+                        {"version": INDEX_VERSION, "root": root, "dirs": dirs},
+                        tmp_file,
+                    )
+                os.replace(tmp_name, index_file)
+            except BaseException:
+                os.unlink(tmp_name)
+                raise
+        except OSError as exc:
+            LOG.debug("Unable to store index of %s: %s", root, exc)
+
+    def get_tree(self, root: str) -> TreeDirs:
+        """
+        Get an up to date index of a tree.
+
+        :param root: Tree root directory.
+        :type root: str
+        :return: Index of the tree.
+        :rtype: dict
+        """
+        root = os.path.abspath(root)
+        with self._lock:
+            old_dirs = self._trees.get(root)
+            if old_dirs is None:
+                old_dirs = self.load(root)
+            dirs, changed = refresh_tree(root, old_dirs)
+            self._trees[root] = dirs
+            if changed:
+                self.store(root, dirs)
+        return dirs
+
+    def walk(self, top: str) -> Iterator[Tuple[str, List[str], List[str]]]:
+        """
+        Walk a directory tree top-down like os.walk(), using the index.
+
+        :param top: Tree root directory.
+        :type top: str
+        :return: Iterator of (dirpath, dirnames, filenames).
+        """
+        dirs = self.get_tree(top)
+        pending = [""]
+        while pending:
+            relative_path = pending.pop()
+            entry = dirs.get(relative_path)
+            if entry is None:
+                continue
+            path = os.path.join(top, relative_path) if relative_path else top
+            yield path, list(entry["dirs"]), list(entry["files"])
+            pending.extend(
+                os.path.join(relative_path, name) if relative_path else name
+                for name in reversed(entry["dirs"])
+                if name not in entry["links"]
+            )
+
+
+# index used by the query functions
+TREE_INDEX = TreeIndex()
+
+
+def walk_tree(top: str) -> Iterator[Tuple[str, List[str], List[str]]]:
+    """
+    Walk a directory tree top-down like os.walk(), using TREE_INDEX.
+
+    :param top: Tree root directory.
+    :type top: str
+    :return: Iterator of (dirpath, dirnames, filenames).
+    """
+    return TREE_INDEX.walk(top)
@@ -1,20 +1,54 @@
+import concurrent.futures
+import contextvars
+import functools
+import hashlib
 import logging
 import os
 import sys
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import yaml
 import jinja2
 from jinja2 import Environment, Template
 
 from . import NAME
-from .config_data import RenderOptions, add_render_config, add_template_metadata
+from .config_data import (
+    SOURCE_DATE_EPOCH_ENV,
+    GenerateOptions,
+    RenderOptions,
+    add_render_config,
+    add_template_metadata,
+    get_metadata_timestamp,
+)
 from .exceptions import GenerationError, TemplateError
 from .files import ensure_output_path, get_output_filename
-from .output import write_output
+from .incremental import (
+    MANIFEST_FILENAME,
+    OutputFingerprints,
+    OutputManifest,
+    is_unchanged_file,
+)
+from .logger_settings import lazy
+from .output import OutputWriter, write_output, yaml_dump_wrapper
 from .profiles import get_tuned_profile
 from .query import filter_template_list, get_main_template_list
-from .templates import get_template_environment
+from .render_cache import RenderCache, get_render_cache
+from .templates import (
+    EXTRA_PROPERTIES,
+    get_environment,
+    get_environment_options,
+    get_template_environment,
+)
+from .timings import (
+    STAGE_ENVIRONMENT,
+    STAGE_TEMPLATE_LIST,
+    STAGE_WRITE,
+    TIMINGS,
+    Timings,
+    collect,
+    stage,
+    template_render,
+)
 
 # workaround for flake8: F401 'jinja2.Template' imported but unused
 _t = Template
@@ -22,6 +56,10 @@ _e = Environment
 
 LOG: logging.Logger = logging.getLogger(NAME)
 
+JOBS_MODE_THREAD = "thread"
+JOBS_MODE_PROCESS = "process"
+JOBS_MODES = (JOBS_MODE_THREAD, JOBS_MODE_PROCESS)
+
 
 def generate_core(
     config_data: Dict[str, Any],
@@ -32,6 +70,7 @@ def generate_core(
     render_options: Optional[RenderOptions] = None,
     write_profile_data: bool = False,
     extra_properties_data: Optional[Dict[str, str]] = None,
+    generate_options: Optional[GenerateOptions] = None,
 ) -> Dict[str, str]:
     """Core of the generator, gets complete dataset with selected
     template in config data or explicitly selected via template
@@ -63,99 +102,87 @@ def generate_core(
     :param extra_properties_data: pass in any specific key/values
         and call filter, the filter will override the values
     :type extra_properties_data: dict[str, str]
+    :param generate_options: how outputs are generated (jobs, incremental,
+        reproducible, ...), see GenerateOptions
+    :type generate_options: GenerateOptions or None
 
     :return: mapping of filename to generated data for further use
     :rtype: dict[str, str] or dict[str, unicode]
     """
-    add_template_metadata(config_data)
+    if generate_options is None:
+        generate_options = GenerateOptions()
+
+    if tuned_profile is None and output_path and write_profile_data:
+        # python profiles provide data only, see get_tuned_python_profile()
+        tuned_profile = yaml_dump_wrapper(config_data)
+
+    add_template_metadata(
+        config_data, get_metadata_timestamp(generate_options.reproducible)
+    )
     if render_options:
         add_render_config(config_data, render_options)
 
+    env, template_list = _get_template_list(config_data, template, output_filter)
+
+    LOG.debug(
+        "Config data:\n %s", lazy(yaml.dump, config_data, default_flow_style=False)
+    )
+
+    if output_path:
+        ensure_output_path(output_path)
+        if tuned_profile and write_profile_data:
+            _write_profile_data(
+                output_path, tuned_profile, generate_options.incremental
+            )
+
+    # per-render data for the override filters of the (shared) environment
+    extra_properties_token = EXTRA_PROPERTIES.set(extra_properties_data)
+    try:
+        return generate_outputs(
+            config_data, template_list, env, output_path, generate_options
+        )
+    finally:
+        EXTRA_PROPERTIES.reset(extra_properties_token)
+
+
+def _get_template_list(
+    config_data: Dict[str, Any],
+    template: Optional[str],
+    output_filter: Optional[List[str]],
+) -> Tuple[Environment, List[str]]:
+    """Get the environment of the template set selected by the user or
+    the profile, and its (filtered) main templates for generate_core()."""
     if template is None:
         template = config_data.get("render", {}).get("template")
-        LOG.debug(f"Profile specified template: {template}")
+        LOG.debug("Profile specified template: %s", template)
     if template is None:
         raise TemplateError(
             "Missing template. Neither user nor profile specifies a template."
         )
 
     try:
-        env = get_template_environment(template)
+        with stage(STAGE_ENVIRONMENT):
+            env = get_template_environment(template)
     except TemplateError as exc:
         raise TemplateError(f"Failed to create template environment: {exc}")
 
-    def override_value(value: str, value_key: str) -> str:
-        """
-        To work around some unexpected conversions by yaml loader
-        for example empty string -> None and OFF -> False
-        callers of yacfg need to pass in any specific key/values
-        and call filter, the filter will override the values
+    with stage(STAGE_TEMPLATE_LIST):
+        template_list = get_main_template_list(env)
+        if output_filter:
+            template_list = filter_template_list(template_list, output_filter)
+    return env, template_list
 
-        :param value: Value to override
-        :type value: str
-        :param value_key: Key of the value to override
-        :type value_key: str
-        :return: str
-        """
-        if extra_properties_data and value_key in extra_properties_data:
-            return extra_properties_data[value_key]
-        return value
-
-    def empty_filter(value: str, value_key: str) -> str:
-        """
-        Simply pass the value
-
-        :param value: Value to filter
-        :type value: str
-        :param value_key: Key of the value to filter
-        :type value_key: str
-        :return: str
-        """
-        # noinspection PyStatementEffect
-        value_key
-        return value
-
-    def override_value_list_map_keys(
-        value: List[Dict[str, Any]]
-    ) -> List[Dict[str, Any]]:
-        """
-        Replace keys with overrides if possible
-        in list of maps
-        :param value: Value to override
-        :type value: list of dict
-        :return: list of dict
-        """
-        return [override_value_map_keys(item) for item in value]
-
-    def override_value_map_keys(value: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Replace keys with overrides if possible
-        :param value: Value to override
-        :type value: dict
-        :return: dict
-        """
-        return {override_value(key, key): val for key, val in value.items()}
-
-    # Pass empty filter for performance if extra_properties_data is not defined (no more conditions)
-    env.filters["overridevalue"] = (
-        override_value if extra_properties_data else empty_filter
-    )
-    env.filters["overridevalue_listmapkeys"] = (
-        override_value_list_map_keys if extra_properties_data else empty_filter
-    )
-
-    template_list = get_main_template_list(env)
-    if output_filter:
-        template_list = filter_template_list(template_list, output_filter)
-
-    LOG.debug(f"Config data:\n {yaml.dump(config_data, default_flow_style=False)}")
-
-    if output_path and tuned_profile:
-        ensure_output_path(output_path)
-        if write_profile_data:
-            write_output("profile_data.yaml", output_path, tuned_profile)
 
-    return generate_outputs(config_data, template_list, env, output_path)
+def _write_profile_data(
+    output_path: str, tuned_profile: str, incremental: bool
+) -> None:
+    """Write the tuned profile to the output path for generate_core(),
+    in incremental mode only when it changed."""
+    profile_data_path = os.path.join(output_path, "profile_data.yaml")
+    if incremental and is_unchanged_file(profile_data_path, tuned_profile):
+        return
+    with stage(STAGE_WRITE):
+        write_output("profile_data.yaml", output_path, tuned_profile)
 
 
 def generate(
@@ -168,6 +195,7 @@ def generate(
     tuning_data_list: Optional[List[Dict[str, Any]]] = None,
     write_profile_data: bool = False,
     extra_properties_data: Optional[Dict[str, str]] = None,
+    generate_options: Optional[GenerateOptions] = None,
 ) -> dict[str, str]:
     """Generate procedure using a list of tuning data
 
@@ -203,33 +231,63 @@ def generate(
     :param extra_properties_data: properties that can be used to help
         process templates with additional info
     :type extra_properties_data: dict[str, str]
+    :param generate_options: how outputs are generated (jobs, incremental,
+        reproducible, ...), see GenerateOptions
+    :type generate_options: GenerateOptions | None
 
     :return: mapping of filename to generated data for further use
     :rtype: dict[str, str] or dict[str, unicode]
     """
-
-    config_data, tuned_profile = get_tuned_profile(
-        profile=profile,
-        tuning_files_list=tuning_files_list,
-        tuning_data_list=tuning_data_list,
-    )
-
     try:
-        return generate_core(
-            config_data=config_data,
-            tuned_profile=tuned_profile,
+        return generate_profile(
+            profile=profile,
+            tuning_files_list=tuning_files_list,
+            tuning_data_list=tuning_data_list,
             template=template,
             output_path=output_path,
             output_filter=output_filter,
             render_options=render_options,
             write_profile_data=write_profile_data,
             extra_properties_data=extra_properties_data,
+            generate_options=generate_options,
         )
     except GenerationError as exc:
         LOG.error(f"Generation failed: {exc}")
         sys.exit(1)
 
 
+def generate_profile(
+    profile: str,
+    tuning_files_list: Optional[List[str]] = None,
+    tuning_data_list: Optional[List[Dict[str, Any]]] = None,
+    **params: Any,
+) -> Dict[str, str]:
+    """Generate like generate(), with generation errors raised instead
+    of exiting.
+
+    :param profile: name of packaged profile,
+        or path to user provided profile
+    :type profile: str
+    :param tuning_files_list: Additional yaml tuning files with tuning
+        values.
+    :type tuning_files_list: list[str] | None
+    :param tuning_data_list: Additional user values to fine-tune the profile
+        before applying it to the template.
+    :type tuning_data_list: list[dict] | None
+    :param params: other generate() parameters
+
+    :return: mapping of filename to generated data for further use
+    :rtype: dict[str, str]
+    :raises GenerationError: if there is a problem with the generation
+    """
+    config_data, tuned_profile = get_tuned_profile(
+        profile=profile,
+        tuning_files_list=tuning_files_list,
+        tuning_data_list=tuning_data_list,
+    )
+    return generate_core(config_data=config_data, tuned_profile=tuned_profile, **params)
+
+
 # main alias
 main = generate
 
@@ -239,11 +297,15 @@ def generate_outputs(
     template_list: List[str],
     env: Environment,
     output_path: Optional[str] = None,
+    generate_options: Optional[GenerateOptions] = None,
 ) -> Dict[str, str]:
     """Generate output files based on config_data, (filtered) template list,
     within the provided jinja environment, and if output_path is specified, then
     write results to that directory.
 
+    With more than one job, templates are rendered concurrently, while
+    results are still processed (logged, written) in template list order.
+
     .. note: output_path directory has to be created before.
 
     :param config_data: configuration data mapping for templating
@@ -255,58 +317,577 @@ def generate_outputs(
     :param output_path: path where to generate output files,
         or None to do a dry run
     :type output_path: str | None
+    :param generate_options: how outputs are generated, see GenerateOptions,
+        process pool jobs mode requires a file system loader environment,
+        incremental mode compares outputs with the manifest in output_path
+    :type generate_options: GenerateOptions | None
 
     :raises GenerationError: when there was a problem with generating one of
         config files
     """
-    result_data: Dict[str, str] = {}
-    generate_exception: Optional[GenerationError] = None
-
     # TODO: volkswagen mode on
     if "PYTEST_CURRENT_TEST" not in os.environ:
         if output_path and not os.path.exists(output_path):
             raise GenerationError(f"Output path '{output_path}' does not exist.")
 
+    if generate_options is None:
+        generate_options = GenerateOptions()
+
     # metadata structure initialization,
     # if called without add_template_metadata()
     if "metadata" not in config_data:
         config_data["metadata"] = {}
 
-    for template_name in template_list:
+    writer, manifest = _output_targets(output_path, env, config_data, generate_options)
+
+    try:
+        generation = _OutputsGeneration(
+            config_data,
+            env,
+            writer,
+            manifest,
+            generate_options,
+            _get_render_cache(generate_options),
+        )
+        result_data, generate_exception = generation.run(template_list)
+    except BaseException:
+        if writer:
+            writer.abort()
+        raise
+
+    if writer:
+        _finish_outputs(writer, manifest, generate_exception)
+
+    if generate_exception:
+        raise generate_exception
+
+    return result_data
+
+
+def _output_targets(
+    output_path: Optional[str],
+    env: Environment,
+    config_data: Dict[str, Any],
+    generate_options: GenerateOptions,
+) -> Tuple[Optional[OutputWriter], Optional[OutputManifest]]:
+    """Get the writer of outputs and the manifest (in incremental mode)
+    for generate_outputs(), none of them for a dry run."""
+    if not output_path:
+        return None, None
+    manifest: Optional[OutputManifest] = None
+    if generate_options.incremental:
+        manifest = OutputManifest(
+            output_path,
+            env,
+            config_data,
+            EXTRA_PROPERTIES.get(),
+            _is_time_pinned(generate_options),
+        )
+    writer = OutputWriter(
+        output_path,
+        fsync=generate_options.fsync,
+        staged=generate_options.staged_output,
+    )
+    return writer, manifest
+
+
+def _is_time_pinned(generate_options: GenerateOptions) -> bool:
+    """Check whether the generation time in metadata is pinned, so it is
+    a part of output fingerprints (see incremental.data_fingerprint())."""
+    return get_metadata_timestamp(generate_options.reproducible) is not None
+
+
+def _get_render_cache(generate_options: GenerateOptions) -> Optional[RenderCache]:
+    """Get the render cache for generate_outputs(), only with a pinned
+    generation time, otherwise cached outputs would keep the metadata
+    time of their first render."""
+    render_cache = get_render_cache()
+    if render_cache and not _is_time_pinned(generate_options):
+        LOG.info(
+            "Render cache not used, the generation time is not pinned"
+            " (--reproducible or $%s)",
+            SOURCE_DATE_EPOCH_ENV,
+        )
+        return None
+    return render_cache
+
+
+# how the content of an output is obtained, see _Output
+OUTPUT_UP_TO_DATE = "up-to-date"
+OUTPUT_CACHED = "cached"
+OUTPUT_RENDERED = "rendered"
+OUTPUT_STREAMED = "streamed"
+
+
+class _Output(object):
+    """Output of a main template for _OutputsGeneration, get_data()
+    returns its content (or raises the render error). Streamed outputs
+    are written already, get_data() returns the content digest and
+    the retained content (see _stream_output())."""
+
+    def __init__(
+        self,
+        template_name: str,
+        out_filename: str,
+        get_data: Callable[[], Any],
+        fingerprint: Optional[str] = None,
+        source: str = OUTPUT_RENDERED,
+    ):
+        self.template_name = template_name
+        self.out_filename = out_filename
+        self.get_data = get_data
+        self.fingerprint = fingerprint
+        self.source = source
+
+
+class _OutputsGeneration(object):
+    """Generation of outputs for generate_outputs(): prepare() renders
+    an output, unless it is up to date (manifest) or stored in the render
+    cache, finish() writes it and records it in the manifest (and the
+    render cache).
+
+    :param config_data: configuration data mapping for templating
+    :type config_data: dict
+    :param env: jinja2 template environment
+    :type env: Environment
+    :param writer: writer of outputs, None for a dry run
+    :type writer: OutputWriter | None
+    :param manifest: manifest of outputs in incremental mode
+    :type manifest: OutputManifest | None
+    :param options: how outputs are generated
+    :type options: GenerateOptions
+    :param render_cache: render cache, None when disabled
+    :type render_cache: RenderCache | None
+    """
+
+    def __init__(
+        self,
+        config_data: Dict[str, Any],
+        env: Environment,
+        writer: Optional[OutputWriter],
+        manifest: Optional[OutputManifest],
+        options: GenerateOptions,
+        render_cache: Optional[RenderCache] = None,
+    ):
+        self.config_data = config_data
+        self.env = env
+        self.writer = writer
+        self.manifest = manifest
+        self.options = options
+        self.render_cache = render_cache
+        self.fingerprints: Optional[OutputFingerprints] = manifest
+        if render_cache and manifest is None:
+            self.fingerprints = OutputFingerprints(
+                env, config_data, EXTRA_PROPERTIES.get(), _is_time_pinned(options)
+            )
+        # streamed outputs are written while rendered
+        self.streaming = options.stream and writer is not None
+        self.cache_stored = False
+        self.result_data: Dict[str, str] = {}
+        self.error: Optional[GenerationError] = None
+
+    def run(
+        self, template_list: List[str]
+    ) -> Tuple[Dict[str, str], Optional[GenerationError]]:
+        """Render (and write) outputs, returns the result data and
+        the first generation error.
+
+        All renders are started (submitted to the pool of jobs) first,
+        then results are written in template list order."""
+        jobs, jobs_mode = self.options.jobs, self.options.jobs_mode
+        with _TemplateRenderer(self.env, jobs, jobs_mode) as render:
+            outputs = [
+                self.prepare(template_name, render) for template_name in template_list
+            ]
+            for output in outputs:
+                self.finish(output)
+
+        if self.render_cache and self.cache_stored:
+            self.render_cache.prune()
+        return self.result_data, self.error
+
+    def prepare(
+        self, template_name: str, render: Callable[..., Callable[[], Any]]
+    ) -> _Output:
+        """Get an output, rendered via render() of _TemplateRenderer
+        when it is neither up to date nor in the render cache."""
         out_filename = get_output_filename(template_name)
-        config_data["metadata"]["out_filename"] = template_name
+        fingerprint = None
+        if self.fingerprints:
+            fingerprint = self.fingerprints.fingerprint(template_name)
+
+        known_data, source = self._known_output(out_filename, fingerprint)
+        data = template_data(self.config_data, template_name)
+        if known_data is not None:
+            get_data = functools.partial(str, known_data)
+        elif self.streaming:
+            source = OUTPUT_STREAMED
+            get_data = render(
+                template_name,
+                data,
+                functools.partial(
+                    _stream_output,
+                    self.writer,
+                    out_filename,
+                    self.options.retain_output,
+                ),
+            )
+        else:
+            get_data = render(template_name, data)
+        return _Output(template_name, out_filename, get_data, fingerprint, source)
+
+    def _known_output(
+        self, out_filename: str, fingerprint: Optional[str]
+    ) -> Tuple[Optional[str], str]:
+        """Get the content of an up to date or cached output,
+        None when it has to be rendered."""
+        if self.manifest:
+            current_data = self.manifest.up_to_date_output(out_filename, fingerprint)
+            if current_data is not None:
+                return current_data, OUTPUT_UP_TO_DATE
+        if self.render_cache and fingerprint:
+            cached_data = self.render_cache.get(fingerprint)
+            if cached_data is not None:
+                LOG.debug("Config file %s found in the render cache", out_filename)
+                return cached_data, OUTPUT_CACHED
+        return None, OUTPUT_RENDERED
+
+    def finish(self, output: _Output) -> None:
+        """Write an output (unless it was streamed or is up to date)."""
+        if output.source == OUTPUT_UP_TO_DATE:
+            LOG.info(
+                "Config file %s is up to date, generation SKIPPED", output.out_filename
+            )
+            self._retain(output.out_filename, output.get_data())
+            return
+
+        if self.manifest:
+            # recorded again once the output is written
+            self.manifest.update(output.out_filename, None, None)
 
         try:
-            template: Template = env.get_template(template_name)
-            output_data: str = template.render(config_data)
+            data = output.get_data()
 
         except jinja2.TemplateError as exc:
-            LOG.error(f"Config file {out_filename} generation FAILED")
+            LOG.error(f"Config file {output.out_filename} generation FAILED")
             LOG.exception("Original error")
-            if not generate_exception:
-                generate_exception = GenerationError(
-                    f"There was a problem generating file {out_filename} with {template_name} template: {exc}"
+            if not self.error:
+                self.error = GenerationError(
+                    f"There was a problem generating file {output.out_filename} with {output.template_name} template: {exc}"
+                )
+            return
+
+        except OSError as exc:
+            if output.source != OUTPUT_STREAMED:
+                raise
+            self.error = _write_error(self.writer, output.out_filename, exc)
+            return
+
+        LOG.debug("END %s", output.out_filename)
+        LOG.info("Config file %s generation PASSED", output.out_filename)
+
+        if output.source == OUTPUT_STREAMED:
+            content_digest, data = data
+            if self.manifest:
+                self.manifest.record(
+                    output.out_filename, output.fingerprint, content_digest
                 )
         else:
-            LOG.debug(f"END {out_filename}")
-            LOG.info(f"Config file {out_filename} generation PASSED")
-
-            result_data[out_filename] = output_data
+            self._store(output, data)
+        self._retain(output.out_filename, data)
+
+    def _store(self, output: _Output, data: str) -> None:
+        """Store a rendered output in the render cache and write it."""
+        if self.render_cache and output.fingerprint and output.source != OUTPUT_CACHED:
+            self.cache_stored = (
+                self.render_cache.put(output.fingerprint, data) or self.cache_stored
+            )
+        if self.writer:
+            write_exception = _write_output(
+                self.writer,
+                self.manifest,
+                output.out_filename,
+                data,
+                output.fingerprint,
+            )
+            self.error = write_exception or self.error
+
+    def _retain(self, out_filename: str, data: Optional[str]) -> None:
+        """Keep an output in the result data, unless outputs are not retained."""
+        if self.options.retain_output:
+            self.result_data[out_filename] = data
+
+
+def _stream_output(
+    writer: OutputWriter,
+    out_filename: str,
+    retain_output: bool,
+    chunks: Iterator[str],
+) -> Tuple[str, Optional[str]]:
+    """Write a streamed render of an output for _OutputsGeneration,
+    returns the digest of the content (see incremental.digest())
+    and the content, when it is retained."""
+    content_hash = hashlib.sha256()
+    retained: List[str] = []
+
+    def observed_chunks() -> Iterator[str]:
+        for chunk in chunks:
+            content_hash.update(chunk.encode("utf-8"))
+            if retain_output:
+                retained.append(chunk)
+            yield chunk
+
+    writer.write_chunks(out_filename, observed_chunks())
+    return content_hash.hexdigest(), "".join(retained) if retain_output else None
+
+
+def _write_output(
+    writer: OutputWriter,
+    manifest: Optional[OutputManifest],
+    out_filename: str,
+    output_data: str,
+    fingerprint: Optional[str],
+) -> Optional[GenerationError]:
+    """Write a generated output for _OutputsGeneration,
+    returns the error when the output cannot be written."""
+    try:
+        with stage(STAGE_WRITE):
+            if manifest and manifest.is_unchanged(out_filename, output_data):
+                LOG.debug("Output %s unchanged, not written", out_filename)
+            else:
+                writer.write(out_filename, output_data)
+
+    except Exception as exc:
+        return _write_error(writer, out_filename, exc)
+
+    if manifest:
+        manifest.update(out_filename, fingerprint, output_data)
+    return None
+
+
+def _write_error(
+    writer: OutputWriter, out_filename: str, exc: Exception
+) -> GenerationError:
+    """Log a failed write of an output, and get the generation error."""
+    output_path = writer.output_path
+    LOG.error(f"Failed to write output file {out_filename} to {output_path}")
+    LOG.exception("Write error")
+    return GenerationError(
+        f"There was a problem writing output file '{out_filename}' to '{output_path}': {exc}"
+    )
 
-            if output_path:
-                try:
-                    write_output(out_filename, output_path, output_data)
 
-                except Exception as exc:
-                    LOG.error(
-                        f"Failed to write output file {out_filename} to {output_path}"
-                    )
-                    LOG.exception("Write error")
-                    generate_exception = GenerationError(
-                        f"There was a problem writing output file '{out_filename}' to '{output_path}': {exc}"
-                    )
+def _finish_outputs(
+    writer: OutputWriter,
+    manifest: Optional[OutputManifest],
+    generate_exception: Optional[GenerationError],
+) -> None:
+    """Store the manifest and commit (or abort on error) written outputs
+    for generate_outputs()."""
+    if manifest:
+        try:
+            with stage(STAGE_WRITE):
+                writer.write(MANIFEST_FILENAME, manifest.dumps())
+        except OSError as exc:
+            LOG.warning("Unable to store the output manifest: %s", exc)
 
     if generate_exception:
-        raise generate_exception
+        writer.abort()
+        return
 
-    return result_data
+    try:
+        with stage(STAGE_WRITE):
+            writer.commit()
+    except OSError as exc:
+        raise GenerationError(
+            f"There was a problem committing output files to '{writer.output_path}': {exc}"
+        )
+
+
+def template_data(config_data: Dict[str, Any], template_name: str) -> Dict[str, Any]:
+    """Get config data view for rendering of a single main template,
+    with its own metadata, so the shared config data is not modified.
+
+    :param config_data: configuration data mapping for templating
+    :type config_data: dict
+    :param template_name: main template file name
+    :type template_name: str
+
+    :return: configuration data for the template
+    :rtype: dict
+    """
+    data = dict(config_data)
+    data["metadata"] = dict(config_data.get("metadata", {}))
+    data["metadata"]["out_filename"] = template_name
+    return data
+
+
+def render_template(env: Environment, template_name: str, data: Dict[str, Any]) -> str:
+    """Render a main template of the environment.
+
+    :param env: jinja2 template environment
+    :type env: Environment
+    :param template_name: main template file name
+    :type template_name: str
+    :param data: configuration data for the template
+    :type data: dict
+
+    :return: rendered output
+    :rtype: str
+    """
+    template: Template = env.get_template(template_name)
+    return template.render(data)
+
+
+def stream_template(
+    env: Environment, template_name: str, data: Dict[str, Any]
+) -> Iterator[str]:
+    """Render a main template of the environment piece by piece,
+    so the whole output does not have to be kept in memory.
+
+    :param env: jinja2 template environment
+    :type env: Environment
+    :param template_name: main template file name
+    :type template_name: str
+    :param data: configuration data for the template
+    :type data: dict
+
+    :return: iterator of rendered output chunks
+    :rtype: Iterator[str]
+    """
+    template: Template = env.get_template(template_name)
+    return template.generate(data)
+
+
+def _consume_template(
+    env: Environment,
+    template_name: str,
+    data: Dict[str, Any],
+    consume: Optional[Callable[[Iterator[str]], Any]],
+) -> Any:
+    """Render a main template, or pass its streamed render to consume
+    (the render time then includes the time of consume)."""
+    with template_render(template_name):
+        if consume is None:
+            return render_template(env, template_name, data)
+        return consume(stream_template(env, template_name, data))
+
+
+def _render_template_in_process(
+    search_path: Tuple[str, ...],
+    template_name: str,
+    data: Dict[str, Any],
+    extra_properties_data: Optional[Dict[str, str]],
+    consume: Optional[Callable[[Iterator[str]], Any]] = None,
+    timed: bool = False,
+) -> Any:
+    """Process pool worker, renders with the worker's own (cached)
+    environment for the search path. When timed, returns the result
+    with the worker timings (see _timed_result())."""
+    env = get_environment(search_path, **get_environment_options())
+    EXTRA_PROPERTIES.set(extra_properties_data)
+    if not timed:
+        return _consume_template(env, template_name, data, consume)
+    with collect() as timings:
+        result = _consume_template(env, template_name, data, consume)
+    return result, timings.as_dict()
+
+
+def _timed_result(future: concurrent.futures.Future, timings: Timings) -> Any:
+    """Get the result of a timed process pool render, and merge its timings."""
+    result, worker_timings = future.result()
+    timings.merge(worker_timings)
+    return result
+
+
+class _TemplateRenderer(object):
+    """Context manager providing a render(template_name, data[, consume])
+    function which returns a callable to get the rendered output (or raise
+    the render error). With consume, the streamed render (see
+    stream_template()) is passed to it, and the callable returns its result.
+
+    Renders directly with a single job, otherwise submits the
+    renders to a thread or process pool.
+    """
+
+    def __init__(self, env: Environment, jobs: int, jobs_mode: str):
+        if jobs_mode not in JOBS_MODES:
+            raise GenerationError(
+                f"Unknown jobs mode '{jobs_mode}', use one of {', '.join(JOBS_MODES)}"
+            )
+        self.env = env
+        self.jobs = jobs
+        self.jobs_mode = jobs_mode
+        self.search_path: Optional[Tuple[str, ...]] = None
+        self.executor: Optional[concurrent.futures.Executor] = None
+
+        if jobs_mode == JOBS_MODE_PROCESS:
+            self.search_path = _get_search_path(env)
+            if self.search_path is None:
+                LOG.debug("Environment not usable in a process pool, using threads")
+                self.jobs_mode = JOBS_MODE_THREAD
+
+    def __enter__(self) -> Callable[..., Callable[[], Any]]:
+        if self.jobs > 1:
+            if self.jobs_mode == JOBS_MODE_PROCESS:
+                self.executor = concurrent.futures.ProcessPoolExecutor(self.jobs)
+            else:
+                self.executor = concurrent.futures.ThreadPoolExecutor(self.jobs)
+        return self.render
+
+    def __exit__(self, *exc_info) -> None:
+        if self.executor:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    def render(
+        self,
+        template_name: str,
+        data: Dict[str, Any],
+        consume: Optional[Callable[[Iterator[str]], Any]] = None,
+    ) -> Callable[[], Any]:
+        if self.executor is None:
+            return functools.partial(
+                _consume_template, self.env, template_name, data, consume
+            )
+
+        if self.jobs_mode == JOBS_MODE_PROCESS:
+            timings = TIMINGS.get()
+            future = self.executor.submit(
+                _render_template_in_process,
+                self.search_path,
+                template_name,
+                data,
+                EXTRA_PROPERTIES.get(),
+                consume,
+                timings is not None,
+            )
+            if timings is not None:
+                return functools.partial(_timed_result, future, timings)
+        else:
+            # threads do not inherit context variables (extra properties)
+            future = self.executor.submit(
+                contextvars.copy_context().run,
+                _consume_template,
+                self.env,
+                template_name,
+                data,
+                consume,
+            )
+        return future.result
+
+
+def _get_search_path(env: Environment) -> Optional[Tuple[str, ...]]:
+    """Get template search path of a file system loader environment,
+    to be able to recreate it in another process.
+
+    :param env: jinja2 template environment
+    :type env: Environment
+
+    :return: template search path, or None if not available
+    :rtype: tuple[str] | None
+    """
+    loader = getattr(env, "loader", None)
+    if isinstance(loader, jinja2.FileSystemLoader):
+        return tuple(os.path.abspath(path) for path in loader.searchpath)
+    return None
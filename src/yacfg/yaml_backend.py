@@ -0,0 +1,91 @@
+import logging
+import os
+from typing import IO, Any, Iterator, Type, Union
+
+import yaml
+
+from . import NAME
+
+LOG: logging.Logger = logging.getLogger(NAME)
+
+# environment variable to force the pure python backend (set to "python")
+YAML_BACKEND_ENV = "YACFG_YAML_BACKEND"
+
+BACKEND_LIBYAML = "libyaml"
+BACKEND_PYTHON = "python"
+
+SafeLoader: Type[Any] = yaml.SafeLoader
+SafeDumper: Type[Any] = yaml.SafeDumper
+BACKEND = BACKEND_PYTHON
+
+if os.getenv(YAML_BACKEND_ENV, BACKEND_LIBYAML) != BACKEND_PYTHON:
+    try:
+        from yaml import CSafeDumper, CSafeLoader
+    except ImportError:
+        pass
+    else:
+        SafeLoader = CSafeLoader
+        SafeDumper = CSafeDumper
+        BACKEND = BACKEND_LIBYAML
+
+
+class IndentedSafeDumper(yaml.SafeDumper):
+    """
+    Safe dumper indenting block sequences nested in mappings.
+
+    The libyaml emitter always writes such sequences indentless and cannot
+    be customized, so this dumper stays on the pure python emitter.
+    """
+
+    def increase_indent(self, flow: bool = False, indentless: bool = False) -> None:
+        return super().increase_indent(flow, False)
+
+
+def get_backend() -> str:
+    """
+    Get the name of the active YAML backend.
+
+    :return: "libyaml" when the C bindings are used, "python" otherwise.
+    :rtype: str
+    """
+    return BACKEND
+
+
+def load_yaml(stream: Union[str, IO[str]]) -> Any:
+    """
+    Parse a single YAML document with the safe loader of the active backend.
+
+    :param stream: YAML document or an open file.
+    :type stream: str | file
+    :return: Parsed data.
+    :raises yaml.YAMLError: If the document is not valid YAML.
+    """
+    return yaml.load(stream, SafeLoader)
+
+
+def load_all_yaml(stream: Union[str, IO[str]]) -> Iterator[Any]:
+    """
+    Parse all YAML documents with the safe loader of the active backend.
+
+    :param stream: YAML documents or an open file.
+    :type stream: str | file
+    :return: Iterator of parsed documents.
+    :raises yaml.YAMLError: If a document is not valid YAML.
+    """
+    return yaml.load_all(stream, SafeLoader)
+
+
+def dump_yaml(data: Any, indent_sequences: bool = False, **kwargs: Any) -> str:
+    """
+    Dump data as YAML with the safe dumper of the active backend.
+
+    :param data: Data to dump.
+    :param indent_sequences: Indent block sequences nested in mappings,
+        this always uses the pure python emitter (see IndentedSafeDumper).
+    :type indent_sequences: bool
+    :param kwargs: Extra yaml.dump() options.
+    :return: Dumped YAML.
+    :rtype: str
+    """
+    dumper = IndentedSafeDumper if indent_sequences else SafeDumper
+    return yaml.dump(data, Dumper=dumper, **kwargs)
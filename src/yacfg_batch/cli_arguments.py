@@ -34,6 +34,43 @@ group_main.add_argument(
 
 group_main.add_argument("-o", "--output", help="Output path to generated files to")
 
+group_main.add_argument(
+    "-j",
+    "--jobs",
+    help="Number of services generated in parallel processes,"
+    " 0 to use all CPUs (default: 1)",
+    type=int,
+    default=1,
+)
+
+group_main.add_argument(
+    "--keep-going",
+    help="Generate all services even if some fail, and report all failures"
+    " at the end (default: stop at the first failure)",
+    action="store_true",
+)
+
+group_main.add_argument(
+    "--dedup",
+    help="Generate services with the same specification once, and copy"
+    " their outputs to the other services (default: generate every service)",
+    action="store_true",
+)
+
+group_main.add_argument(
+    "--hardlink",
+    help="Hard link outputs of services with the same specification"
+    " instead of copying them (with --dedup)",
+    action="store_true",
+)
+
+group_main.add_argument(
+    "--bytecode-cache",
+    metavar="DIR",
+    help="Persistent cache directory for compiled templates, shared between"
+    " runs (default: $YACFG_BYTECODE_CACHE, or disabled)",
+)
+
 # Group Logging
 group_logging = parser.add_argument_group(title="Logging options")
 
@@ -1,12 +1,19 @@
 from __future__ import print_function
 
+import concurrent.futures
 import copy
+import hashlib
+import json
 import logging
 import os
+import shutil
+import traceback
 
 import yaml
 
 import yacfg.yacfg
+from yacfg.files import ensure_output_path
+from yacfg.yaml_backend import load_all_yaml
 
 from .exceptions import YacfgBatchException
 
@@ -41,7 +48,7 @@ def iter_gen_profiles(filename):
     profile_data_list = None
 
     try:
-        profile_data_list = yaml.load_all(open(filename, "r"), yaml.SafeLoader)
+        profile_data_list = load_all_yaml(open(filename, "r"))
     except IOError as exc:
         raise YacfgBatchException(
             'Unable to open gen profile "{}" {}'.format(filename, exc)
@@ -55,27 +62,81 @@ def iter_gen_profiles(filename):
         yield profile_data
 
 
-def generate(input_files, output_path=None):
+def generate(
+    input_files, output_path=None, jobs=1, fail_fast=True, dedup=False, hardlink=False
+):
     """Main batch generation function, get input files, collects data,
     and uses core yacfg's generate to do the work.
 
+    With more than one job, services of all input files are generated
+    in a process pool, logs of every service are emitted in the order
+    of services as they appear in the input files.
+
     :param input_files: list of yaml input files with generation
         specification
     :type input_files: list[str]
     :param output_path: path to write generated configurations
     :type output_path: str | None
+    :param jobs: number of services generated in parallel,
+        0 or None to use all available CPUs
+    :type jobs: int | None
+    :param fail_fast: stop at the first failed service, otherwise
+        generate all services and report all failures at the end
+    :type fail_fast: bool
+    :param dedup: generate services with the same specification (except
+        the output directory) once, and copy the outputs to the others
+    :type dedup: bool
+    :param hardlink: hard link copied outputs of deduplicated services
+    :type hardlink: bool
+
+    :raises YacfgBatchException: when a service could not be generated
+        and fail_fast is disabled, services run in parallel or they
+        are deduplicated
+    """
+    if not jobs:
+        jobs = os.cpu_count() or 1
+
+    if jobs == 1 and fail_fast and not dedup:
+        for input_path, default, common, profile_file_data in iter_input_data(
+            input_files
+        ):
+            generate_all_profiles(
+                input_path, output_path, default, common, profile_file_data
+            )
+        return
+
+    service_jobs = [
+        service_job
+        for input_path, default, common, profile_file_data in iter_input_data(
+            input_files
+        )
+        for service_job in iter_service_jobs(
+            input_path, output_path, default, common, profile_file_data
+        )
+    ]
+    run_service_jobs(service_jobs, jobs, fail_fast, dedup=dedup, hardlink=hardlink)
+
+
+def iter_input_data(input_files):
+    """Iterate over all batch profile documents of the input files.
+
+    :param input_files: list of yaml input files with generation
+        specification
+    :type input_files: list[str]
+
+    :return: input path, default and common generate data, and the
+        batch profile document for each document of input files
+    :rtype: iterator[tuple[str, GenerateData, GenerateData, dict]]
     """
     for profile_file in input_files:
-        LOG.info(f"- Profile file: {profile_file}")
+        LOG.info("- Profile file: %s", profile_file)
         for profile_file_data in iter_gen_profiles(profile_file):
             input_path = os.path.dirname(profile_file)
 
             default = extract_generate_data(profile_file_data)
             common = extract_generate_data(profile_file_data, "_common")
 
-            generate_all_profiles(
-                input_path, output_path, default, common, profile_file_data
-            )
+            yield input_path, default, common, profile_file_data
 
 
 def extract_generate_data(profile_file_data, section="_default"):
@@ -177,11 +238,38 @@ def generate_all_profiles(input_path, output_path, default, common, profiles_fil
         as loaded from YAML
     :type profiles_file_data: dict
     """
+    for profile, generate_kwargs in iter_service_jobs(
+        input_path, output_path, default, common, profiles_file_data
+    ):
+        LOG.info("-- Profile: %s", profile)
+        yacfg.yacfg.generate(**generate_kwargs)
+
+
+def iter_service_jobs(input_path, output_path, default, common, profiles_file_data):
+    """Resolve generate parameters of all services in a batch profile document.
+
+    :param input_path: path of used input yaml file, to pick
+        dependencies, tuning files, etc.
+    :type input_path: str
+    :param output_path: path where to generate configs, name of service
+        profile will be used as subdirectory
+    :type output_path: str
+    :param default: collection of default GenerateData
+    :type default: GenerateData
+    :param common: collection of common GenerateData
+    :type common: GenerateData
+    :param profiles_file_data: profiles generation data in dict format,
+        as loaded from YAML
+    :type profiles_file_data: dict
+
+    :raises YacfgBatchException: when a service has no profile selected
+
+    :return: service name and keyword arguments for yacfg.yacfg.generate()
+    :rtype: iterator[tuple[str, dict]]
+    """
     profile_list = [x for x in profiles_file_data.keys() if not x.startswith("_")]
 
     for profile in profile_list:
-        LOG.info(f"-- Profile: {profile}")
-
         profile_data = extract_generate_data(profiles_file_data, profile)
         generate_data = prioritize_generate_data(profile_data, common, default)
 
@@ -196,7 +284,7 @@ def generate_all_profiles(input_path, output_path, default, common, profiles_fil
                 os.path.join(input_path, x) for x in generate_data.tuning_files
             ]
 
-        LOG.debug(f"tuning data: {generate_data.tuning_data}")
+        LOG.debug("tuning data: %s", generate_data.tuning_data)
 
         target_path = None
         if output_path:
@@ -207,15 +295,285 @@ def generate_all_profiles(input_path, output_path, default, common, profiles_fil
             tuning_data = [generate_data.tuning_data]
 
         LOG.debug(
-            f"CALL: yacfg --profile {generate_data.profile_name} --template {generate_data.template_name} "
-            f"--tuning {generate_data.tuning_files} --output {target_path} # extra tuning: {generate_data.tuning_data} "
-            f">> {target_path}"
+            "CALL: yacfg --profile %s --template %s --tuning %s --output %s"
+            " # extra tuning: %s >> %s",
+            generate_data.profile_name,
+            generate_data.template_name,
+            generate_data.tuning_files,
+            target_path,
+            generate_data.tuning_data,
+            target_path,
         )
 
-        yacfg.yacfg.generate(
+        yield profile, dict(
             profile=generate_data.profile_name,
             template=generate_data.template_name,
             output_path=target_path,
             tuning_files_list=generate_data.tuning_files,
             tuning_data_list=tuning_data,
         )
+
+
+def service_job_key(generate_kwargs):
+    """Get the canonical hash of a service specification, services with
+    the same key generate the same outputs (into different directories).
+
+    :param generate_kwargs: keyword arguments for yacfg.yacfg.generate()
+    :type generate_kwargs: dict
+
+    :return: hex digest (sha256) of the specification without the output path
+    :rtype: str
+    """
+    spec = {
+        key: value for key, value in generate_kwargs.items() if key != "output_path"
+    }
+    if spec.get("tuning_files_list"):
+        spec["tuning_files_list"] = [
+            os.path.normpath(os.path.abspath(path))
+            for path in spec["tuning_files_list"]
+        ]
+    serialized = json.dumps(spec, sort_keys=True, default=repr)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def group_service_jobs(service_jobs):
+    """Group services with the same specification (see service_job_key()).
+
+    :param service_jobs: service names and keyword arguments for
+        yacfg.yacfg.generate()
+    :type service_jobs: list[tuple[str, dict]]
+
+    :return: groups of services in the order of their first service,
+        the first service of a group is generated, the others get its outputs
+    :rtype: list[list[tuple[str, dict]]]
+    """
+    groups = {}
+    for service_job in service_jobs:
+        groups.setdefault(service_job_key(service_job[1]), []).append(service_job)
+    return list(groups.values())
+
+
+def run_service_jobs(service_jobs, jobs=1, fail_fast=True, dedup=False, hardlink=False):
+    """Generate all services, in a process pool if more jobs are requested.
+
+    :param service_jobs: service names and keyword arguments for
+        yacfg.yacfg.generate()
+    :type service_jobs: list[tuple[str, dict]]
+    :param jobs: number of services generated in parallel
+    :type jobs: int
+    :param fail_fast: stop at the first failed service, otherwise
+        generate all services and report all failures at the end
+    :type fail_fast: bool
+    :param dedup: generate services with the same specification once,
+        and copy the outputs to the others (see group_service_jobs())
+    :type dedup: bool
+    :param hardlink: hard link copied outputs instead of copying them
+    :type hardlink: bool
+
+    :raises YacfgBatchException: when any of services failed
+    """
+    errors = []
+    if dedup:
+        groups = group_service_jobs(service_jobs)
+    else:
+        groups = [[service_job] for service_job in service_jobs]
+
+    if jobs <= 1 or len(groups) <= 1:
+        for group in groups:
+            profile, generate_kwargs = group[0]
+            LOG.info("-- Profile: %s", profile)
+            error, outputs = _generate_service(generate_kwargs)
+            _finish_service_group(group, error, outputs, hardlink, errors)
+            if errors and fail_fast:
+                break
+    else:
+        _run_service_groups_in_processes(groups, jobs, fail_fast, hardlink, errors)
+
+    if dedup and groups:
+        LOG.info(
+            "%d service(s) generated from %d unique specification(s),"
+            " dedup ratio %.2f",
+            len(service_jobs),
+            len(groups),
+            len(service_jobs) / len(groups),
+        )
+
+    if errors:
+        raise YacfgBatchException(
+            "Generation of {} service(s) failed:\n{}".format(
+                len(errors), "\n".join(errors)
+            )
+        )
+
+
+def _run_service_groups_in_processes(groups, jobs, fail_fast, hardlink, errors):
+    """Generate services of groups in a process pool, see run_service_jobs().
+
+    Worker logs are emitted in the order of the groups.
+
+    :param groups: groups of services (see group_service_jobs())
+    :type groups: list[list[tuple[str, dict]]]
+    :param jobs: number of services generated in parallel
+    :type jobs: int
+    :param fail_fast: stop at the first failed service
+    :type fail_fast: bool
+    :param hardlink: hard link copied outputs instead of copying them
+    :type hardlink: bool
+    :param errors: error messages of failed services, appended
+    :type errors: list[str]
+    """
+    executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_service_worker,
+        initargs=(logging.getLogger().getEffectiveLevel(),),
+    )
+    try:
+        futures = [
+            executor.submit(_generate_service_in_process, group[0][1])
+            for group in groups
+        ]
+        for group, future in zip(groups, futures):
+            if future.cancelled():
+                continue
+            LOG.info("-- Profile: %s", group[0][0])
+            error, outputs, records = future.result()
+            for record in records:
+                logging.getLogger(record.name).handle(record)
+            _finish_service_group(group, error, outputs, hardlink, errors)
+            if errors and fail_fast:
+                for pending in futures:
+                    pending.cancel()
+    finally:
+        executor.shutdown(wait=True)
+
+
+def _finish_service_group(group, error, outputs, hardlink, errors):
+    """Record the result of a generated service, and copy its outputs
+    to the other services of its group (see group_service_jobs()).
+
+    :param group: generated service and services with the same specification
+    :type group: list[tuple[str, dict]]
+    :param error: error message of the generated service, or None
+    :type error: str | None
+    :param outputs: output file names of the generated service
+    :type outputs: list[str]
+    :param hardlink: hard link outputs instead of copying them
+    :type hardlink: bool
+    :param errors: error messages of failed services, appended
+    :type errors: list[str]
+    """
+    profile, generate_kwargs = group[0]
+    if error:
+        errors.append(f"{profile}: {error}")
+
+    for duplicate, duplicate_kwargs in group[1:]:
+        LOG.info("-- Profile: %s (same as %s)", duplicate, profile)
+        if error:
+            errors.append(f"{duplicate}: same as {profile}, which failed")
+            continue
+        try:
+            _copy_service_outputs(
+                generate_kwargs.get("output_path"),
+                duplicate_kwargs.get("output_path"),
+                outputs,
+                hardlink,
+            )
+        except OSError as exc:
+            LOG.error(f"Copying outputs of {profile} failed: {exc}")
+            errors.append(f"{duplicate}: {exc}")
+
+
+def _copy_service_outputs(source_path, target_path, outputs, hardlink=False):
+    """Copy (or hard link) outputs of a generated service to another one.
+
+    :param source_path: output path of the generated service
+    :type source_path: str | None
+    :param target_path: output path of the other service
+    :type target_path: str | None
+    :param outputs: output file names
+    :type outputs: list[str]
+    :param hardlink: hard link outputs instead of copying them,
+        they are copied when linking is not possible
+    :type hardlink: bool
+    """
+    if not source_path or not target_path:
+        return
+    ensure_output_path(target_path)
+    for out_filename in outputs:
+        source = os.path.join(source_path, out_filename)
+        target = os.path.join(target_path, out_filename)
+        if os.path.lexists(target):
+            os.unlink(target)
+        if hardlink:
+            try:
+                os.link(source, target)
+                continue
+            except OSError:
+                pass
+        shutil.copy2(source, target)
+        LOG.debug("Output %s copied to %s", source, target)
+
+
+def _generate_service(generate_kwargs):
+    """Generate a single service, and report failure instead of raising it.
+
+    :param generate_kwargs: keyword arguments for yacfg.yacfg.generate()
+    :type generate_kwargs: dict
+
+    :return: error message (or None on success), and output file names
+    :rtype: tuple[str | None, list[str]]
+    """
+    try:
+        result = yacfg.yacfg.generate_profile(**generate_kwargs)
+    except Exception as exc:
+        LOG.error(f"Generation failed: {exc}")
+        return str(exc) or exc.__class__.__name__, []
+    return None, sorted(result) if isinstance(result, dict) else []
+
+
+class _RecordCollector(logging.Handler):
+    """Collect log records of a service generated in a worker process,
+    to be emitted later by the main process."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        # make the record safe to be sent to the main process
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = "".join(
+                traceback.format_exception(*record.exc_info)
+            ).rstrip("\n")
+            record.exc_info = None
+        self.records.append(record)
+
+
+_worker_collector = None
+
+
+def _init_service_worker(log_level):
+    """Process pool initializer, replaces inherited log handlers
+    with a collector."""
+    global _worker_collector
+    _worker_collector = _RecordCollector()
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(_worker_collector)
+    root_logger.setLevel(log_level)
+
+
+def _generate_service_in_process(generate_kwargs):
+    """Process pool worker, generates a single service.
+
+    :return: error message (or None), output file names, and log records
+        of the service
+    :rtype: tuple[str | None, list[str], list[logging.LogRecord]]
+    """
+    _worker_collector.records = []
+    error, outputs = _generate_service(generate_kwargs)
+    records, _worker_collector.records = _worker_collector.records, []
+    return error, outputs, records
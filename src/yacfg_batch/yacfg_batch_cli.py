@@ -15,9 +15,11 @@ except ValueError:
     pass
 
 from yacfg import NAME, logger_settings
+from yacfg.templates import set_bytecode_cache_dir
 
 from yacfg_batch import __version__
 from yacfg_batch.cli_arguments import parser
+from yacfg_batch.exceptions import YacfgBatchException
 from yacfg_batch.yacfg_batch import generate
 
 logger_settings.config_console_logger()
@@ -50,8 +52,21 @@ def main():
     if not options.input:
         error("Missing parameter input, cannot work without input.", 2)
 
+    if options.bytecode_cache:
+        set_bytecode_cache_dir(options.bytecode_cache)
+
     if options.input:
-        generate(options.input, options.output)
+        try:
+            generate(
+                options.input,
+                options.output,
+                jobs=options.jobs,
+                fail_fast=not options.keep_going,
+                dedup=options.dedup,
+                hardlink=options.hardlink,
+            )
+        except YacfgBatchException as exc:
+            error(str(exc), 1)
 
     print("have a nice day.")
 
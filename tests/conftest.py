@@ -0,0 +1,47 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+import yacfg.files
+import yacfg.profiles
+import yacfg.query
+import yacfg.templates
+import yacfg.tree_index
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Process-wide caches must not leak (mocked) objects between tests."""
+    yacfg.files.PATH_RESOLVER.reset()
+    yacfg.templates.clear_environment_cache()
+    yacfg.profiles.clear_profile_defaults_cache()
+    yacfg.profiles.clear_tuning_files_cache()
+    yacfg.query.clear_main_templates_cache()
+    yacfg.tree_index.TREE_INDEX.reset()
+    yield
+    yacfg.files.PATH_RESOLVER.reset()
+    yacfg.templates.clear_environment_cache()
+    yacfg.profiles.clear_profile_defaults_cache()
+    yacfg.profiles.clear_tuning_files_cache()
+    yacfg.query.clear_main_templates_cache()
+    yacfg.tree_index.TREE_INDEX.reset()
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path_factory, monkeypatch):
+    """Persistent caches are kept out of the user cache directory."""
+    path = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv("YACFG_CACHE_DIR", str(path))
+    return path
@@ -15,6 +15,7 @@
 import pytest
 
 import yacfg.config_data
+from yacfg.exceptions import GenerationError
 
 dataset_metadata_members = (
     "tool_name",
@@ -43,3 +44,31 @@ def test_add_template_metadata_datetime_check_member(member):
     data = {}
     yacfg.config_data.add_template_metadata(data)
     assert member in data["metadata"]["datetime"]
+
+
+def test_add_template_metadata_timestamp():
+    data = {}
+    yacfg.config_data.add_template_metadata(data, 1514808000)
+    assert data["metadata"]["datetime"] == {
+        "datetime": "2018-01-01 12:00",
+        "year": "2018",
+        "time": "12:00",
+        "date": "2018-01-01",
+        "unix": 1514808000,
+    }
+
+
+def test_get_metadata_timestamp(monkeypatch):
+    monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+    assert yacfg.config_data.get_metadata_timestamp() is None
+    assert yacfg.config_data.get_metadata_timestamp(reproducible=True) == 0
+
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1514808000")
+    assert yacfg.config_data.get_metadata_timestamp() == 1514808000
+    assert yacfg.config_data.get_metadata_timestamp(reproducible=True) == 1514808000
+
+
+def test_get_metadata_timestamp_invalid(monkeypatch):
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "yesterday")
+    with pytest.raises(GenerationError):
+        yacfg.config_data.get_metadata_timestamp()
@@ -0,0 +1,126 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import mock
+import pytest
+
+import yacfg.files
+from yacfg.exceptions import TemplateError
+from yacfg.files import PathResolver
+
+
+@pytest.fixture
+def profiles(tmp_path, monkeypatch):
+    packaged = tmp_path / "packaged"
+    (packaged / "product").mkdir(parents=True)
+    (packaged / "product" / "default.yaml").write_text("a: 1\n")
+    monkeypatch.setenv("YACFG_PROFILES", str(packaged))
+    work = tmp_path / "work"
+    work.mkdir()
+    monkeypatch.chdir(work)
+    return packaged
+
+
+@pytest.fixture
+def templates(tmp_path, monkeypatch):
+    packaged = tmp_path / "packaged_templates"
+    (packaged / "product" / "1.0").mkdir(parents=True)
+    (packaged / "product" / "1.0" / "_template").write_text("")
+    monkeypatch.setenv("YACFG_TEMPLATES", str(packaged))
+    work = tmp_path / "work"
+    work.mkdir()
+    monkeypatch.chdir(work)
+    return packaged
+
+
+@mock.patch("yacfg.files.find_module_path", return_value="/module/path")
+def test_module_path_cached(find_module_path):
+    resolver = PathResolver()
+
+    assert resolver.get_module_path() == "/module/path"
+    assert resolver.get_module_path() == "/module/path"
+    find_module_path.assert_called_once()
+
+    resolver.reset()
+    resolver.get_module_path()
+    assert find_module_path.call_count == 2
+
+
+@mock.patch("yacfg.files.find_module_path", return_value="/module/path")
+def test_paths_env_change(_, monkeypatch):
+    resolver = PathResolver()
+
+    monkeypatch.delenv("YACFG_PROFILES", raising=False)
+    assert resolver.get_paths("YACFG_PROFILES", "profiles") == [
+        os.path.join("/module/path", "profiles")
+    ]
+    monkeypatch.setenv("YACFG_PROFILES", "/user/profiles")
+    assert resolver.get_paths("YACFG_PROFILES", "profiles") == [
+        os.path.join("/module/path", "profiles"),
+        "/user/profiles",
+    ]
+
+
+def test_profile_cached(profiles):
+    resolver = PathResolver()
+    expected = ("product/default.yaml", str(profiles))
+
+    assert resolver.select_profile_file("product/default.yaml") == expected
+    with mock.patch("yacfg.files.find_profile_file") as find_profile_file:
+        assert resolver.select_profile_file("product/default.yaml") == expected
+    find_profile_file.assert_not_called()
+
+
+def test_profile_user_added(profiles):
+    resolver = PathResolver()
+    resolver.select_profile_file("product/default.yaml")
+
+    user_profile = os.path.join(os.getcwd(), "profiles", "product", "default.yaml")
+    os.makedirs(os.path.dirname(user_profile))
+    with open(user_profile, "w") as file:
+        file.write("a: 2\n")
+
+    result = resolver.select_profile_file("product/default.yaml")
+
+    assert result == ("default.yaml", os.path.dirname(user_profile))
+
+
+def test_template_cached(templates):
+    resolver = PathResolver()
+    expected = os.path.join(str(templates), "product/1.0")
+
+    assert resolver.select_template_dir("product/1.0") == expected
+    with mock.patch("yacfg.files.find_template_dir") as find_template_dir:
+        assert resolver.select_template_dir("product/1.0") == expected
+    find_template_dir.assert_not_called()
+
+
+def test_template_marker_removed(templates):
+    resolver = PathResolver()
+    resolver.select_template_dir("product/1.0")
+
+    os.remove(templates / "product" / "1.0" / "_template")
+
+    with pytest.raises(TemplateError):
+        resolver.select_template_dir("product/1.0")
+
+
+def test_module_functions_use_resolver(profiles):
+    with mock.patch.object(
+        yacfg.files.PATH_RESOLVER, "select_profile_file"
+    ) as select_profile_file:
+        yacfg.files.select_profile_file("product/default.yaml")
+    select_profile_file.assert_called_once_with("product/default.yaml")
@@ -0,0 +1,47 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+
+from yacfg.incremental import data_fingerprint
+
+
+def test_datetime_ignored(*_):
+    first = {"a": 1, "metadata": {"tool_name": "yacfg", "datetime": {"unix": 1}}}
+    second = {"a": 1, "metadata": {"tool_name": "yacfg", "datetime": {"unix": 2}}}
+    assert data_fingerprint(first, None) == data_fingerprint(second, None)
+    assert "datetime" in first["metadata"]
+
+
+def test_pinned_datetime(*_):
+    first = {"a": 1, "metadata": {"datetime": {"unix": 1}}}
+    second = {"a": 1, "metadata": {"datetime": {"unix": 2}}}
+    assert data_fingerprint(first, None, pinned_time=True) != data_fingerprint(
+        second, None, pinned_time=True
+    )
+
+
+def test_changes(*_):
+    fingerprint = data_fingerprint({"a": 1}, None)
+    assert data_fingerprint({"a": 2}, None) != fingerprint
+    assert data_fingerprint({"a": 1}, {"x": "y"}) != fingerprint
+
+
+def test_yaml_types(*_):
+    config_data = {"date": datetime.date(2018, 1, 1), "none": None}
+    assert data_fingerprint(config_data, None)
+
+
+def test_not_serializable(*_):
+    assert data_fingerprint({1: "a", "b": 2}, None) is None
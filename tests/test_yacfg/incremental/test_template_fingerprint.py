@@ -0,0 +1,61 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import jinja2
+
+from yacfg.incremental import template_fingerprint
+
+
+def make_env(**templates):
+    return jinja2.Environment(loader=jinja2.DictLoader(templates))
+
+
+def test_transitive(*_):
+    env = make_env(
+        main="{% extends 'base' %}",
+        base="{% import 'macros' as m %}{% include 'missing' ignore missing %}",
+        macros="{% macro x() %}x{% endmacro %}",
+        unrelated="",
+    )
+    fingerprint = template_fingerprint(env, "main")
+    assert fingerprint
+
+    env.loader.mapping["unrelated"] = "changed"
+    assert template_fingerprint(env, "main") == fingerprint
+
+    env.loader.mapping["macros"] = "{% macro x() %}y{% endmacro %}"
+    assert template_fingerprint(env, "main") != fingerprint
+
+
+def test_missing_reference_added(*_):
+    env = make_env(main="{% include 'optional' ignore missing %}")
+    fingerprint = template_fingerprint(env, "main")
+
+    env.loader.mapping["optional"] = "now here"
+    assert template_fingerprint(env, "main") != fingerprint
+
+
+def test_dynamic_reference(*_):
+    env = make_env(main="{% include name %}")
+    assert template_fingerprint(env, "main") is None
+
+
+def test_syntax_error(*_):
+    env = make_env(main="{% if %}")
+    assert template_fingerprint(env, "main") is None
+
+
+def test_cycle(*_):
+    env = make_env(a="{% include 'b' %}", b="{% include 'a' %}")
+    assert template_fingerprint(env, "a")
@@ -27,7 +27,8 @@ from ..profiles.fakes import (
 
 
 @mock.patch(
-    "yacfg.profiles.get_tuned_profile", side_effect=fake_load_tuned_profile_with_defaults
+    "yacfg.profiles.get_tuned_profile",
+    side_effect=fake_load_tuned_profile_with_defaults,
 )
 @mock.patch("yacfg.output.write_output", mock.Mock())
 @mock.patch("yacfg.files.ensure_output_path", mock.Mock())
@@ -37,7 +38,7 @@ def test_true_defaults(*_):
     destination_path = "/profile/destination/path"
     destination = os.path.join(destination_path, destination_name)
     _, expected_data = fake_load_tuned_profile_no_defaults()
-    expected_data = "# {} tuning file generated from profile {}{}---{}{}".format(
+    expected_data = "# {} static profile generated from profile {}{}---{}{}".format(
         NAME, profile_name, os.linesep, os.linesep, expected_data
     )
 
@@ -46,7 +47,7 @@ def test_true_defaults(*_):
     yacfg.files.ensure_output_path.assert_called_with(destination_path)
     # noinspection PyUnresolvedReferences
     yacfg.output.write_output.assert_called_with(
-        destination_name, destination_path, expected_data
+        destination_name, destination_path, expected_data, fsync=False
     )
 
 
@@ -61,7 +62,7 @@ def test_true_no_defaults(*_):
     destination_path = "/profile/destination/path"
     destination = os.path.join(destination_path, destination_name)
     _, expected_data = fake_load_tuned_profile_no_defaults()
-    expected_data = "# {} tuning file generated from profile {}{}---{}{}".format(
+    expected_data = "# {} static profile generated from profile {}{}---{}{}".format(
         NAME, profile_name, os.linesep, os.linesep, expected_data
     )
 
@@ -70,12 +71,13 @@ def test_true_no_defaults(*_):
     yacfg.files.ensure_output_path.assert_called_with(destination_path)
     # noinspection PyUnresolvedReferences
     yacfg.output.write_output.assert_called_with(
-        destination_name, destination_path, expected_data
+        destination_name, destination_path, expected_data, fsync=False
     )
 
 
 @mock.patch(
-    "yacfg.profiles.get_tuned_profile", side_effect=fake_load_tuned_profile_with_defaults
+    "yacfg.profiles.get_tuned_profile",
+    side_effect=fake_load_tuned_profile_with_defaults,
 )
 @mock.patch("yacfg.output.write_output", mock.Mock())
 @mock.patch("yacfg.files.ensure_output_path", mock.Mock())
@@ -83,7 +85,7 @@ def test_true_no_destination(*_):
     profile_name = "product/1.0.0/my_profile.yaml"
     destination = ""
     _, expected_data = fake_load_tuned_profile_no_defaults()
-    expected_data = "# {} tuning file generated from profile {}{}---{}{}".format(
+    expected_data = "# {} static profile generated from profile {}{}---{}{}".format(
         NAME, profile_name, os.linesep, os.linesep, expected_data
     )
 
@@ -92,12 +94,13 @@ def test_true_no_destination(*_):
     yacfg.files.ensure_output_path.assert_not_called()
     # noinspection PyUnresolvedReferences
     yacfg.output.write_output.assert_called_with(
-        destination, destination, expected_data
+        destination, destination, expected_data, fsync=False
     )
 
 
 @mock.patch(
-    "yacfg.profiles.get_tuned_profile", side_effect=fake_load_tuned_profile_with_defaults
+    "yacfg.profiles.get_tuned_profile",
+    side_effect=fake_load_tuned_profile_with_defaults,
 )
 @mock.patch(
     "yacfg.files.ensure_output_path",
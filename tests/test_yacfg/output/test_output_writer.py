@@ -0,0 +1,93 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import mock
+import pytest
+
+from yacfg.output import FSYNC_DIR, FSYNC_FILE, FSYNC_NONE, OutputWriter
+
+
+@pytest.mark.parametrize(
+    "fsync, expected_calls",
+    [
+        (FSYNC_NONE, 0),
+        # both files and the directory
+        (FSYNC_FILE, 3),
+        (FSYNC_DIR, 1),
+    ],
+)
+def test_fsync_modes(tmp_path, fsync, expected_calls):
+    with mock.patch("os.fsync") as fsync_mock:
+        with OutputWriter(str(tmp_path), fsync=fsync) as writer:
+            writer.write("a.txt", "a")
+            writer.write("b.txt", "b")
+
+    assert fsync_mock.call_count == expected_calls
+    assert writer.written == ["a.txt", "b.txt"]
+    assert (tmp_path / "a.txt").read_text() == "a"
+    assert (tmp_path / "b.txt").read_text() == "b"
+
+
+def test_bad_fsync_mode(tmp_path):
+    with pytest.raises(ValueError):
+        OutputWriter(str(tmp_path), fsync="always")
+
+
+def test_staged_commit(tmp_path):
+    output_path = tmp_path / "out"
+    output_path.mkdir()
+    (output_path / "a.txt").write_text("old a")
+    (output_path / "kept.txt").write_text("kept")
+    (output_path / "sub").mkdir()
+    (output_path / "sub" / "nested.txt").write_text("nested")
+
+    with OutputWriter(str(output_path), staged=True) as writer:
+        writer.write("a.txt", "new a")
+        writer.write("b.txt", "new b")
+        # not visible before commit
+        assert (output_path / "a.txt").read_text() == "old a"
+        assert not (output_path / "b.txt").exists()
+
+    assert (output_path / "a.txt").read_text() == "new a"
+    assert (output_path / "b.txt").read_text() == "new b"
+    assert (output_path / "kept.txt").read_text() == "kept"
+    assert (output_path / "sub" / "nested.txt").read_text() == "nested"
+    # no staged or old directories left behind
+    assert os.listdir(tmp_path) == ["out"]
+
+
+def test_staged_new_output_path(tmp_path):
+    output_path = tmp_path / "out"
+
+    with OutputWriter(str(output_path), staged=True) as writer:
+        writer.write("a.txt", "a")
+
+    assert (output_path / "a.txt").read_text() == "a"
+    assert os.listdir(tmp_path) == ["out"]
+
+
+def test_staged_abort(tmp_path):
+    output_path = tmp_path / "out"
+    output_path.mkdir()
+    (output_path / "a.txt").write_text("old a")
+
+    with pytest.raises(RuntimeError):
+        with OutputWriter(str(output_path), staged=True) as writer:
+            writer.write("a.txt", "new a")
+            raise RuntimeError("generation failed")
+
+    assert (output_path / "a.txt").read_text() == "old a"
+    assert os.listdir(tmp_path) == ["out"]
@@ -0,0 +1,42 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+import pytest
+
+from yacfg.exceptions import TemplateError
+from yacfg.output import precompile_template
+
+
+@mock.patch("yacfg.output.compile_environment", return_value=3)
+@mock.patch("yacfg.output.get_template_environment")
+@mock.patch("yacfg.files.ensure_output_path")
+def test_true(ensure_output_path_mock, get_template_environment_mock, compile_mock):
+    assert precompile_template("my_template/1.2.3", "/precompiled/set.zip") == 3
+
+    get_template_environment_mock.assert_called_once_with("my_template/1.2.3")
+    ensure_output_path_mock.assert_called_once_with("/precompiled")
+    compile_mock.assert_called_once_with(
+        get_template_environment_mock.return_value, "/precompiled/set.zip"
+    )
+
+
+@mock.patch("yacfg.output.compile_environment")
+@mock.patch(
+    "yacfg.output.get_template_environment", side_effect=TemplateError("missing")
+)
+def test_bad_template(_, compile_mock):
+    with pytest.raises(TemplateError):
+        precompile_template("missing", "dest")
+    compile_mock.assert_not_called()
@@ -13,39 +13,52 @@
 # limitations under the License.
 
 import os
+import stat
 
 import mock
 import pytest
 
-import yacfg.output
 from yacfg.output import write_output
 
 
-@mock.patch("yacfg.output.open", mock.MagicMock())
-def test_true(*_):
-    file_name = "my_output.txt"
-    file_path = "/output/path"
-    file_pathname = os.path.join(file_path, file_name)
+def test_true(tmp_path):
+    write_output("my_output.txt", str(tmp_path), "output data")
 
-    data = "output data"
+    assert (tmp_path / "my_output.txt").read_text() == "output data"
+    # no temporary file left behind
+    assert os.listdir(tmp_path) == ["my_output.txt"]
 
-    write_output(file_name, file_path, data)
-    # noinspection PyUnresolvedReferences
-    yacfg.output.open.assert_called_with(file_pathname, "w")
-    # noinspection PyUnresolvedReferences
-    fh = yacfg.output.open.return_value.__enter__.return_value
-    fh.write.assert_has_calls([mock.call(data)])
 
+def test_replace_keeps_mode(tmp_path):
+    output_file = tmp_path / "my_output.sh"
+    output_file.write_text("old data")
+    output_file.chmod(0o750)
 
-@mock.patch("yacfg.output.open", side_effect=IOError)
-def test_bad_filename(*_):
-    file_name = "my_output.txt"
-    file_path = "/bad/output/path"
-    file_pathname = os.path.join(file_path, file_name)
+    write_output("my_output.sh", str(tmp_path), "new data")
 
-    data = "output data"
+    assert output_file.read_text() == "new data"
+    assert stat.S_IMODE(output_file.stat().st_mode) == 0o750
 
+
+@mock.patch("os.fsync")
+def test_fsync(fsync_mock, tmp_path):
+    write_output("my_output.txt", str(tmp_path), "output data", fsync=True)
+
+    fsync_mock.assert_called_once()
+    assert (tmp_path / "my_output.txt").read_text() == "output data"
+
+
+@mock.patch("os.replace", side_effect=OSError("failed"))
+def test_failed_replace(_, tmp_path):
+    output_file = tmp_path / "my_output.txt"
+    output_file.write_text("old data")
+
+    with pytest.raises(OSError):
+        write_output("my_output.txt", str(tmp_path), "new data")
+    assert output_file.read_text() == "old data"
+    assert os.listdir(tmp_path) == ["my_output.txt"]
+
+
+def test_bad_filename(tmp_path):
     with pytest.raises(IOError):
-        write_output(file_name, file_path, data)
-    # noinspection PyUnresolvedReferences
-    yacfg.output.open.assert_called_with(file_pathname, "w")
+        write_output("my_output.txt", str(tmp_path / "missing"), "output data")
@@ -0,0 +1,40 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import pytest
+
+from yacfg.output import write_output_chunks
+
+
+def test_true(tmp_path):
+    write_output_chunks("my_output.txt", str(tmp_path), iter(["output", " data"]))
+
+    assert (tmp_path / "my_output.txt").read_text() == "output data"
+    assert os.listdir(tmp_path) == ["my_output.txt"]
+
+
+def test_failed_chunks(tmp_path):
+    output_file = tmp_path / "my_output.txt"
+    output_file.write_text("old data")
+
+    def chunks():
+        yield "new"
+        raise RuntimeError("render failed")
+
+    with pytest.raises(RuntimeError):
+        write_output_chunks("my_output.txt", str(tmp_path), chunks())
+    assert output_file.read_text() == "old data"
+    assert os.listdir(tmp_path) == ["my_output.txt"]
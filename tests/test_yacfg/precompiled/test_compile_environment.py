@@ -0,0 +1,84 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import zipfile
+
+import pytest
+from jinja2 import DictLoader, Environment, ModuleLoader
+
+from yacfg.exceptions import TemplateError
+from yacfg.precompiled import MANIFEST_NAME, compile_environment, load_manifest
+from yacfg.templates import get_environment
+
+
+@pytest.fixture
+def search_path(tmp_path):
+    template_dir = tmp_path / "templates" / "set"
+    licenses_dir = tmp_path / "templates" / "libs" / "licenses"
+    template_dir.mkdir(parents=True)
+    licenses_dir.mkdir(parents=True)
+    (template_dir / "broker.xml.jinja2").write_text(
+        "{% include 'libs/licenses/xml.jinja2' %}<broker>{{ name }}</broker>\n"
+    )
+    (template_dir / "broken.xml.jinja2").write_text("{% if %}")
+    (template_dir / "_template").write_text("")
+    (licenses_dir / "xml.jinja2").write_text("<!-- license -->\n")
+    return (str(template_dir), str(tmp_path / "templates"))
+
+
+def test_directory(search_path, tmp_path):
+    dest = tmp_path / "precompiled"
+    env = get_environment(search_path)
+
+    assert compile_environment(env, str(dest)) == 3
+
+    manifest = json.loads((dest / MANIFEST_NAME).read_text())
+    assert manifest["search_path"] == list(search_path)
+    # templates with syntax errors are left to be compiled at runtime
+    assert sorted(manifest["templates"]) == [
+        "broker.xml.jinja2",
+        "libs/licenses/xml.jinja2",
+        "set/broker.xml.jinja2",
+    ]
+    assert (dest / ModuleLoader.get_module_filename("broker.xml.jinja2")).exists()
+
+
+def test_zip(search_path, tmp_path):
+    dest = tmp_path / "precompiled.zip"
+    env = get_environment(search_path)
+
+    assert compile_environment(env, str(dest)) == 3
+
+    with zipfile.ZipFile(dest) as artifact:
+        assert ModuleLoader.get_module_filename("libs/licenses/xml.jinja2") in (
+            artifact.namelist()
+        )
+    assert load_manifest(str(dest))["search_path"] == list(search_path)
+
+
+def test_not_file_system_loader(tmp_path):
+    env = Environment(loader=DictLoader({"broker.xml.jinja2": ""}))
+
+    with pytest.raises(TemplateError):
+        compile_environment(env, str(tmp_path / "precompiled"))
+
+    assert not (tmp_path / "precompiled").exists()
+
+
+def test_not_usable(tmp_path):
+    (tmp_path / MANIFEST_NAME).write_text('{"version": 0}')
+
+    assert load_manifest(str(tmp_path)) is None
+    assert load_manifest(str(tmp_path / "missing.zip")) is None
@@ -0,0 +1,70 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import mock
+from jinja2 import Environment, FileSystemLoader
+
+from yacfg.precompiled import PRECOMPILED_ENV, PrecompiledLoader, compile_environment
+from yacfg.templates import get_environment, get_environment_options
+
+
+def precompile(tmp_path, dest_name="precompiled"):
+    template_dir = tmp_path / "templates"
+    template_dir.mkdir(exist_ok=True)
+    (template_dir / "a.jinja2").write_text("{% include 'lib.jinja2' %}{{ value }}")
+    (template_dir / "lib.jinja2").write_text("lib ")
+    search_path = (str(template_dir),)
+    dest = str(tmp_path / dest_name)
+    compile_environment(get_environment(search_path), dest)
+    return search_path, dest
+
+
+def test_precompiled(monkeypatch, tmp_path):
+    search_path, dest = precompile(tmp_path)
+    monkeypatch.setenv(PRECOMPILED_ENV, os.pathsep.join(["/missing", dest]))
+
+    env = get_environment(search_path, **get_environment_options())
+
+    assert isinstance(env.loader, PrecompiledLoader)
+    with mock.patch.object(Environment, "compile") as compile_mock:
+        assert env.get_template("a.jinja2").render(value=1) == "lib 1"
+    compile_mock.assert_not_called()
+
+
+def test_source_changed(monkeypatch, tmp_path):
+    search_path, dest = precompile(tmp_path, "precompiled.zip")
+    monkeypatch.setenv(PRECOMPILED_ENV, dest)
+    env = get_environment(search_path, **get_environment_options())
+    template = env.get_template("lib.jinja2")
+    assert template.is_up_to_date
+
+    (tmp_path / "templates" / "lib.jinja2").write_text("changed library ")
+
+    assert not template.is_up_to_date
+    assert not env.loader.is_compiled("lib.jinja2")
+    assert env.loader.is_compiled("a.jinja2")
+    assert env.get_template("a.jinja2").render(value=1) == "changed library 1"
+
+
+def test_other_search_path(monkeypatch, tmp_path):
+    _, dest = precompile(tmp_path)
+    other_dir = tmp_path / "other"
+    other_dir.mkdir()
+    monkeypatch.setenv(PRECOMPILED_ENV, dest)
+
+    env = get_environment((str(other_dir),), **get_environment_options())
+
+    assert type(env.loader) is FileSystemLoader
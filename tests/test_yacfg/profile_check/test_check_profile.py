@@ -0,0 +1,101 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+
+from yacfg.exceptions import GenerationError, ProfileError
+from yacfg.profile_check import (
+    CHECK_EXPORT_TUNING,
+    CHECK_GENERATE,
+    CHECK_LINT_STATIC,
+    CHECK_LINT_TUNING,
+    CHECK_NEW_PROFILE_STATIC,
+    CHECK_TUNE,
+    CHECKS,
+    STATUS_FAILED,
+    STATUS_OK,
+    STATUS_SKIPPED,
+    check_profile,
+)
+
+
+def statuses(report):
+    return {name: result["status"] for name, result in report["checks"].items()}
+
+
+@mock.patch("yacfg.profile_check.get_yamllint_config", return_value=None)
+@mock.patch("yacfg.output.export_tuning_variables")
+@mock.patch("yacfg.output.new_profile_rendered")
+@mock.patch("yacfg.output.new_profile")
+@mock.patch("yacfg.profile_check._generate")
+def test_all_checks(generate_mock, new_profile_mock, new_profile_rendered_mock, *_):
+    report = check_profile("demo/p.yaml", "/work")
+
+    assert report["ok"]
+    assert list(report["checks"]) == list(CHECKS)
+    assert statuses(report)[CHECK_TUNE] == STATUS_OK
+    # yamllint is not installed
+    assert statuses(report)[CHECK_LINT_STATIC] == STATUS_SKIPPED
+    assert generate_mock.call_args_list == [
+        mock.call("demo/p.yaml"),
+        mock.call("demo/p.yaml", ["/work/tuning.yaml"]),
+    ]
+    new_profile_mock.assert_called_once_with("demo/p.yaml", "/work/dynamic/p.yaml")
+    new_profile_rendered_mock.assert_called_once_with(
+        "demo/p.yaml", "/work/static.yaml"
+    )
+
+
+@mock.patch("yacfg.profile_check.get_yamllint_config", return_value=None)
+@mock.patch(
+    "yacfg.output.export_tuning_variables",
+    side_effect=ProfileError("no tunable variables"),
+)
+@mock.patch("yacfg.output.new_profile_rendered")
+@mock.patch("yacfg.output.new_profile")
+@mock.patch("yacfg.profile_check._generate", side_effect=GenerationError("bad"))
+def test_failed_checks(generate_mock, *_):
+    report = check_profile("p.yaml", "/work")
+
+    assert not report["ok"]
+    assert statuses(report)[CHECK_GENERATE] == STATUS_FAILED
+    assert report["checks"][CHECK_GENERATE]["message"] == "bad"
+    assert statuses(report)[CHECK_NEW_PROFILE_STATIC] == STATUS_OK
+    assert statuses(report)[CHECK_EXPORT_TUNING] == STATUS_FAILED
+    # checks using the exported tuning do not run
+    assert statuses(report)[CHECK_LINT_TUNING] == STATUS_SKIPPED
+    assert statuses(report)[CHECK_TUNE] == STATUS_SKIPPED
+    generate_mock.assert_called_once_with("p.yaml")
+
+
+@mock.patch("yacfg.profile_check.lint_yaml")
+@mock.patch("yacfg.profile_check.get_yamllint_config", return_value=object())
+@mock.patch("yacfg.output.export_tuning_variables")
+@mock.patch("yacfg.output.new_profile_rendered")
+@mock.patch("yacfg.output.new_profile")
+@mock.patch("yacfg.profile_check._generate")
+def test_lint(*mocks):
+    lint_yaml_mock = mocks[-1]
+    lint_yaml_mock.side_effect = lambda path, _: (
+        ["static.yaml:1:1: syntax error"] if path.endswith("static.yaml") else []
+    )
+
+    report = check_profile("p.yaml", "/work")
+
+    assert not report["ok"]
+    assert statuses(report)[CHECK_LINT_STATIC] == STATUS_FAILED
+    assert statuses(report)[CHECK_LINT_TUNING] == STATUS_OK
+    assert report["checks"][CHECK_LINT_STATIC]["message"] == (
+        "static.yaml:1:1: syntax error"
+    )
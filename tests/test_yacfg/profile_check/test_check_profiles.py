@@ -0,0 +1,98 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import pytest
+
+from yacfg.profile_check import (
+    CHECK_GENERATE,
+    CHECK_TUNE,
+    STATUS_FAILED,
+    STATUS_OK,
+    check_profiles,
+    format_report,
+    main,
+)
+
+PROFILE = """\
+_defaults:
+  name: broker
+  port: 61616
+
+render:
+  template: demo
+
+broker:
+  name: {{ name }}
+  port: {{ port }}
+"""
+
+
+@pytest.fixture
+def profiles_tree(tmp_path, monkeypatch):
+    profiles_dir = tmp_path / "profiles" / "demo"
+    templates_dir = tmp_path / "templates" / "demo"
+    profiles_dir.mkdir(parents=True)
+    templates_dir.mkdir(parents=True)
+    (profiles_dir / "a.yaml.jinja2").write_text(PROFILE)
+    (profiles_dir / "b.yaml.jinja2").write_text(PROFILE)
+    (profiles_dir / "broken.yaml.jinja2").write_text(PROFILE.replace("demo", "missing"))
+    (templates_dir / "_template").write_text("")
+    (templates_dir / "broker.xml.jinja2").write_text(
+        "<broker name='{{ broker.name }}' port='{{ broker.port }}'/>\n"
+    )
+    monkeypatch.setenv("YACFG_PROFILES", str(tmp_path / "profiles"))
+    monkeypatch.setenv("YACFG_TEMPLATES", str(tmp_path / "templates"))
+    return tmp_path
+
+
+def test_all_profiles(profiles_tree):
+    report = check_profiles([], work_dir=str(profiles_tree / "work"), jobs=1)
+
+    assert not report["ok"]
+    by_profile = {entry["profile"]: entry for entry in report["profiles"]}
+    assert sorted(by_profile) == [
+        "demo/a.yaml.jinja2",
+        "demo/b.yaml.jinja2",
+        "demo/broken.yaml.jinja2",
+    ]
+    assert by_profile["demo/a.yaml.jinja2"]["ok"]
+    assert by_profile["demo/a.yaml.jinja2"]["checks"][CHECK_TUNE]["status"] == (
+        STATUS_OK
+    )
+    broken = by_profile["demo/broken.yaml.jinja2"]
+    assert broken["checks"][CHECK_GENERATE]["status"] == STATUS_FAILED
+    assert (profiles_tree / "work" / "0000" / "static.yaml").exists()
+    assert "demo/broken.yaml.jinja2: generate:" in format_report(report)
+
+
+def test_process_pool(profiles_tree):
+    report = check_profiles(["demo/a.yaml.jinja2", "demo/b.yaml.jinja2"], jobs=2)
+
+    assert report["ok"]
+    assert [entry["profile"] for entry in report["profiles"]] == [
+        "demo/a.yaml.jinja2",
+        "demo/b.yaml.jinja2",
+    ]
+
+
+def test_main_report(profiles_tree, capsys):
+    report_file = profiles_tree / "report.json"
+
+    assert main(["demo/a.yaml.jinja2", "--report", str(report_file)]) == 0
+    assert json.loads(report_file.read_text())["ok"]
+    assert "1 profile(s) checked" in capsys.readouterr().out
+    assert main(["demo/broken.yaml.jinja2", "--report", "-"]) == 1
+    assert not json.loads(capsys.readouterr().out)["ok"]
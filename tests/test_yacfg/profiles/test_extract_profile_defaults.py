@@ -0,0 +1,63 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+import pytest
+
+from yacfg.exceptions import ProfileError
+from yacfg.profiles import extract_profile_defaults
+from yacfg.yaml_backend import load_yaml
+
+
+def test_section_only(*_):
+    # the rest of the profile is not valid YAML, so it must not be parsed
+    rendered_profile = (
+        "# header\n"
+        "_defaults:\n"
+        "  a: 1\n"
+        "  # comment\n"
+        "  b:\n"
+        "  - x\n"
+        "\n"
+        "key: [unclosed\n"
+    )
+
+    with mock.patch("yacfg.profiles.load_yaml", wraps=load_yaml) as load:
+        result = extract_profile_defaults(rendered_profile)
+
+    assert result == {"a": 1, "b": ["x"]}
+    load.assert_called_once()
+
+
+def test_last_section(*_):
+    rendered_profile = "key: value\n_defaults:\n  a: 1\n"
+    assert extract_profile_defaults(rendered_profile) == {"a": 1}
+
+
+def test_alias_fallback(*_):
+    rendered_profile = "base: &base\n  a: 1\n_defaults:\n  <<: *base\n  b: 2\n"
+    assert extract_profile_defaults(rendered_profile) == {"a": 1, "b": 2}
+
+
+def test_no_defaults(*_):
+    assert extract_profile_defaults("key: value\n") == {}
+
+
+def test_empty_defaults(*_):
+    assert extract_profile_defaults("_defaults:\nkey: value\n") == {}
+
+
+def test_bad_yaml(*_):
+    with pytest.raises(ProfileError):
+        extract_profile_defaults("key: [unclosed\n")
@@ -16,6 +16,7 @@ import mock
 import pytest
 
 import yacfg.profiles
+import yacfg.templates
 from yacfg.exceptions import TemplateError
 from yacfg.profiles import get_profile_template
 from ..files.fakes import fake_select_profile_file, fake_profiles_paths
@@ -24,8 +25,8 @@ from ..files.fakes import fake_select_profile_file, fake_profiles_paths
 @mock.patch("yacfg.profiles.select_profile_file", side_effect=fake_select_profile_file)
 @mock.patch("os.path.isdir", side_effect=(True,))
 @mock.patch("yacfg.profiles.get_profiles_paths", side_effect=fake_profiles_paths)
-@mock.patch("yacfg.profiles.FileSystemLoader", mock.Mock())
-@mock.patch("yacfg.profiles.Environment", mock.Mock())
+@mock.patch("yacfg.templates.FileSystemLoader", mock.Mock())
+@mock.patch("yacfg.templates.Environment", mock.Mock())
 def test_true(*_):
     profile_name = "profile.yaml"
     expected_template = "my_template"
@@ -34,7 +35,7 @@ def test_true(*_):
     )
 
     fake_env = mock.Mock()
-    yacfg.profiles.Environment.return_value = fake_env
+    yacfg.templates.Environment.return_value = fake_env
     fake_env.get_template.return_value = expected_template
 
     template = get_profile_template(profile_name)
@@ -43,7 +44,7 @@ def test_true(*_):
     # noinspection PyUnresolvedReferences
     yacfg.profiles.select_profile_file.assert_called_with(profile_name)
     # noinspection PyUnresolvedReferences
-    yacfg.profiles.FileSystemLoader.assert_called_with(
+    yacfg.templates.FileSystemLoader.assert_called_with(
         [expected_selected_path, *fake_profiles_paths()]
     )
     fake_env.get_template.assert_called_with(expected_selected_name)
@@ -52,14 +53,14 @@ def test_true(*_):
 @mock.patch("yacfg.profiles.select_profile_file", side_effect=fake_select_profile_file)
 @mock.patch("os.path.isdir", side_effect=(False,))
 @mock.patch("yacfg.profiles.get_profiles_paths", side_effect=fake_profiles_paths)
-@mock.patch("yacfg.profiles.FileSystemLoader", mock.Mock())
-@mock.patch("yacfg.profiles.Environment", mock.Mock())
+@mock.patch("yacfg.templates.FileSystemLoader", mock.Mock())
+@mock.patch("yacfg.templates.Environment", mock.Mock())
 def test_bad_profile_exception(*_):
     profile_name = "bad_profile.yaml"
     expected_template = "my_template"
 
     fake_env = mock.Mock()
-    yacfg.profiles.Environment.return_value = fake_env
+    yacfg.templates.Environment.return_value = fake_env
     fake_env.get_template.return_value = expected_template
 
     with pytest.raises(TemplateError):
@@ -68,5 +69,5 @@ def test_bad_profile_exception(*_):
     # noinspection PyUnresolvedReferences
     yacfg.profiles.select_profile_file.assert_called_with(profile_name)
     # noinspection PyUnresolvedReferences
-    yacfg.profiles.FileSystemLoader.assert_not_called()
+    yacfg.templates.FileSystemLoader.assert_not_called()
     fake_env.get_template.assert_not_called()
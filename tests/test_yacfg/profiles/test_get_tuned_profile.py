@@ -25,6 +25,7 @@ from .fakes import fake_load_tuned_profile_no_defaults
 
 @mock.patch("yacfg.profiles.load_tuning", mock.Mock())
 @mock.patch("yacfg.profiles.load_profile_defaults", mock.Mock())
+@mock.patch("yacfg.profiles.load_static_profile", mock.Mock(return_value=None))
 @mock.patch("yacfg.profiles.get_profile_template", mock.Mock())
 def test_no_tuning(*_):
     profile_name = "profile.yaml"
@@ -54,7 +55,7 @@ def test_no_tuning(*_):
         tuning_files_list=None,
     )
     # noinspection PyUnresolvedReferences
-    yacfg.profiles.load_profile_defaults.assert_called_with(profile_name)
+    yacfg.profiles.load_profile_defaults.assert_called_with(profile_name, fake_profile)
     # noinspection PyUnresolvedReferences
     yacfg.profiles.get_profile_template.assert_called_with(profile_name)
 
@@ -65,6 +66,7 @@ def test_no_tuning(*_):
 
 @mock.patch("yacfg.profiles.load_tuning", mock.Mock())
 @mock.patch("yacfg.profiles.load_profile_defaults", mock.Mock())
+@mock.patch("yacfg.profiles.load_static_profile", mock.Mock(return_value=None))
 @mock.patch("yacfg.profiles.get_profile_template", mock.Mock())
 def test_tuning_data(*_):
     profile_name = "profile.yaml"
@@ -97,7 +99,7 @@ def test_tuning_data(*_):
         tuning_files_list=None,
     )
     # noinspection PyUnresolvedReferences
-    yacfg.profiles.load_profile_defaults.assert_called_with(profile_name)
+    yacfg.profiles.load_profile_defaults.assert_called_with(profile_name, fake_profile)
     # noinspection PyUnresolvedReferences
     yacfg.profiles.get_profile_template.assert_called_with(profile_name)
 
@@ -108,6 +110,7 @@ def test_tuning_data(*_):
 
 @mock.patch("yacfg.profiles.load_tuning", mock.Mock())
 @mock.patch("yacfg.profiles.load_profile_defaults", mock.Mock())
+@mock.patch("yacfg.profiles.load_static_profile", mock.Mock(return_value=None))
 @mock.patch("yacfg.profiles.get_profile_template", mock.Mock())
 def test_tuning_files_data(*_):
     profile_name = "profile.yaml"
@@ -142,7 +145,7 @@ def test_tuning_files_data(*_):
         tuning_files_list=tuning_files,
     )
     # noinspection PyUnresolvedReferences
-    yacfg.profiles.load_profile_defaults.assert_called_with(profile_name)
+    yacfg.profiles.load_profile_defaults.assert_called_with(profile_name, fake_profile)
     # noinspection PyUnresolvedReferences
     yacfg.profiles.get_profile_template.assert_called_with(profile_name)
 
@@ -153,6 +156,7 @@ def test_tuning_files_data(*_):
 
 @mock.patch("yacfg.profiles.load_tuning", mock.Mock())
 @mock.patch("yacfg.profiles.load_profile_defaults", mock.Mock())
+@mock.patch("yacfg.profiles.load_static_profile", mock.Mock(return_value=None))
 @mock.patch("yacfg.profiles.get_profile_template", mock.Mock())
 def test_tuning_files(*_):
     profile_name = "profile.yaml"
@@ -187,7 +191,7 @@ def test_tuning_files(*_):
         tuning_files_list=tuning_files,
     )
     # noinspection PyUnresolvedReferences
-    yacfg.profiles.load_profile_defaults.assert_called_with(profile_name)
+    yacfg.profiles.load_profile_defaults.assert_called_with(profile_name, fake_profile)
     # noinspection PyUnresolvedReferences
     yacfg.profiles.get_profile_template.assert_called_with(profile_name)
 
@@ -199,6 +203,7 @@ def test_tuning_files(*_):
 @mock.patch("yacfg.profiles.load_profile_defaults", side_effect=ProfileError)
 @mock.patch("yacfg.profiles.open", side_effect=("%this is not yaml",))
 @mock.patch("yaml.load", mock.Mock())
+@mock.patch("yacfg.profiles.load_static_profile", mock.Mock(return_value=None))
 @mock.patch("yacfg.profiles.get_profile_template", mock.Mock())
 def test_bad_profile_exception(*_):
     profile_name = "profile.yaml"
@@ -214,11 +219,11 @@ def test_bad_profile_exception(*_):
         get_tuned_profile(profile_name, tuning_files)
 
     # noinspection PyUnresolvedReferences
-    yacfg.profiles.load_profile_defaults.assert_called_with(profile_name)
+    yacfg.profiles.load_profile_defaults.assert_called_with(profile_name, fake_profile)
     # noinspection PyUnresolvedReferences
     yacfg.profiles.open.assert_not_called()
     # noinspection PyUnresolvedReferences
     yaml.load.assert_not_called()
     # noinspection PyUnresolvedReferences
-    yacfg.profiles.get_profile_template.assert_not_called()
+    yacfg.profiles.get_profile_template.assert_called_once_with(profile_name)
     fake_profile.render.assert_not_called()
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import jinja2
 import mock
 import pytest
 
@@ -24,6 +25,7 @@ from .fakes import (
 )
 
 
+@mock.patch("yacfg.profiles.load_static_profile", mock.Mock(return_value=None))
 @mock.patch("yacfg.profiles.get_profile_template", mock.Mock())
 def test_true(*_):
     profile_name = "profile.yaml"
@@ -41,9 +43,62 @@ def test_true(*_):
     yacfg.profiles.get_profile_template.assert_called_with(profile_name)
 
 
+@mock.patch("yacfg.profiles.load_static_profile", mock.Mock(return_value=None))
 @mock.patch("yacfg.profiles.get_profile_template", side_effect=TemplateError)
 def test_bad_template(*_):
     profile_name = "bad_profile.yaml"
 
     with pytest.raises(TemplateError):
         load_profile_defaults(profile_name)
+
+
+@mock.patch("yacfg.profiles.load_static_profile", mock.Mock(return_value=None))
+@mock.patch("yacfg.profiles.get_profile_template", mock.Mock())
+def test_reuse_template(*_):
+    profile_name = "profile.yaml"
+    fake_template = mock.Mock()
+    fake_template.render.return_value = fake_get_tuned_profile()
+
+    profile_defaults = load_profile_defaults(profile_name, fake_template)
+
+    assert profile_defaults == fake_load_profile_defaults()
+    # noinspection PyUnresolvedReferences
+    yacfg.profiles.get_profile_template.assert_not_called()
+
+
+def test_cached_per_file(tmp_path):
+    profile_file = tmp_path / "profile.yaml"
+    profile_file.write_text(fake_get_tuned_profile())
+    env = jinja2.Environment(loader=jinja2.FileSystemLoader(str(tmp_path)))
+    template = env.get_template("profile.yaml")
+
+    first = load_profile_defaults("profile.yaml", template)
+    first["default_key"] = "changed"
+    with mock.patch.object(template, "render") as render:
+        second = load_profile_defaults("profile.yaml", template)
+
+    assert second == fake_load_profile_defaults()
+    render.assert_not_called()
+
+    # a changed profile file invalidates cached defaults
+    profile_file.write_text(fake_get_tuned_profile() + "# changed\n")
+    with mock.patch.object(template, "render", return_value="") as render:
+        load_profile_defaults("profile.yaml", template)
+    render.assert_called_once_with()
+
+
+def test_cached_per_included_templates(tmp_path):
+    (tmp_path / "_libs").mkdir()
+    defaults_file = tmp_path / "_libs" / "defaults.yaml.jinja2"
+    defaults_file.write_text("_defaults:\n  queue: a\n")
+    (tmp_path / "profile.yaml").write_text(
+        '{% include "_libs/defaults.yaml.jinja2" %}\nbroker: {}\n'
+    )
+    env = jinja2.Environment(loader=jinja2.FileSystemLoader(str(tmp_path)))
+    template = env.get_template("profile.yaml")
+
+    assert load_profile_defaults("profile.yaml", template) == {"queue": "a"}
+
+    # a changed included template invalidates cached defaults
+    defaults_file.write_text("_defaults:\n  queue: b\n")
+    assert load_profile_defaults("profile.yaml", template) == {"queue": "b"}
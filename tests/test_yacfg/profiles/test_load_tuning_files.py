@@ -0,0 +1,71 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import mock
+import pytest
+
+from yacfg.exceptions import ProfileError
+from yacfg.profiles import load_tuning_files
+from yacfg.yaml_backend import load_yaml
+
+
+def test_no_files(*_):
+    assert load_tuning_files(None) == []
+
+
+def test_order(tmp_path):
+    (tmp_path / "a.yaml").write_text("a: 1\n")
+    (tmp_path / "b.yaml").write_text("b: 2\n")
+
+    result = load_tuning_files([str(tmp_path / "b.yaml"), str(tmp_path / "a.yaml")])
+
+    assert result == [{"b": 2}, {"a": 1}]
+
+
+def test_cached(tmp_path):
+    tuning_file = tmp_path / "common.yaml"
+    tuning_file.write_text("a:\n  b: 1\n")
+
+    with mock.patch("yacfg.profiles.load_yaml", wraps=load_yaml) as safe_load:
+        first, second = load_tuning_files([str(tuning_file)] * 2)
+        load_tuning_files([os.path.relpath(tuning_file)])
+
+    assert safe_load.call_count == 1
+    # every caller gets its own copy
+    first["a"]["b"] = 2
+    assert second == {"a": {"b": 1}}
+    assert load_tuning_files([str(tuning_file)]) == [{"a": {"b": 1}}]
+
+
+def test_changed_file(tmp_path):
+    tuning_file = tmp_path / "common.yaml"
+    tuning_file.write_text("a: 1\n")
+    assert load_tuning_files([str(tuning_file)]) == [{"a": 1}]
+
+    tuning_file.write_text("a: 22\n")
+    assert load_tuning_files([str(tuning_file)]) == [{"a": 22}]
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(ProfileError):
+        load_tuning_files([str(tmp_path / "missing.yaml")])
+
+
+def test_bad_yaml(tmp_path):
+    tuning_file = tmp_path / "bad.yaml"
+    tuning_file.write_text("a: [unclosed\n")
+    with pytest.raises(ProfileError):
+        load_tuning_files([str(tuning_file)])
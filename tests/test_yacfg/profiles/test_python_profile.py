@@ -0,0 +1,102 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import mock
+import pytest
+
+import yacfg.profiles
+from yacfg.exceptions import ProfileError
+from yacfg.profiles import (
+    get_tuned_profile,
+    load_profile_defaults,
+    load_python_profile,
+)
+
+PYTHON_PROFILE = """
+DEFAULTS = {"name": "broker0", "queues": 2}
+
+
+def render(tuning):
+    return {
+        "render": {"template": "demo/1.0"},
+        "broker": {
+            "name": tuning["name"],
+            "queues": ["q%d" % i for i in range(tuning["queues"])],
+            "profile": tuning["profile_path"],
+        },
+    }
+"""
+
+
+def write_profile(tmp_path, content=PYTHON_PROFILE):
+    profile_file = tmp_path / "profile.py"
+    profile_file.write_text(content)
+    yacfg.profiles.select_profile_file.return_value = ("profile.py", str(tmp_path))
+    return "profile.py"
+
+
+@mock.patch("yacfg.profiles.select_profile_file", mock.Mock())
+def test_tuned(tmp_path):
+    profile = write_profile(tmp_path)
+
+    config_data, tuned_profile = get_tuned_profile(
+        profile, tuning_data_list=[{"queues": 3}, {"name": "X"}]
+    )
+
+    assert tuned_profile is None
+    assert config_data == {
+        "render": {"template": "demo/1.0"},
+        "broker": {"name": "X", "queues": ["q0", "q1", "q2"], "profile": profile},
+        "_defaults": {"name": "broker0", "queues": 2},
+    }
+
+
+@mock.patch("yacfg.profiles.select_profile_file", mock.Mock())
+def test_defaults(tmp_path):
+    profile = write_profile(tmp_path)
+
+    defaults = load_profile_defaults(profile)
+    defaults["name"] = "changed"
+
+    assert load_profile_defaults(profile) == {"name": "broker0", "queues": 2}
+
+
+@mock.patch("yacfg.profiles.select_profile_file", mock.Mock())
+def test_cached(tmp_path):
+    profile = write_profile(tmp_path)
+
+    assert load_python_profile(profile)[0] is load_python_profile(profile)[0]
+
+
+@mock.patch("yacfg.profiles.select_profile_file", mock.Mock())
+def test_no_render(tmp_path):
+    profile = write_profile(tmp_path, "DEFAULTS = {}\n")
+
+    with pytest.raises(ProfileError):
+        load_python_profile(profile)
+
+
+@mock.patch("yacfg.profiles.select_profile_file", mock.Mock())
+def test_render_error(tmp_path):
+    profile = write_profile(tmp_path, "def render(tuning):\n    return tuning['x']\n")
+
+    with pytest.raises(ProfileError):
+        get_tuned_profile(profile)
+
+
+@mock.patch("yacfg.profiles.select_profile_file", mock.Mock())
+def test_not_mapping(tmp_path):
+    profile = write_profile(tmp_path, "def render(tuning):\n    return []\n")
+
+    with pytest.raises(ProfileError):
+        get_tuned_profile(profile)
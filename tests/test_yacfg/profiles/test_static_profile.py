@@ -0,0 +1,121 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import mock
+import pytest
+
+import yacfg.profiles
+from yacfg.exceptions import ProfileError
+from yacfg.profiles import (
+    STATIC_PROFILE_MARKER,
+    get_tuned_profile,
+    load_profile_defaults,
+    load_static_profile,
+)
+
+STATIC_PROFILE = """\
+_defaults:
+  name: broker0
+render:
+  template: demo/1.0
+broker:
+  name: broker0
+"""
+
+
+def write_profile(tmp_path, content=STATIC_PROFILE):
+    profile_file = tmp_path / "profile.yaml"
+    profile_file.write_text(content)
+    yacfg.profiles.select_profile_file.return_value = ("profile.yaml", str(tmp_path))
+    return "profile.yaml"
+
+
+@mock.patch("yacfg.profiles.get_profile_template", mock.Mock())
+@mock.patch("yacfg.profiles.select_profile_file", mock.Mock())
+def test_tuned(tmp_path, caplog):
+    profile = write_profile(tmp_path)
+
+    config_data, tuned_profile = get_tuned_profile(
+        profile, tuning_data_list=[{"name": "X"}]
+    )
+
+    # tuning is overlaid on the defaults only
+    assert tuned_profile is None
+    assert config_data == {
+        "_defaults": {"name": "X"},
+        "render": {"template": "demo/1.0"},
+        "broker": {"name": "broker0"},
+    }
+    assert "tuning of name only changes its _defaults" in caplog.text
+    # noinspection PyUnresolvedReferences
+    yacfg.profiles.get_profile_template.assert_not_called()
+
+
+@mock.patch("yacfg.profiles.select_profile_file", mock.Mock())
+def test_tuned_defaults(tmp_path, caplog):
+    profile = write_profile(tmp_path)
+
+    config_data, tuned_profile = get_tuned_profile(
+        profile, tuning_data_list=[{"name": "broker0"}]
+    )
+
+    assert tuned_profile == STATIC_PROFILE[:-1]
+    assert config_data["_defaults"] == {"name": "broker0"}
+    assert not caplog.records
+
+
+@mock.patch("yacfg.profiles.select_profile_file", mock.Mock())
+def test_config_data_copied(tmp_path):
+    profile = write_profile(tmp_path)
+
+    config_data, _ = get_tuned_profile(profile)
+    config_data["broker"]["name"] = "changed"
+
+    assert get_tuned_profile(profile)[0]["broker"]["name"] == "broker0"
+
+
+@mock.patch("yacfg.profiles.select_profile_file", mock.Mock())
+def test_marker(tmp_path):
+    # exported profiles are static even with template delimiters in values
+    profile = write_profile(
+        tmp_path, f"{STATIC_PROFILE_MARKER} generated\n---\nkey: '{{{{ value }}}}'\n"
+    )
+
+    config_data, _ = get_tuned_profile(profile)
+
+    assert config_data == {"key": "{{ value }}"}
+
+
+@mock.patch("yacfg.profiles.select_profile_file", mock.Mock())
+def test_templated(tmp_path):
+    profile = write_profile(tmp_path, "key: {{ value }}\n")
+
+    assert load_static_profile(profile) is None
+
+
+@mock.patch("yacfg.profiles.get_profile_template", mock.Mock())
+@mock.patch("yacfg.profiles.select_profile_file", mock.Mock())
+def test_defaults(tmp_path):
+    profile = write_profile(tmp_path)
+
+    assert load_profile_defaults(profile) == {"name": "broker0"}
+    # noinspection PyUnresolvedReferences
+    yacfg.profiles.get_profile_template.assert_not_called()
+
+
+@mock.patch("yacfg.profiles.select_profile_file", mock.Mock())
+def test_bad_profile(tmp_path):
+    profile = write_profile(tmp_path, "key: [value\n")
+
+    with pytest.raises(ProfileError):
+        get_tuned_profile(profile)
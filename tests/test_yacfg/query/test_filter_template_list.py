@@ -39,3 +39,25 @@ dataset_filter_basic = (
 def test_filter_basic(output_filter, expected_result):
     result = filter_template_list(basic_template_list, output_filter=output_filter)
     assert result == expected_result
+
+
+dataset_filter_expressions = (
+    # grouped expressions are combined
+    (["(a|b)\\.xml", "c.*"], ["a.xml", "b.xml", "c.xml", "c.properties"]),
+    # expressions referring to groups are matched one by one
+    (["(.)\\.xm(l)", "(?P<n>.)\\.(?P=n)"], ["a.xml", "b.xml", "c.xml"]),
+    # expressions may define the same named group
+    (["(?P<n>a).*", "(?P<n>c).*"], ["a.xml", "a.txt", "c.xml", "c.properties"]),
+    # global flags are only valid at the start of an expression
+    (["(?i)A\\.XML", "b.txt"], ["a.xml", "b.txt"]),
+    # inline flags of an expression do not apply to the other ones
+    (["A.*", "(?i)B\\.XML"], ["b.xml"]),
+    (["A.*", "(?i:B\\.XML)"], ["b.xml"]),
+    ([], []),
+)
+
+
+@pytest.mark.parametrize("output_filter,expected_result", dataset_filter_expressions)
+def test_filter_expressions(output_filter, expected_result):
+    result = filter_template_list(basic_template_list, output_filter=output_filter)
+    assert result == expected_result
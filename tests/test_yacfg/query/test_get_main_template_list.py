@@ -12,7 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+
 import mock
+from jinja2 import Environment, FileSystemLoader
 
 from yacfg.query import get_main_template_list
 
@@ -36,3 +39,40 @@ def test_basic(*_):
 
     result = get_main_template_list(env)
     assert expected == result
+
+
+def test_file_system_loader(tmp_path):
+    template_dir = tmp_path / "template"
+    libs_dir = tmp_path / "libs"
+    (template_dir / "sub").mkdir(parents=True)
+    libs_dir.mkdir()
+    (template_dir / "broker.xml.jinja2").write_text("")
+    (template_dir / "_template").write_text("")
+    (template_dir / "sub" / "nested.xml.jinja2").write_text("")
+    (libs_dir / "macros.jinja2").write_text("")
+    (libs_dir / "broker.xml.jinja2").write_text("")
+    env = Environment(loader=FileSystemLoader([str(template_dir), str(libs_dir)]))
+
+    result = get_main_template_list(env)
+
+    # same main templates as listed by the loader
+    assert result == ["broker.xml.jinja2", "macros.jinja2"]
+    assert result == env.list_templates(
+        filter_func=lambda name: "/" not in name and name.endswith(".jinja2")
+    )
+
+
+def test_cached(tmp_path):
+    (tmp_path / "a.xml.jinja2").write_text("")
+    env = Environment(loader=FileSystemLoader(str(tmp_path)))
+
+    assert get_main_template_list(env) == ["a.xml.jinja2"]
+    with mock.patch("os.scandir") as scandir_mock:
+        assert get_main_template_list(env) == ["a.xml.jinja2"]
+    scandir_mock.assert_not_called()
+
+    (tmp_path / "b.xml.jinja2").write_text("")
+    # the directory modification time may not change within its granularity
+    os.utime(tmp_path, ns=(0, 0))
+
+    assert get_main_template_list(env) == ["a.xml.jinja2", "b.xml.jinja2"]
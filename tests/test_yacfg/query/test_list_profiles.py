@@ -27,6 +27,7 @@ def fake_os_walk_profiles_basic(*_):
         (os.path.join(prefix_path, "a"), ["b"], ["profile.yaml", "something.txt"]),
         (os.path.join(prefix_path, "a", "b"), [], ["profile.yaml"]),
         (os.path.join(prefix_path, "b"), [], ["my_profile.yaml"]),
+        (os.path.join(prefix_path, "c"), [], ["native.py", "_helpers.py"]),
         (os.path.join(prefix_path, "x"), ["_not"], ["something.txt"]),
         (os.path.join(prefix_path, "x", "_not"), [], ["not_a_profile.yaml"]),
         (os.path.join(prefix_path, "_not"), [], ["also_not_a_profile.yaml"]),
@@ -34,13 +35,14 @@ def fake_os_walk_profiles_basic(*_):
 
 
 @mock.patch("yacfg.query.get_profiles_paths", side_effect=fake_profiles_paths)
-@mock.patch("os.walk", side_effect=fake_os_walk_profiles_basic)
+@mock.patch("yacfg.query.walk_tree", side_effect=fake_os_walk_profiles_basic)
 def test_basic(*_):
     expected = [
         "profile.yaml",
         "a/profile.yaml",
         "a/b/profile.yaml",
         "b/my_profile.yaml",
+        "c/native.py",
     ]
     result = list_profiles()
     assert result == expected
@@ -56,7 +58,7 @@ def fake_os_walk_not_a_profile(*_):
 
 
 @mock.patch("yacfg.query.get_profiles_paths", side_effect=fake_module_path)
-@mock.patch("os.walk", side_effect=fake_os_walk_not_a_profile)
+@mock.patch("yacfg.query.walk_tree", side_effect=fake_os_walk_not_a_profile)
 def test_not_a_profile(*_):
     expected = []
     result = list_profiles()
@@ -64,7 +66,7 @@ def test_not_a_profile(*_):
 
 
 @mock.patch("yacfg.query.get_profiles_paths", side_effect=fake_module_path)
-@mock.patch("os.walk", side_effect=lambda *_, **__: tuple())
+@mock.patch("yacfg.query.walk_tree", side_effect=lambda *_, **__: tuple())
 def test_empty(*_):
     expected = []
     result = list_profiles()
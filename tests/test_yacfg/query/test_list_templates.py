@@ -82,7 +82,7 @@ def fake_walk_templates_basic(*_):
 
 
 @mock.patch("yacfg.query.get_templates_paths", side_effect=fake_templates_paths)
-@mock.patch("os.walk", side_effect=fake_walk_templates_basic)
+@mock.patch("yacfg.query.walk_tree", side_effect=fake_walk_templates_basic)
 def test_true(*_):
     expected = [
         "a",
@@ -130,7 +130,7 @@ def fake_walk_templates_not_a_template(*_):
 
 
 @mock.patch("yacfg.files.get_templates_paths", side_effect=fake_templates_paths)
-@mock.patch("os.walk", side_effect=fake_walk_templates_not_a_template)
+@mock.patch("yacfg.query.walk_tree", side_effect=fake_walk_templates_not_a_template)
 def test_not_a_template(*_):
     expected = []
 
@@ -139,7 +139,7 @@ def test_not_a_template(*_):
 
 
 @mock.patch("yacfg.files.get_templates_paths", side_effect=fake_templates_paths)
-@mock.patch("os.walk", side_effect=((),))
+@mock.patch("yacfg.query.walk_tree", side_effect=((),))
 def test_empty(*_):
     expected = []
 
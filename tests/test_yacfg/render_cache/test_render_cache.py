@@ -0,0 +1,129 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import time
+
+import pytest
+
+from yacfg.render_cache import (
+    RenderCache,
+    get_render_cache,
+    parse_age,
+    parse_size,
+    set_render_cache_dir,
+)
+
+
+def age_entry(render_cache, fingerprint, seconds):
+    path = render_cache.entry_path(render_cache.key(fingerprint))
+    mtime = time.time() - seconds
+    os.utime(path, (mtime, mtime))
+
+
+def test_get_put(tmp_path):
+    render_cache = RenderCache(str(tmp_path))
+
+    assert render_cache.get("fingerprint") is None
+    assert render_cache.put("fingerprint", "content\r\n")
+    assert render_cache.get("fingerprint") == "content\r\n"
+    assert render_cache.get("other") is None
+    assert render_cache.info()["entries"] == 1
+
+
+def test_get_refreshes(tmp_path):
+    render_cache = RenderCache(str(tmp_path))
+    render_cache.put("fingerprint", "content")
+    age_entry(render_cache, "fingerprint", 100)
+
+    render_cache.get("fingerprint")
+
+    assert render_cache.info()["oldest"] < 100
+
+
+def test_prune_size(tmp_path):
+    render_cache = RenderCache(str(tmp_path), max_size=10)
+    for index, fingerprint in enumerate(["a", "b", "c"]):
+        render_cache.put(fingerprint, "12345")
+        age_entry(render_cache, fingerprint, 100 - index)
+    # used recently, kept
+    render_cache.get("a")
+
+    assert render_cache.prune() == (1, 5)
+    assert render_cache.get("a") == "12345"
+    assert render_cache.get("b") is None
+    assert render_cache.get("c") == "12345"
+
+
+def test_prune_age(tmp_path):
+    render_cache = RenderCache(str(tmp_path), max_age=50)
+    render_cache.put("a", "old")
+    age_entry(render_cache, "a", 100)
+    render_cache.put("b", "new")
+
+    assert render_cache.prune() == (1, 3)
+    assert render_cache.get("b") == "new"
+
+
+def test_clear(tmp_path):
+    render_cache = RenderCache(str(tmp_path))
+    render_cache.put("a", "")
+    render_cache.put("b", "content")
+
+    assert render_cache.clear() == 2
+    assert render_cache.info()["entries"] == 0
+
+
+def test_missing_directory(tmp_path):
+    render_cache = RenderCache(str(tmp_path / "missing"))
+
+    assert render_cache.info()["entries"] == 0
+    assert render_cache.prune() == (0, 0)
+
+
+def test_get_render_cache(tmp_path, monkeypatch):
+    monkeypatch.delenv("YACFG_RENDER_CACHE", raising=False)
+    assert get_render_cache() is None
+
+    monkeypatch.setenv("YACFG_RENDER_CACHE", str(tmp_path))
+    monkeypatch.setenv("YACFG_RENDER_CACHE_MAX_SIZE", "2M")
+    monkeypatch.setenv("YACFG_RENDER_CACHE_MAX_AGE", "1d")
+    render_cache = get_render_cache()
+    assert render_cache.directory == str(tmp_path)
+    assert render_cache.max_size == 2 * 1024**2
+    assert render_cache.max_age == 86400
+
+    set_render_cache_dir(str(tmp_path / "selected"))
+    try:
+        assert get_render_cache().directory == str(tmp_path / "selected")
+    finally:
+        set_render_cache_dir(None)
+
+
+@pytest.mark.parametrize(
+    "value, expected", [("100", 100), ("4k", 4096), ("1GiB", 1024**3)]
+)
+def test_parse_size(value, expected):
+    assert parse_size(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [("30", 30), ("2h", 7200), ("1w", 604800)])
+def test_parse_age(value, expected):
+    assert parse_age(value) == expected
+
+
+def test_parse_invalid():
+    with pytest.raises(ValueError):
+        parse_size("big")
+    with pytest.raises(ValueError):
+        parse_age("-1d")
@@ -0,0 +1,145 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import mock
+
+from yacfg.config_data import GenerateOptions, RenderOptions
+from yacfg.exceptions import GenerationError
+from yacfg.render_cache import set_render_cache_dir
+from yacfg.server import encode_params, generation_environment, handle_request
+from yacfg.templates import set_bytecode_cache_dir
+
+
+def generate_request(params):
+    return {"method": "generate", "params": params, "env": generation_environment()}
+
+
+@mock.patch("yacfg.server.serve_generate", return_value={"a.xml": "data"})
+def test_generate(serve_generate_mock):
+    response = handle_request(
+        generate_request(
+            {"profile": "/profiles/p.yaml", "render_options": [True, False]}
+        )
+    )
+
+    assert response == {"result": {"a.xml": "data"}}
+    serve_generate_mock.assert_called_once_with(
+        profile="/profiles/p.yaml", render_options=RenderOptions(True, False)
+    )
+
+
+@mock.patch("yacfg.server.serve_generate", return_value={})
+def test_generate_options(serve_generate_mock):
+    generate_options = GenerateOptions(jobs=2, incremental=True)
+    params = {"profile": "/p.yaml", "generate_options": list(generate_options)}
+
+    handle_request(generate_request(json.loads(json.dumps(params))))
+
+    serve_generate_mock.assert_called_once_with(
+        profile="/p.yaml", generate_options=generate_options
+    )
+
+
+@mock.patch("yacfg.server.serve_generate", side_effect=GenerationError("failed"))
+def test_generate_error(*_):
+    response = handle_request(generate_request({"profile": "p.yaml"}))
+
+    assert response == {"error": {"type": "GenerationError", "message": "failed"}}
+
+
+@mock.patch("yacfg.server.serve_generate")
+def test_unknown_parameter(serve_generate_mock):
+    response = handle_request(generate_request({"profile": "p.yaml", "bogus": 1}))
+
+    assert response["error"]["type"] == "ServerError"
+    serve_generate_mock.assert_not_called()
+
+
+@mock.patch("yacfg.server.serve_generate")
+def test_environment_mismatch(serve_generate_mock, monkeypatch):
+    request = generate_request({"profile": "p.yaml"})
+    monkeypatch.setenv("YACFG_PROFILES", "/other/profiles")
+
+    response = handle_request(request)
+
+    assert response["error"]["type"] == "ServerError"
+    serve_generate_mock.assert_not_called()
+
+
+@mock.patch("yacfg.server.serve_generate")
+def test_cache_mismatch(serve_generate_mock, tmp_path):
+    set_render_cache_dir(str(tmp_path / "client"))
+    try:
+        request = generate_request({"profile": "p.yaml"})
+    finally:
+        set_render_cache_dir(None)
+
+    response = handle_request(request)
+
+    assert response["error"]["type"] == "ServerError"
+    serve_generate_mock.assert_not_called()
+
+
+def test_cache_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("YACFG_BYTECODE_CACHE", "bytecode")
+    monkeypatch.chdir(tmp_path)
+    set_bytecode_cache_dir(str(tmp_path / "selected"))
+    try:
+        environment = generation_environment()
+    finally:
+        set_bytecode_cache_dir(None)
+
+    assert environment["YACFG_BYTECODE_CACHE"] == str(tmp_path / "selected")
+    assert generation_environment()["YACFG_BYTECODE_CACHE"] == str(
+        tmp_path / "bytecode"
+    )
+
+
+def test_unknown_method():
+    response = handle_request({"method": "bogus"})
+
+    assert response["error"]["type"] == "ServerError"
+
+
+def test_ping():
+    assert "version" in handle_request({"method": "ping"})["result"]
+
+
+def write_profile_and_template(path, value):
+    (path / "profiles").mkdir()
+    (path / "profiles" / "profile.yaml").write_text(f"value: {value}\n")
+    (path / "templates" / "set").mkdir(parents=True)
+    (path / "templates" / "set" / "_template").write_text("")
+    (path / "templates" / "set" / "a.conf.jinja2").write_text("{{ value }}")
+
+
+def test_client_directory(tmp_path, monkeypatch):
+    client_path = tmp_path / "client"
+    server_path = tmp_path / "server"
+    for path in [client_path, server_path]:
+        path.mkdir()
+        write_profile_and_template(path, path.name)
+
+    # resolved in the ./profiles/ and ./templates/ of the client
+    monkeypatch.chdir(client_path)
+    request = generate_request(
+        encode_params({"profile": "profile.yaml", "template": "set"})
+    )
+
+    monkeypatch.chdir(server_path)
+    response = handle_request(request)
+
+    assert response == {"result": {"a.conf": "client"}}
@@ -0,0 +1,117 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import stat
+import threading
+
+import mock
+import pytest
+
+from yacfg.exceptions import ProfileError, ServerError
+from yacfg.server import RenderClient, RenderServer, generate_with_server
+
+
+@pytest.fixture
+def server_socket(tmp_path):
+    socket_path = str(tmp_path / "yacfg.sock")
+    server = RenderServer(socket_path)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+    thread.start()
+    yield socket_path
+    server.shutdown()
+    thread.join()
+    server.server_close()
+    assert not os.path.exists(socket_path)
+
+
+@mock.patch("yacfg.server.serve_generate", return_value={"a.xml": "data"})
+def test_generate(serve_generate_mock, server_socket, tmp_path, monkeypatch):
+    tuning_file = tmp_path / "tune.yaml"
+    tuning_file.write_text("a: 1\n")
+    profile_file = tmp_path / "profile.yaml"
+    profile_file.write_text("a: 1\n")
+    monkeypatch.chdir(tmp_path)
+
+    client = RenderClient(server_socket)
+    result = client.generate(
+        profile="profile.yaml",
+        tuning_files_list=["tune.yaml"],
+        output_path="out",
+    )
+
+    assert result == {"a.xml": "data"}
+    # paths relative to the client are sent absolute
+    serve_generate_mock.assert_called_once_with(
+        profile=str(profile_file),
+        tuning_files_list=[str(tuning_file)],
+        output_path=str(tmp_path / "out"),
+    )
+
+
+@mock.patch("yacfg.server.serve_generate", side_effect=ProfileError("bad profile"))
+def test_generate_error(_, server_socket, tmp_path, monkeypatch):
+    (tmp_path / "profile.yaml").write_text("a: 1\n")
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(ProfileError, match="bad profile"):
+        RenderClient(server_socket).generate(profile="profile.yaml")
+
+
+def test_socket_permissions(server_socket):
+    assert stat.S_IMODE(os.stat(server_socket).st_mode) == 0o600
+
+
+def test_ping(server_socket):
+    assert RenderClient(server_socket).request({"method": "ping"})["pid"] == (
+        os.getpid()
+    )
+
+
+def test_server_running(server_socket):
+    with pytest.raises(ServerError):
+        RenderServer(server_socket)
+
+
+def test_not_available(tmp_path, monkeypatch):
+    (tmp_path / "profile.yaml").write_text("a: 1\n")
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(ServerError):
+        RenderClient(str(tmp_path / "missing.sock")).generate(profile="profile.yaml")
+
+
+@mock.patch("yacfg.yacfg.generate", return_value={"a.xml": "local"})
+def test_fallback(generate_mock, tmp_path, monkeypatch):
+    (tmp_path / "profile.yaml").write_text("a: 1\n")
+    monkeypatch.chdir(tmp_path)
+
+    result = generate_with_server(
+        socket_path=str(tmp_path / "missing.sock"), profile="profile.yaml"
+    )
+
+    assert result == {"a.xml": "local"}
+    generate_mock.assert_called_once_with(profile="profile.yaml")
+
+
+@mock.patch("yacfg.server.serve_generate", return_value={"a.xml": "served"})
+@mock.patch("yacfg.yacfg.generate")
+def test_with_server(generate_mock, _, server_socket, tmp_path, monkeypatch):
+    (tmp_path / "profile.yaml").write_text("a: 1\n")
+    monkeypatch.chdir(tmp_path)
+
+    result = generate_with_server(socket_path=server_socket, profile="profile.yaml")
+
+    assert result == {"a.xml": "served"}
+    generate_mock.assert_not_called()
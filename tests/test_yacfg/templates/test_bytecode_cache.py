@@ -0,0 +1,75 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import mock
+from jinja2 import FileSystemBytecodeCache
+
+import yacfg.templates
+from yacfg.templates import (
+    BYTECODE_CACHE_ENV,
+    get_environment,
+    get_environment_options,
+)
+
+
+def test_disabled(monkeypatch):
+    monkeypatch.delenv(BYTECODE_CACHE_ENV, raising=False)
+    assert get_environment_options() == {}
+
+
+def test_env_variable(monkeypatch, tmp_path):
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv(BYTECODE_CACHE_ENV, str(cache_dir))
+
+    options = get_environment_options()
+
+    assert isinstance(options["bytecode_cache"], FileSystemBytecodeCache)
+    assert cache_dir.is_dir()
+    # the same cache object keeps the environment cache key stable
+    assert get_environment_options() == options
+
+
+@mock.patch("yacfg.templates._bytecode_cache_dir", None)
+def test_user_dir_precedence(monkeypatch, tmp_path):
+    monkeypatch.setenv(BYTECODE_CACHE_ENV, str(tmp_path / "env"))
+    yacfg.templates.set_bytecode_cache_dir(str(tmp_path / "user"))
+
+    assert yacfg.templates.get_bytecode_cache_dir() == str(tmp_path / "user")
+
+
+def test_compiled_once(monkeypatch, tmp_path):
+    template_dir = tmp_path / "templates"
+    template_dir.mkdir()
+    (template_dir / "a.jinja2").write_text("{{ value }}")
+    monkeypatch.setenv(BYTECODE_CACHE_ENV, str(tmp_path / "cache"))
+    search_path = (str(template_dir),)
+
+    env = get_environment(search_path, **get_environment_options())
+    assert env.get_template("a.jinja2").render(value=1) == "1"
+    assert len(os.listdir(tmp_path / "cache")) == 1
+
+    # fresh environment (e.g. another process) loads bytecode from the cache
+    yacfg.templates.clear_environment_cache()
+    env = get_environment(search_path, **get_environment_options())
+    with mock.patch.object(env, "compile", wraps=env.compile) as compile_:
+        assert env.get_template("a.jinja2").render(value=2) == "2"
+    compile_.assert_not_called()
+
+    # changed source is detected via its checksum
+    yacfg.templates.clear_environment_cache()
+    (template_dir / "a.jinja2").write_text("{{ value }}!")
+    env = get_environment(search_path, **get_environment_options())
+    assert env.get_template("a.jinja2").render(value=3) == "3!"
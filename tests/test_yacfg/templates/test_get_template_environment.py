@@ -29,7 +29,7 @@ from ..files.fakes import fake_templates_paths
 @mock.patch("yacfg.templates.Environment", mock.Mock())
 def test_true(*_):
     template_name = "template/1.0.0"
-    expected_env = "template environment"
+    expected_env = mock.Mock()
     expected_template_path = fake_templates_paths()[0]
     expected_selected_templates = fake_select_template_dir(template_name)
 
@@ -75,3 +75,23 @@ def test_jinja_environment_exception(*_):
     # jinja2 also have a TemplateError exception
     with pytest.raises(yacfg.exceptions.TemplateError):
         get_template_environment(template_name)
+
+
+@mock.patch("yacfg.templates.get_templates_paths", side_effect=fake_templates_paths)
+@mock.patch("yacfg.templates.select_template_dir", side_effect=fake_select_template_dir)
+@mock.patch("yacfg.templates.FileSystemLoader", mock.Mock())
+@mock.patch("yacfg.templates.Environment", mock.Mock())
+def test_cached(*_):
+    yacfg.templates.Environment.side_effect = lambda **_: mock.Mock()
+
+    env_a = get_template_environment("template/1.0.0")
+    env_b = get_template_environment("template/2.0.0")
+
+    assert get_template_environment("template/1.0.0") is env_a
+    assert env_a is not env_b
+    # noinspection PyUnresolvedReferences
+    assert yacfg.templates.Environment.call_count == 2
+
+    yacfg.templates.clear_environment_cache()
+
+    assert get_template_environment("template/1.0.0") is not env_a
@@ -0,0 +1,46 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from yacfg.templates import EXTRA_PROPERTIES, get_environment
+
+
+def render(source, extra_properties_data=None, **data):
+    env = get_environment(("/nonexistent",))
+    token = EXTRA_PROPERTIES.set(extra_properties_data)
+    try:
+        return env.from_string(source).render(data)
+    finally:
+        EXTRA_PROPERTIES.reset(token)
+
+
+def test_override(*_):
+    source = "{{ value | overridevalue('uuid') }}"
+    assert render(source, {"uuid": "OFF"}, value=False) == "OFF"
+    assert render(source, {"other": "OFF"}, value=False) == "False"
+
+
+def test_not_leaking(*_):
+    source = "{{ value | overridevalue('uuid') }}"
+    assert render(source, {"uuid": ""}, value="x") == ""
+    # same cached environment, no extra properties for this render
+    assert render(source, value="x") == "x"
+
+
+def test_list_map_keys(*_):
+    source = (
+        "{% for m in value | overridevalue_listmapkeys %}{{ m | list }}{% endfor %}"
+    )
+    value = [{"a": 1, "b": 2}]
+    assert render(source, {"a": "x"}, value=value) == "['x', 'b']"
+    assert render(source, value=value) == "['a', 'b']"
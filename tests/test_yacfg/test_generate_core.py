@@ -12,8 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import logging
+
 import mock
 import pytest
+import yaml
 
 import yacfg.yacfg
 from yacfg.exceptions import TemplateError
@@ -181,6 +184,40 @@ def test_true_output_path_write_profile(*_):
     yacfg.yacfg.generate_outputs.assert_called()
 
 
+@mock.patch(
+    "yacfg.yacfg.get_template_environment", side_effect=fake_template_environment
+)
+@mock.patch("yacfg.yacfg.get_main_template_list", mock.Mock())
+@mock.patch("yacfg.yacfg.filter_template_list", mock.Mock())
+@mock.patch("yacfg.yacfg.ensure_output_path", mock.Mock())
+@mock.patch("yacfg.yacfg.write_output", mock.Mock())
+@mock.patch("yacfg.yacfg.generate_outputs", mock.Mock())
+def test_true_output_path_write_python_profile(*_):
+    template = "template/1.0.0"
+    output_path = "/out/directory"
+
+    # python profiles provide config data without tuned profile YAML
+    config_data, _ = fake_load_tuned_profile_no_defaults()
+    expected_profile_data = yaml.dump(config_data, default_flow_style=False)
+
+    generate_core(
+        config_data=config_data,
+        tuned_profile=None,
+        template=template,
+        output_path=output_path,
+        write_profile_data=True,
+    )
+
+    # noinspection PyUnresolvedReferences
+    yacfg.yacfg.ensure_output_path.assert_called_with(output_path)
+    # noinspection PyUnresolvedReferences
+    yacfg.yacfg.write_output.assert_called_once()
+    # noinspection PyUnresolvedReferences
+    name, path, data = yacfg.yacfg.write_output.call_args[0]
+    assert (name, path) == ("profile_data.yaml", output_path)
+    assert yaml.safe_load(data) == yaml.safe_load(expected_profile_data)
+
+
 @mock.patch(
     "yacfg.yacfg.get_template_environment", side_effect=fake_template_environment
 )
@@ -312,3 +349,29 @@ def test_no_template_exception(*_):
     yacfg.yacfg.write_output.assert_not_called()
     # noinspection PyUnresolvedReferences
     yacfg.yacfg.generate_outputs.assert_not_called()
+
+
+@mock.patch("yacfg.yacfg.add_template_metadata", mock.Mock())
+@mock.patch("yacfg.yacfg.add_render_config", mock.Mock())
+@mock.patch(
+    "yacfg.yacfg.get_template_environment",
+    mock.Mock(side_effect=fake_template_environment),
+)
+@mock.patch("yacfg.yacfg.get_main_template_list", mock.Mock())
+@mock.patch("yacfg.yacfg.generate_outputs", mock.Mock())
+@mock.patch("yaml.dump", mock.Mock(return_value="dumped"))
+def test_config_data_dump_lazy(caplog):
+    config_data, _ = fake_load_tuned_profile_no_defaults()
+
+    with caplog.at_level(logging.INFO):
+        generate_core(config_data=config_data, template="template/1.0.0")
+
+    # noinspection PyUnresolvedReferences
+    yacfg.yacfg.yaml.dump.assert_not_called()
+
+    with caplog.at_level(logging.DEBUG):
+        generate_core(config_data=config_data, template="template/1.0.0")
+
+    assert "Config data:\n dumped" in caplog.text
+    # noinspection PyUnresolvedReferences
+    yacfg.yacfg.yaml.dump.assert_called_once_with(config_data, default_flow_style=False)
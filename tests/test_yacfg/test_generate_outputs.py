@@ -12,12 +12,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+
 import jinja2
 import mock
 import pytest
 
 import yacfg.yacfg
+from yacfg.config_data import (
+    GenerateOptions,
+    add_template_metadata,
+    get_metadata_timestamp,
+)
 from yacfg.exceptions import GenerationError
+from yacfg.timings import collect
 from yacfg.yacfg import generate_outputs
 
 
@@ -48,7 +56,7 @@ def test_one_true_no_output(*_):
     yacfg.yacfg.write_output.assert_not_called()
 
 
-@mock.patch("yacfg.yacfg.write_output", mock.Mock())
+@mock.patch("yacfg.yacfg.OutputWriter", mock.Mock())
 def test_one_true_output(*_):
     config_data = {}
     output_file = "broker.xml"
@@ -77,9 +85,10 @@ def test_one_true_output(*_):
     env.get_template.assert_called_with("broker.xml.jinja2")
     template.render.assert_called()
     # noinspection PyUnresolvedReferences
-    yacfg.yacfg.write_output.assert_called_with(
-        output_file, output_path, expected_output_data
-    )
+    yacfg.yacfg.OutputWriter.assert_called_with(output_path, fsync="none", staged=False)
+    writer = yacfg.yacfg.OutputWriter.return_value
+    writer.write.assert_called_with(output_file, expected_output_data)
+    writer.commit.assert_called_once()
 
 
 @mock.patch("yacfg.yacfg.write_output", mock.Mock())
@@ -135,3 +144,424 @@ def test_one_exception_template(*_):
     env.get_template.assert_called_with("broker.xml.jinja2")
     # noinspection PyUnresolvedReferences
     yacfg.yacfg.write_output.assert_not_called()
+
+
+@mock.patch("yacfg.yacfg.OutputWriter", mock.Mock())
+def test_jobs_order_and_metadata(*_):
+    config_data = {"metadata": {"tool_name": "yacfg"}}
+    output_path = "/output/directory"
+    template_list = ["a.xml.jinja2", "b.xml.jinja2", "c.xml.jinja2"]
+
+    env = jinja2.Environment(
+        loader=jinja2.DictLoader(
+            {name: "{{ metadata.out_filename }}" for name in template_list}
+        )
+    )
+
+    # noinspection PyTypeChecker
+    result = generate_outputs(
+        config_data=config_data,
+        template_list=template_list,
+        env=env,
+        output_path=output_path,
+        generate_options=GenerateOptions(jobs=3),
+    )
+
+    assert list(result) == ["a.xml", "b.xml", "c.xml"]
+    assert result["b.xml"] == "b.xml.jinja2"
+    # shared config data is not modified
+    assert config_data == {"metadata": {"tool_name": "yacfg"}}
+    # noinspection PyUnresolvedReferences
+    yacfg.yacfg.OutputWriter.return_value.write.assert_has_calls(
+        [
+            mock.call("a.xml", "a.xml.jinja2"),
+            mock.call("b.xml", "b.xml.jinja2"),
+            mock.call("c.xml", "c.xml.jinja2"),
+        ]
+    )
+
+
+@mock.patch("yacfg.yacfg.OutputWriter", mock.Mock())
+def test_jobs_exception_render(*_):
+    template_list = ["a.xml.jinja2", "b.xml.jinja2", "c.xml.jinja2"]
+    env = jinja2.Environment(
+        loader=jinja2.DictLoader(
+            {
+                "a.xml.jinja2": "a",
+                "b.xml.jinja2": "{{ missing.value }}",
+                "c.xml.jinja2": "c",
+            }
+        ),
+        undefined=jinja2.StrictUndefined,
+    )
+
+    with pytest.raises(GenerationError, match="b.xml"):
+        # noinspection PyTypeChecker
+        generate_outputs(
+            config_data={},
+            template_list=template_list,
+            env=env,
+            output_path="/output/directory",
+            generate_options=GenerateOptions(jobs=2),
+        )
+
+    # other outputs are still written
+    # noinspection PyUnresolvedReferences
+    writer = yacfg.yacfg.OutputWriter.return_value
+    assert writer.write.call_count == 2
+    writer.commit.assert_not_called()
+    writer.abort.assert_called_once()
+
+
+def test_jobs_process(tmp_path):
+    template_list = ["a.xml.jinja2", "b.xml.jinja2"]
+    for name in template_list:
+        (tmp_path / name).write_text("{{ metadata.out_filename }} {{ value }}")
+    env = yacfg.yacfg.get_environment((str(tmp_path),))
+
+    result = generate_outputs(
+        config_data={"value": 1},
+        template_list=template_list,
+        env=env,
+        generate_options=GenerateOptions(jobs=2, jobs_mode="process"),
+    )
+
+    assert result == {"a.xml": "a.xml.jinja2 1", "b.xml": "b.xml.jinja2 1"}
+
+
+def test_jobs_unknown_mode(*_):
+    with pytest.raises(GenerationError):
+        # noinspection PyTypeChecker
+        generate_outputs(
+            config_data={},
+            template_list=["a.xml.jinja2"],
+            env=mock.Mock(),
+            generate_options=GenerateOptions(jobs=2, jobs_mode="fiber"),
+        )
+
+
+def test_jobs_extra_properties(*_):
+    template_list = ["a.xml.jinja2", "b.xml.jinja2"]
+    env = yacfg.yacfg.get_environment(("/nonexistent",))
+    env = env.overlay(
+        loader=jinja2.DictLoader(
+            {name: "{{ 'x' | overridevalue('key') }}" for name in template_list}
+        )
+    )
+
+    token = yacfg.yacfg.EXTRA_PROPERTIES.set({"key": "y"})
+    try:
+        # noinspection PyTypeChecker
+        result = generate_outputs(
+            config_data={},
+            template_list=template_list,
+            env=env,
+            generate_options=GenerateOptions(jobs=2),
+        )
+    finally:
+        yacfg.yacfg.EXTRA_PROPERTIES.reset(token)
+
+    assert result == {"a.xml": "y", "b.xml": "y"}
+
+
+def incremental_env():
+    return jinja2.Environment(
+        loader=jinja2.DictLoader(
+            {
+                "a.conf.jinja2": "{% include 'common.jinja2' %}a={{ a }}",
+                "b.conf.jinja2": "b={{ b }}",
+                "common.jinja2": "common;",
+            }
+        )
+    )
+
+
+def test_incremental(tmp_path, monkeypatch):
+    monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+    env = incremental_env()
+    template_list = ["a.conf.jinja2", "b.conf.jinja2"]
+    config_data = {"a": 1, "b": 2, "metadata": {"datetime": {"unix": 1}}}
+    expected_result = {"a.conf": "common;a=1", "b.conf": "b=2"}
+
+    result = generate_outputs(
+        config_data,
+        template_list,
+        env,
+        str(tmp_path),
+        generate_options=GenerateOptions(incremental=True),
+    )
+    assert result == expected_result
+    assert (tmp_path / ".yacfg-manifest.json").is_file()
+
+    # generation time does not matter
+    config_data["metadata"]["datetime"]["unix"] = 2
+    with mock.patch("yacfg.yacfg.render_template") as render_template:
+        with mock.patch("yacfg.yacfg.write_output") as write_output:
+            result = generate_outputs(
+                config_data,
+                template_list,
+                env,
+                str(tmp_path),
+                generate_options=GenerateOptions(incremental=True),
+            )
+    assert result == expected_result
+    render_template.assert_not_called()
+    write_output.assert_not_called()
+
+
+def test_incremental_pinned_time(tmp_path, monkeypatch):
+    env = jinja2.Environment(
+        loader=jinja2.DictLoader({"a.conf.jinja2": "{{ metadata.datetime.unix }}"})
+    )
+
+    for epoch in ["1000", "2000000000", "1000"]:
+        monkeypatch.setenv("SOURCE_DATE_EPOCH", epoch)
+        config_data = {}
+        add_template_metadata(config_data, get_metadata_timestamp())
+        result = generate_outputs(
+            config_data,
+            ["a.conf.jinja2"],
+            env,
+            str(tmp_path),
+            generate_options=GenerateOptions(incremental=True),
+        )
+        assert result == {"a.conf": epoch}
+        assert (tmp_path / "a.conf").read_text() == epoch
+
+
+def test_incremental_changed(tmp_path):
+    env = incremental_env()
+    template_list = ["a.conf.jinja2", "b.conf.jinja2"]
+    generate_outputs(
+        {"a": 1, "b": 2},
+        template_list,
+        env,
+        str(tmp_path),
+        generate_options=GenerateOptions(incremental=True),
+    )
+
+    # included template changed
+    env.loader.mapping["common.jinja2"] = "changed;"
+    b_inode = os.stat(tmp_path / "b.conf").st_ino
+    result = generate_outputs(
+        {"a": 1, "b": 2},
+        template_list,
+        env,
+        str(tmp_path),
+        generate_options=GenerateOptions(incremental=True),
+    )
+    assert result == {"a.conf": "changed;a=1", "b.conf": "b=2"}
+    assert (tmp_path / "a.conf").read_text() == "changed;a=1"
+    # not replaced
+    assert os.stat(tmp_path / "b.conf").st_ino == b_inode
+
+    # output modified since the generation
+    (tmp_path / "b.conf").write_text("edited")
+    result = generate_outputs(
+        {"a": 1, "b": 2},
+        template_list,
+        env,
+        str(tmp_path),
+        generate_options=GenerateOptions(incremental=True),
+    )
+    assert (tmp_path / "b.conf").read_text() == "b=2"
+
+
+def test_incremental_render_error(tmp_path):
+    env = incremental_env()
+    template_list = ["b.conf.jinja2"]
+    env.loader.mapping["b.conf.jinja2"] = "{{ b.missing.value }}"
+
+    with pytest.raises(GenerationError):
+        generate_outputs(
+            {"b": {}},
+            template_list,
+            env,
+            str(tmp_path),
+            generate_options=GenerateOptions(incremental=True),
+        )
+
+    env.loader.mapping["b.conf.jinja2"] = "b={{ b }}"
+    result = generate_outputs(
+        {"b": 2},
+        template_list,
+        env,
+        str(tmp_path),
+        generate_options=GenerateOptions(incremental=True),
+    )
+    assert result == {"b.conf": "b=2"}
+
+
+def test_staged_output_render_error(tmp_path):
+    env = incremental_env()
+    template_list = ["a.conf.jinja2", "b.conf.jinja2"]
+    generate_outputs({"a": 1, "b": 2}, template_list, env, str(tmp_path))
+
+    env.loader.mapping["b.conf.jinja2"] = "{{ b.missing.value }}"
+    with pytest.raises(GenerationError):
+        generate_outputs(
+            {"a": 3, "b": {}},
+            template_list,
+            env,
+            str(tmp_path),
+            generate_options=GenerateOptions(staged_output=True),
+        )
+    # nothing replaced
+    assert (tmp_path / "a.conf").read_text() == "common;a=1"
+    assert (tmp_path / "b.conf").read_text() == "b=2"
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_stream(tmp_path, jobs):
+    env = incremental_env()
+    template_list = ["a.conf.jinja2", "b.conf.jinja2"]
+
+    result = generate_outputs(
+        {"a": 1, "b": 2},
+        template_list,
+        env,
+        str(tmp_path),
+        generate_options=GenerateOptions(jobs=jobs, stream=True),
+    )
+
+    assert result == {"a.conf": "common;a=1", "b.conf": "b=2"}
+    assert (tmp_path / "a.conf").read_text() == "common;a=1"
+    assert (tmp_path / "b.conf").read_text() == "b=2"
+
+
+def test_stream_not_retained(tmp_path):
+    env = incremental_env()
+    template_list = ["a.conf.jinja2", "b.conf.jinja2"]
+
+    result = generate_outputs(
+        {"a": 1, "b": 2},
+        template_list,
+        env,
+        str(tmp_path),
+        generate_options=GenerateOptions(stream=True, retain_output=False),
+    )
+
+    assert result == {}
+    assert (tmp_path / "a.conf").read_text() == "common;a=1"
+    assert (tmp_path / "b.conf").read_text() == "b=2"
+
+
+def test_stream_incremental(tmp_path):
+    env = incremental_env()
+    template_list = ["a.conf.jinja2", "b.conf.jinja2"]
+    generate_outputs(
+        {"a": 1, "b": 2},
+        template_list,
+        env,
+        str(tmp_path),
+        generate_options=GenerateOptions(incremental=True, stream=True),
+    )
+
+    with mock.patch("yacfg.yacfg.stream_template") as stream_template:
+        result = generate_outputs(
+            {"a": 1, "b": 2},
+            template_list,
+            env,
+            str(tmp_path),
+            generate_options=GenerateOptions(incremental=True, stream=True),
+        )
+    stream_template.assert_not_called()
+    assert result == {"a.conf": "common;a=1", "b.conf": "b=2"}
+
+
+def test_stream_render_error(tmp_path):
+    env = incremental_env()
+    template_list = ["b.conf.jinja2"]
+    generate_outputs({"b": 2}, template_list, env, str(tmp_path))
+
+    env.loader.mapping["b.conf.jinja2"] = "b=\n{{ b.missing.value }}"
+    with pytest.raises(GenerationError):
+        generate_outputs(
+            {"b": {}},
+            template_list,
+            env,
+            str(tmp_path),
+            generate_options=GenerateOptions(stream=True),
+        )
+    assert (tmp_path / "b.conf").read_text() == "b=2"
+    assert os.listdir(tmp_path) == ["b.conf"]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_timings(tmp_path, jobs):
+    env = incremental_env()
+    template_list = ["a.conf.jinja2", "b.conf.jinja2"]
+
+    with collect() as timings:
+        generate_outputs(
+            {"a": 1, "b": 2},
+            template_list,
+            env,
+            str(tmp_path),
+            generate_options=GenerateOptions(jobs=jobs),
+        )
+
+    data = timings.as_dict()
+    assert sorted(data["templates"]) == template_list
+    assert data["stages"]["render"]["count"] == 2
+    # two outputs and the commit
+    assert data["stages"]["write"]["count"] == 3
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_render_cache(tmp_path, monkeypatch, stream):
+    monkeypatch.setenv("YACFG_RENDER_CACHE", str(tmp_path / "cache"))
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1000")
+    env = incremental_env()
+    template_list = ["a.conf.jinja2", "b.conf.jinja2"]
+    expected_result = {"a.conf": "common;a=1", "b.conf": "b=2"}
+    generate_outputs({"a": 1, "b": 2}, template_list, env)
+
+    output_path = tmp_path / "output"
+    output_path.mkdir()
+    with mock.patch("yacfg.yacfg.render_template") as render_template:
+        with mock.patch("yacfg.yacfg.stream_template") as stream_template:
+            result = generate_outputs(
+                {"a": 1, "b": 2},
+                template_list,
+                env,
+                str(output_path),
+                generate_options=GenerateOptions(stream=stream),
+            )
+    render_template.assert_not_called()
+    stream_template.assert_not_called()
+    assert result == expected_result
+    assert (output_path / "a.conf").read_text() == "common;a=1"
+
+    # included template changed
+    env.loader.mapping["common.jinja2"] = "changed;"
+    result = generate_outputs({"a": 1, "b": 2}, template_list, env)
+    assert result == {"a.conf": "changed;a=1", "b.conf": "b=2"}
+
+
+def test_render_cache_pinned_time(tmp_path, monkeypatch):
+    monkeypatch.setenv("YACFG_RENDER_CACHE", str(tmp_path / "cache"))
+    env = jinja2.Environment(
+        loader=jinja2.DictLoader({"a.conf.jinja2": "{{ metadata.datetime.unix }}"})
+    )
+
+    for epoch in ["1000", "2000000000", "1000"]:
+        monkeypatch.setenv("SOURCE_DATE_EPOCH", epoch)
+        config_data = {}
+        add_template_metadata(config_data, get_metadata_timestamp())
+        result = generate_outputs(config_data, ["a.conf.jinja2"], env)
+        assert result == {"a.conf": epoch}
+
+
+def test_render_cache_time_not_pinned(tmp_path, monkeypatch):
+    monkeypatch.setenv("YACFG_RENDER_CACHE", str(tmp_path / "cache"))
+    monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+    env = incremental_env()
+    generate_outputs({"a": 1, "b": 2}, ["a.conf.jinja2"], env)
+
+    with mock.patch(
+        "yacfg.yacfg.render_template", side_effect=yacfg.yacfg.render_template
+    ) as render:
+        generate_outputs({"a": 1, "b": 2}, ["a.conf.jinja2"], env)
+    render.assert_called_once()
+    assert not (tmp_path / "cache").exists()
@@ -0,0 +1,61 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from yacfg.timings import (
+    STAGE_RENDER,
+    STAGE_WRITE,
+    TIMINGS,
+    Timings,
+    collect,
+    stage,
+    template_render,
+)
+
+
+def test_collect():
+    with collect() as timings:
+        with stage(STAGE_WRITE):
+            pass
+        with stage(STAGE_WRITE):
+            pass
+        with template_render("a.xml.jinja2"):
+            pass
+    assert TIMINGS.get() is None
+
+    data = timings.as_dict()
+    assert list(data["stages"]) == [STAGE_RENDER, STAGE_WRITE]
+    assert data["stages"][STAGE_WRITE]["count"] == 2
+    assert data["stages"][STAGE_RENDER]["count"] == 1
+    assert list(data["templates"]) == ["a.xml.jinja2"]
+    assert data["templates"]["a.xml.jinja2"]["wall"] >= 0
+    assert "a.xml.jinja2" in timings.format()
+
+
+def test_not_collecting():
+    with stage(STAGE_WRITE):
+        pass
+    assert TIMINGS.get() is None
+
+
+def test_merge():
+    worker = Timings()
+    worker.add_template("a.xml.jinja2", 1.0, 0.5)
+
+    timings = Timings()
+    timings.add_template("a.xml.jinja2", 2.0, 1.0)
+    timings.merge(worker.as_dict())
+
+    data = timings.as_dict()
+    assert data["templates"]["a.xml.jinja2"] == {"wall": 3.0, "cpu": 1.5, "count": 2}
+    assert data["stages"][STAGE_RENDER] == {"wall": 3.0, "cpu": 1.5, "count": 2}
@@ -0,0 +1,123 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import mock
+
+from yacfg.tree_index import refresh_tree, scan_dir
+
+OLD_TIME = 1500000000
+
+
+def make_tree(root):
+    for path in ("a/b", "c"):
+        os.makedirs(os.path.join(root, path))
+    for path in ("top.yaml", "a/a.yaml", "a/b/b.yaml", "c/c.yaml"):
+        with open(os.path.join(root, path), "w"):
+            pass
+    age_tree(root)
+
+
+def age_tree(root):
+    for path, _, _ in os.walk(root):
+        os.utime(path, (OLD_TIME, OLD_TIME))
+
+
+def test_true(tmp_path):
+    make_tree(str(tmp_path))
+
+    dirs, changed = refresh_tree(str(tmp_path), {})
+
+    assert changed
+    assert sorted(dirs) == ["", "a", os.path.join("a", "b"), "c"]
+    assert dirs[""]["dirs"] == ["a", "c"]
+    assert dirs[""]["files"] == ["top.yaml"]
+    assert dirs[os.path.join("a", "b")]["files"] == ["b.yaml"]
+
+
+def test_unchanged(tmp_path):
+    make_tree(str(tmp_path))
+    dirs, _ = refresh_tree(str(tmp_path), {})
+
+    with mock.patch("yacfg.tree_index.scan_dir", wraps=scan_dir) as scan:
+        result, changed = refresh_tree(str(tmp_path), dirs)
+
+    assert not changed
+    assert result == dirs
+    scan.assert_not_called()
+
+
+def test_changed_subtree(tmp_path):
+    make_tree(str(tmp_path))
+    dirs, _ = refresh_tree(str(tmp_path), {})
+
+    os.makedirs(str(tmp_path / "a" / "b" / "new"))
+    (tmp_path / "a" / "b" / "new" / "new.yaml").write_text("")
+    os.remove(str(tmp_path / "c" / "c.yaml"))
+
+    with mock.patch("yacfg.tree_index.scan_dir", wraps=scan_dir) as scan:
+        result, changed = refresh_tree(str(tmp_path), dirs)
+
+    assert changed
+    scanned = sorted(call.args[0] for call in scan.call_args_list)
+    assert scanned == [
+        str(tmp_path / "a" / "b"),
+        str(tmp_path / "a" / "b" / "new"),
+        str(tmp_path / "c"),
+    ]
+    assert result[os.path.join("a", "b", "new")]["files"] == ["new.yaml"]
+    assert result["c"]["files"] == []
+
+
+def test_removed_dir(tmp_path):
+    make_tree(str(tmp_path))
+    dirs, _ = refresh_tree(str(tmp_path), {})
+
+    os.remove(str(tmp_path / "c" / "c.yaml"))
+    os.rmdir(str(tmp_path / "c"))
+
+    result, changed = refresh_tree(str(tmp_path), dirs)
+
+    assert changed
+    assert "c" not in result
+    assert result[""]["dirs"] == ["a"]
+
+
+def test_recent_dir_rescanned(tmp_path):
+    (tmp_path / "a.yaml").write_text("")
+    dirs, _ = refresh_tree(str(tmp_path), {})
+
+    # a change within the mtime granularity must not be missed
+    (tmp_path / "b.yaml").write_text("")
+    result, changed = refresh_tree(str(tmp_path), dirs)
+
+    assert changed
+    assert result[""]["files"] == ["a.yaml", "b.yaml"]
+
+
+def test_recent_dir_unchanged(tmp_path):
+    (tmp_path / "a.yaml").write_text("")
+    dirs, _ = refresh_tree(str(tmp_path), {})
+
+    with mock.patch("yacfg.tree_index.scan_dir", wraps=scan_dir) as scan:
+        result, changed = refresh_tree(str(tmp_path), dirs)
+
+    scan.assert_called_once_with(str(tmp_path), mock.ANY)
+    assert not changed
+    assert result == dirs
+
+
+def test_missing_root(tmp_path):
+    assert refresh_tree(str(tmp_path / "missing"), {}) == ({}, False)
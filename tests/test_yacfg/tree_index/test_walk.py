@@ -0,0 +1,100 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import mock
+
+from yacfg.tree_index import TreeIndex, scan_dir
+from .test_refresh_tree import make_tree
+
+
+def sorted_walk(top):
+    for path, dirs, files in os.walk(top):
+        dirs.sort()
+        yield path, dirs, sorted(files)
+
+
+def test_true(tmp_path, cache_dir):
+    root = str(tmp_path / "tree")
+    make_tree(root)
+    os.symlink(os.path.join(root, "a"), os.path.join(root, "link"))
+
+    result = list(TreeIndex().walk(root))
+
+    assert result == list(sorted_walk(root))
+
+
+def test_stored(tmp_path, cache_dir):
+    root = str(tmp_path / "tree")
+    make_tree(root)
+    index = TreeIndex()
+    expected = list(index.walk(root))
+
+    assert os.path.isfile(index.index_file(root))
+    assert index.index_file(root).startswith(str(cache_dir))
+
+    with mock.patch("yacfg.tree_index.scan_dir", wraps=scan_dir) as scan:
+        assert list(TreeIndex().walk(root)) == expected
+    scan.assert_not_called()
+
+
+def test_stored_once(tmp_path, cache_dir):
+    root = str(tmp_path / "tree")
+    make_tree(root)
+    # a recently modified directory is rescanned, but not stored again
+    (tmp_path / "tree" / "new.yaml").write_text("")
+    list(TreeIndex().walk(root))
+
+    with mock.patch.object(TreeIndex, "store") as store:
+        list(TreeIndex().walk(root))
+        list(TreeIndex().walk(root))
+    store.assert_not_called()
+
+
+def test_stored_changed(tmp_path, cache_dir):
+    root = str(tmp_path / "tree")
+    make_tree(root)
+    list(TreeIndex().walk(root))
+
+    os.remove(os.path.join(root, "c", "c.yaml"))
+
+    assert list(TreeIndex().walk(root)) == list(sorted_walk(root))
+    with mock.patch("yacfg.tree_index.scan_dir", wraps=scan_dir) as scan:
+        assert list(TreeIndex().walk(root)) == list(sorted_walk(root))
+    # only the changed directory, modified just now, is scanned again
+    scan.assert_called_once_with(os.path.join(root, "c"), mock.ANY)
+
+
+def test_cache_dir_not_writable(tmp_path):
+    root = str(tmp_path / "tree")
+    make_tree(root)
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")
+
+    index = TreeIndex(cache_dir=str(blocker / "cache"))
+
+    assert list(index.walk(root)) == list(sorted_walk(root))
+    assert list(index.walk(root)) == list(sorted_walk(root))
+
+
+def test_stale_index_file(tmp_path):
+    root = str(tmp_path / "tree")
+    make_tree(root)
+    index = TreeIndex(cache_dir=str(tmp_path / "cache"))
+    os.makedirs(os.path.dirname(index.index_file(root)))
+    with open(index.index_file(root), "w") as index_file:
+        index_file.write("{broken")
+
+    assert list(index.walk(root)) == list(sorted_walk(root))
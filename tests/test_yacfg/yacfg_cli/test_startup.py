@@ -0,0 +1,75 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import subprocess
+import sys
+
+import yacfg
+
+# import time itself is measured by benchmarks/bench_startup.py, these
+# tests check the modules imported by the startup
+
+# modules needed by generation actions only
+HEAVY_MODULES = ("jinja2", "yaml", "yacfg.yacfg", "yacfg.output", "yacfg.templates")
+
+
+def run_python(code, *options):
+    env = dict(os.environ)
+    src_path = os.path.dirname(os.path.dirname(yacfg.__file__))
+    env["PYTHONPATH"] = os.pathsep.join(
+        path for path in (src_path, env.get("PYTHONPATH")) if path
+    )
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        env=env,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+
+def test_version_imports():
+    result = run_python(
+        "import sys\n"
+        "from yacfg.cli.yacfg_cli import main\n"
+        "sys.argv = ['yacfg', '--version']\n"
+        "main()\n"
+        f"print([name for name in {HEAVY_MODULES!r} if name in sys.modules])\n"
+    )
+
+    version, loaded = result.stdout.splitlines()
+    assert version == yacfg.__version__
+    assert loaded == "[]"
+
+
+def test_cli_module_imports():
+    result = run_python(
+        "import sys\n"
+        "import yacfg.cli.yacfg_cli\n"
+        f"print([name for name in {HEAVY_MODULES!r} if name in sys.modules])\n"
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_version_not_looked_up_on_import():
+    result = run_python(
+        "import yacfg\n"
+        "import yacfg.config_data, yacfg.incremental, yacfg.profile_check\n"
+        "import yacfg.server\n"
+        "print('__version__' in vars(yacfg))\n"
+    )
+
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,33 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import yaml
+
+from yacfg.output import MyDumper
+from yacfg.yaml_backend import dump_yaml
+
+DATA = {"b": {"items": ["x", {"y": 1}]}, "a": "text", "c": None}
+
+
+def test_indent_sequences(*_):
+    result = dump_yaml(DATA, indent_sequences=True, default_flow_style=False)
+
+    assert result == yaml.dump(DATA, Dumper=MyDumper, default_flow_style=False)
+    assert "  items:\n    - x\n    - y: 1\n" in result
+
+
+def test_default(*_):
+    result = dump_yaml(DATA, default_flow_style=False)
+
+    assert result == yaml.safe_dump(DATA, default_flow_style=False)
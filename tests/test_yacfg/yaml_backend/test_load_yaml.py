@@ -0,0 +1,46 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+import yaml
+
+from yacfg.yaml_backend import get_backend, load_all_yaml, load_yaml
+
+DOCUMENT = """\
+anchor: &anchor
+  a: 1
+  b: [1, 2.5, 'x']
+alias: *anchor
+empty:
+bool: false
+date: 2018-01-01
+"""
+
+
+def test_true(*_):
+    assert load_yaml(DOCUMENT) == yaml.safe_load(DOCUMENT)
+
+
+def test_all(*_):
+    assert list(load_all_yaml("a: 1\n---\nb: 2\n")) == [{"a": 1}, {"b": 2}]
+
+
+def test_bad_yaml(*_):
+    with pytest.raises(yaml.YAMLError):
+        load_yaml("key: [unclosed\n")
+
+
+def test_backend(*_):
+    expected = "libyaml" if yaml.__with_libyaml__ else "python"
+    assert get_backend() == expected
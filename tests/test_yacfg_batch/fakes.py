@@ -46,3 +46,17 @@ fake_default_two.tuning_files = ["c", "d"]
 
 fake_common_two = GenerateData()
 fake_common_two.profile_name = "Profile Name 2"
+
+
+def write_fake_profile_set(path):
+    """Write a minimal profile and template set for real generation.
+
+    :return: profile file path and template set path
+    """
+    template_path = path / "template"
+    template_path.mkdir()
+    (template_path / "_template").write_text("")
+    (template_path / "service.conf.jinja2").write_text("name={{ name }}\n")
+    profile_path = path / "profile.yaml.jinja2"
+    profile_path.write_text("_defaults:\n  value: default\n\nname: {{ value }}\n")
+    return str(profile_path), str(template_path)
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+
 import mock
 
 import yacfg_batch
@@ -76,3 +78,48 @@ def test_two_files_two(*_):
 
     # noinspection PyUnresolvedReferences
     yacfg_batch.yacfg_batch.generate_all_profiles.assert_has_calls(calls)
+
+
+def fake_iter_gen_profiles_services(filename):
+    del filename
+    yield {"_common": {"profile": "Profile Name"}, "service1": {}, "service2": {}}
+
+
+@mock.patch("yacfg_batch.yacfg_batch.generate_all_profiles", mock.Mock())
+@mock.patch("yacfg_batch.yacfg_batch.run_service_jobs", mock.Mock())
+@mock.patch(
+    "yacfg_batch.yacfg_batch.iter_gen_profiles", fake_iter_gen_profiles_services
+)
+def test_two_files_jobs(*_):
+    input_files = ["a/b.yaml", "c/d.yaml"]
+    generate(input_files, "out", jobs=4)
+
+    # noinspection PyUnresolvedReferences
+    yacfg_batch.yacfg_batch.generate_all_profiles.assert_not_called()
+    # noinspection PyUnresolvedReferences
+    service_jobs, jobs, fail_fast = yacfg_batch.yacfg_batch.run_service_jobs.call_args[
+        0
+    ]
+    assert [(name, kwargs["output_path"]) for name, kwargs in service_jobs] == [
+        ("service1", os.path.join("out", "service1")),
+        ("service2", os.path.join("out", "service2")),
+        ("service1", os.path.join("out", "service1")),
+        ("service2", os.path.join("out", "service2")),
+    ]
+    assert jobs == 4
+    assert fail_fast is True
+
+
+@mock.patch("yacfg_batch.yacfg_batch.generate_all_profiles", mock.Mock())
+@mock.patch("yacfg_batch.yacfg_batch.run_service_jobs", mock.Mock())
+@mock.patch(
+    "yacfg_batch.yacfg_batch.iter_gen_profiles", fake_iter_gen_profiles_services
+)
+def test_dedup(*_):
+    generate(["a/b.yaml"], "out", dedup=True, hardlink=True)
+
+    # noinspection PyUnresolvedReferences
+    yacfg_batch.yacfg_batch.generate_all_profiles.assert_not_called()
+    # noinspection PyUnresolvedReferences
+    call_kwargs = yacfg_batch.yacfg_batch.run_service_jobs.call_args[1]
+    assert call_kwargs == {"dedup": True, "hardlink": True}
@@ -16,6 +16,7 @@ import mock
 import pytest
 import yaml
 
+import yacfg.yaml_backend
 import yacfg_batch
 from yacfg_batch.exceptions import YacfgBatchException
 from yacfg_batch.yacfg_batch import iter_gen_profiles
@@ -38,7 +39,7 @@ def test_true(*_):
     # noinspection PyUnresolvedReferences
     yacfg_batch.yacfg_batch.open.assert_called()
     # noinspection PyUnresolvedReferences
-    yaml.load_all.assert_called_with(file_desc, yaml.SafeLoader)
+    yaml.load_all.assert_called_with(file_desc, yacfg.yaml_backend.SafeLoader)
 
 
 @mock.patch(
@@ -0,0 +1,191 @@
+# Copyright 2018 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+
+import mock
+import pytest
+
+import yacfg
+from yacfg.exceptions import GenerationError
+from yacfg_batch.exceptions import YacfgBatchException
+from yacfg_batch.yacfg_batch import (
+    group_service_jobs,
+    run_service_jobs,
+    service_job_key,
+)
+from .fakes import write_fake_profile_set
+
+
+def service_jobs(profile, template, output_path, values):
+    return [
+        (
+            f"service{i}",
+            dict(
+                profile=profile,
+                template=template,
+                output_path=str(output_path / f"service{i}"),
+                tuning_files_list=None,
+                tuning_data_list=[{"value": value}],
+            ),
+        )
+        for i, value in enumerate(values)
+    ]
+
+
+@mock.patch(
+    "yacfg.yacfg.generate_profile",
+    side_effect=[None, GenerationError("bad template"), None],
+)
+def test_fail_fast(*_):
+    jobs = [(f"service{i}", {"profile": "p"}) for i in range(3)]
+
+    with pytest.raises(YacfgBatchException, match="service1: bad template"):
+        run_service_jobs(jobs)
+
+    # noinspection PyUnresolvedReferences
+    assert yacfg.yacfg.generate_profile.call_count == 2
+
+
+@mock.patch(
+    "yacfg.yacfg.generate_profile",
+    side_effect=[None, GenerationError("bad template"), ValueError("bad")],
+)
+def test_keep_going(*_):
+    jobs = [(f"service{i}", {"profile": "p"}) for i in range(3)]
+
+    with pytest.raises(YacfgBatchException) as exc_info:
+        run_service_jobs(jobs, fail_fast=False)
+
+    assert "2 service(s)" in str(exc_info.value)
+    assert "service1: bad template" in str(exc_info.value)
+    assert "service2: bad" in str(exc_info.value)
+    # noinspection PyUnresolvedReferences
+    assert yacfg.yacfg.generate_profile.call_count == 3
+
+
+def test_process_pool(tmp_path, caplog):
+    profile, template = write_fake_profile_set(tmp_path)
+    output_path = tmp_path / "output"
+    values = [f"value{i}" for i in range(6)]
+
+    with caplog.at_level(logging.INFO):
+        run_service_jobs(service_jobs(profile, template, output_path, values), 3)
+
+    for i, value in enumerate(values):
+        result = (output_path / f"service{i}" / "service.conf").read_text()
+        assert result == f"name={value}"
+
+    # worker logs are emitted in service order
+    services = [
+        record.getMessage()
+        for record in caplog.records
+        if record.getMessage().startswith("-- Profile")
+    ]
+    assert services == [f"-- Profile: service{i}" for i in range(6)]
+    generated = [
+        record.getMessage()
+        for record in caplog.records
+        if "generation PASSED" in record.getMessage()
+    ]
+    assert len(generated) == 6
+
+
+def test_process_pool_errors(tmp_path):
+    profile, template = write_fake_profile_set(tmp_path)
+    jobs = service_jobs(profile, template, tmp_path / "output", ["a", "b"])
+    jobs[0][1]["profile"] = str(tmp_path / "missing.yaml")
+
+    with pytest.raises(YacfgBatchException, match="service0") as exc_info:
+        run_service_jobs(jobs, 2, fail_fast=False)
+
+    assert "service1" not in str(exc_info.value)
+    assert (tmp_path / "output" / "service1" / "service.conf").exists()
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_generation_error_message(tmp_path, jobs):
+    profile, template = write_fake_profile_set(tmp_path)
+    (tmp_path / "template" / "service.conf.jinja2").write_text("{{ name.x.y }}")
+    service_jobs_list = service_jobs(profile, template, tmp_path / "output", ["a", "b"])
+
+    with pytest.raises(YacfgBatchException) as exc_info:
+        run_service_jobs(service_jobs_list, jobs, fail_fast=False)
+
+    # the generation error is reported, not just the failure
+    assert "service0: There was a problem generating file service.conf" in str(
+        exc_info.value
+    )
+
+
+def test_service_job_key(tmp_path):
+    jobs = service_jobs("p", "t", tmp_path, ["a", "a", "b"])
+    jobs[1][1]["tuning_files_list"] = [os.path.join("x", "..", "tune.yaml")]
+    jobs[0][1]["tuning_files_list"] = ["tune.yaml"]
+
+    # only the output path differs
+    assert service_job_key(jobs[0][1]) == service_job_key(jobs[1][1])
+    assert service_job_key(jobs[0][1]) != service_job_key(jobs[2][1])
+
+
+def test_group_service_jobs(tmp_path):
+    jobs = service_jobs("p", "t", tmp_path, ["a", "b", "a", "c", "b"])
+
+    groups = group_service_jobs(jobs)
+
+    assert [[name for name, _ in group] for group in groups] == [
+        ["service0", "service2"],
+        ["service1", "service4"],
+        ["service3"],
+    ]
+
+
+@pytest.mark.parametrize("jobs, hardlink", [(1, False), (2, True)])
+def test_dedup(tmp_path, caplog, jobs, hardlink):
+    profile, template = write_fake_profile_set(tmp_path)
+    output_path = tmp_path / "output"
+    values = ["a", "b", "a", "a"]
+
+    with caplog.at_level(logging.INFO):
+        with mock.patch(
+            "yacfg.yacfg.generate_profile", side_effect=yacfg.yacfg.generate_profile
+        ) as generate:
+            run_service_jobs(
+                service_jobs(profile, template, output_path, values),
+                jobs,
+                dedup=True,
+                hardlink=hardlink,
+            )
+
+    if jobs == 1:
+        assert generate.call_count == 2
+    for i, value in enumerate(values):
+        result = (output_path / f"service{i}" / "service.conf").read_text()
+        assert result == f"name={value}"
+    links = os.stat(output_path / "service0" / "service.conf").st_nlink
+    assert links == (3 if hardlink else 1)
+    assert "dedup ratio 2.00" in caplog.text
+
+
+@mock.patch("yacfg.yacfg.generate_profile", side_effect=GenerationError("failed"))
+def test_dedup_failed(*_):
+    jobs = [(f"service{i}", {"profile": "p"}) for i in range(2)]
+
+    with pytest.raises(YacfgBatchException) as exc_info:
+        run_service_jobs(jobs, dedup=True)
+
+    assert "service1: same as service0" in str(exc_info.value)
+    # noinspection PyUnresolvedReferences
+    assert yacfg.yacfg.generate_profile.call_count == 1